@@ -0,0 +1,90 @@
+"""
+Bankroll allocation across opportunities by book depth.
+
+Splits a total capital across many order books by greedy marginal ROI:
+a max-heap holds each market's cheapest remaining ask level, and the
+best level is always bought next. Per market, levels only get more
+expensive, so marginal ROI only falls and the greedy order is optimal
+for the pooled books (before per-market caps and the slippage limit cut
+a market off). Runs in O(levels log markets).
+"""
+import heapq
+
+from orderbook import BookBatch
+from utils import MAX_SLIPPAGE
+
+
+def allocate(opportunities, books, bankroll, market_cap=None, max_slippage=MAX_SLIPPAGE,
+             min_roi=0.0):
+    """
+    Split `bankroll` across `opportunities` using their ask ladders.
+
+    `books` maps token_id -> /books entry (as from `fetch_liquidity` or
+    `get_books`). Each market gets at most `market_cap` USD, and is
+    filled only while its average entry stays within `max_slippage` of
+    its best ask. Levels returning `min_roi` or less are never bought.
+
+    Returns (allocations, undeployed): one dict per funded opportunity,
+    highest allocation first, with `alloc`, `shares`, `alloc_entry`,
+    `alloc_profit` and `alloc_roi` added; and the capital left over.
+    """
+    by_id = {str(o["id"]): o for o in opportunities}
+    batch = BookBatch.from_books({
+        token_id: books[token_id].get("asks", [])
+        for token_id in by_id if books.get(token_id)
+    })
+    prices, sizes = batch.prices, batch.sizes
+    market_cap = bankroll if market_cap is None else market_cap
+
+    spent = [0.0] * len(batch)
+    shares = [0.0] * len(batch)
+    # Heap of (-marginal ROI, book, level); a book's levels are sorted by price
+    heap = []
+    for b in range(len(batch)):
+        start, end = int(batch.start[b]), int(batch.end[b])
+        if start < end:
+            heap.append((-(1.0 - prices[start]) / prices[start], b, start))
+    heapq.heapify(heap)
+
+    remaining = bankroll
+    while heap and remaining > 1e-9:
+        neg_roi, b, level = heapq.heappop(heap)
+        if -neg_roi <= min_roi:
+            break
+
+        price = float(prices[level])
+        budget = min(remaining, market_cap - spent[b], price * float(sizes[level]))
+
+        # Keep the average entry within max_slippage of the best ask
+        limit = float(batch.best[b]) + max_slippage
+        if price > limit:
+            headroom = (limit * shares[b] - spent[b]) / (price - limit)
+            budget = min(budget, max(headroom, 0.0) * price)
+
+        if budget > 1e-9:
+            spent[b] += budget
+            shares[b] += budget / price
+            remaining -= budget
+
+        # Move on to this book's next level only if this one was used up
+        level_used_up = budget >= price * float(sizes[level]) - 1e-9
+        if level_used_up and level + 1 < batch.end[b] and spent[b] < market_cap:
+            nxt = float(prices[level + 1])
+            heapq.heappush(heap, (-(1.0 - nxt) / nxt, b, level + 1))
+
+    allocations = []
+    for b, token_id in enumerate(batch.token_ids):
+        if spent[b] <= 0:
+            continue
+        entry = spent[b] / shares[b]
+        profit = shares[b] - spent[b]
+        allocations.append(dict(
+            by_id[token_id],
+            alloc=spent[b],
+            shares=shares[b],
+            alloc_entry=entry,
+            alloc_profit=profit,
+            alloc_roi=profit / spent[b] * 100,
+        ))
+    allocations.sort(key=lambda a: a["alloc"], reverse=True)
+    return allocations, remaining
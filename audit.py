@@ -0,0 +1,272 @@
+"""
+Red Team audits: prompt, persistent cache and a background audit queue.
+
+Audits run on a shared thread pool with a concurrency cap, so the
+dashboard never blocks on the model and every session benefits from
+audits already running. Finished reports are cached in SQLite, keyed by
+market, description hash and price bucket, and expire after AUDIT_TTL.
+The OpenAI endpoint can be redirected with OPENAI_BASE_URL (e.g. to the
+stand-in server in `benchmarks/standin.py`).
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from opportunity import description_hash
+from store import DB_PATH
+
+# --- CONFIG ---
+AUDIT_MODEL = "gpt-4o"
+AUDIT_TTL = 6 * 3600
+AUDIT_CONCURRENCY = 4
+PRICE_BUCKET = 0.02
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+VERDICTS = ("KILL", "WARNING", "APPROVED")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS audits (
+    key TEXT PRIMARY KEY,
+    market_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    verdict TEXT,
+    report TEXT NOT NULL
+);
+"""
+
+
+# --- PROMPT ---
+def audit_prompt(op):
+    """The Forensic Auditor prompt for one opportunity."""
+    # Prepare Data Block
+    market_info = f"""
+        MARKET: {op['title']}
+        DESCRIPTION: {op['desc']}
+        OUTCOME: {op['target_outcome']}
+        CURRENT PRICE: {op['real_entry']} (Implied Probability: {op['real_entry']*100:.1f}%)
+        RESOLUTION DATE: {op['end_date_iso']} (approx {op['days']} days)
+        LIQUIDITY DEPTH: ${op['max_liq']:.2f}
+        TOTAL VOLUME: ${op['volume']:.2f}
+        POTENTIAL ROI: {op['roi']:.2f}%
+        SLIPPAGE ESTIMATE: {op['slippage']*100:.2f}%
+        """
+
+    current_date = datetime.now().strftime("%Y-%m-%d")
+
+    # THE PROMPT
+    system_prompt = f"""
+# ROLE
+You are a Forensic Auditor and Adversarial Risk Manager specializing in Markets, Politics, and Conflict.
+Your job is NOT to find a good bet. Your job is to disqualify bad bets.
+You treat every market as a potential "Trap" until the data proves otherwise.
+
+# CONTEXT
+- Current Date: {current_date}
+- Risk-Free Rate: You must approximate the current "3-Month US Treasury Bill" yield for calculations (e.g., if T-Bills are 4%, use 0.04).
+
+# INPUT DATA
+{market_info}
+
+# MISSION
+Perform a "Red Team" investigation on the candidates above.
+First, determine the Market Type for each candidate:
+1. TYPE A (Polling/Elections): Approval Ratings, Special Election Margins.
+2. TYPE B (Procedural/Legal): Legislative Votes, Court Rulings, SEC Decisions.
+3. TYPE C (Corporate/Data): M&A, Earnings, Central Bank Rates.
+4. TYPE D (Geopolitics/War): Ceasefires, Treaties, Territorial Control.
+
+---
+
+# PHASE 1: THE "SOURCE OF TRUTH" AUDIT
+
+### IF TYPE A (POLLING MARKET):
+Apply the "Recent-Cycle Accuracy" Standard:
+Judge pollsters based on their performance in the LAST General Election cycle.
+- TIER 1 (TRUST): Top-rated firms with <2pt error in the last cycle (e.g., AtlasIntel/Verasight in recent eras).
+- TIER 2 (VERIFY): Traditional high-volume pollsters (e.g., NYT/Siena, Emerson).
+- TIER 3 (REJECT): Any firm that had a >4pt "Historic Miss" in the last major cycle.
+- CRITICAL CHECK: If the race is Local/State, REJECT National-only pollsters (they often lack local weighting models).
+
+### IF TYPE B (PROCEDURAL MARKET):
+Apply the "Whip Count" Standard:
+- REJECT: News articles, op-eds, or "Insider" tweets.
+- ACCEPT: Official Government Domains (congress.gov, supremecourt.gov, etc.) or Court Dockets (PACER).
+- TRAP CHECK: Ensure "Passed Senate" is not confused with "Signed into Law."
+
+### IF TYPE C (CORPORATE/DATA):
+Apply the "Ledger" Standard:
+- REJECT: Substack rumors or "Sources close to the matter."
+- ACCEPT: SEC EDGAR (8-K/10-Q), Official Central Bank Press Releases, Bureau of Labor Statistics (.gov).
+
+### IF TYPE D (GEOPOLITICS/WAR):
+Apply the "Triangulation" Standard (Anti-Propaganda Filter):
+- THE UNILATERAL BAN: Never trust a combatant's official statement about their own success or adherence to a truce unless the enemy confirms it.
+- Example: "Army A says truce holding" = REJECT (Bias).
+- Example: "Army A and Army B issue joint start time" = ACCEPT (Bilateral).
+- TRUSTED NEUTRALS: If bilateral confirmation is missing, accept only on-ground verification from:
+- IAEA (Nuclear), UN Security Council (Resolutions), Red Cross/Crescent (Humanitarian Access).
+- TRAP CHECK: Watch for "Ceasefire Agreed" vs "Ceasefire in Effect." (Agreements are easy; "in effect" markets are traps because one bullet voids the bet).
+
+---
+
+# PHASE 2: THE "NEGATIVE SEARCH" (The Black Swan Hunt)
+Do not search for confirmation. Search for the failure mode.
+Run these queries based on the market type:
+
+- Type A/B/C: "[Candidate/Bill]" delay OR lawsuit OR "blocked by"
+- Type D (War): "[Location]" "violations" OR "skirmish" OR "fighting reported" -official
+- Note: The "-official" tag helps find independent reports contradicting government narratives.
+
+- Immediate Kill Rule: If any credible report from the last 24h mentions a "TRO" (Restraining Order), "Indefinite Recess," or "Sporadic Clashes" (for war), REJECT.
+
+---
+
+# PHASE 3: EXECUTION MATH (Python)
+(Note: You are the AI, perform the mental check of this logic)
+Use the user's entry price of {op['real_entry']} and {op['days']} days to resolution.
+Compare against a Risk Free Rate of ~4.5%.
+
+# OUTPUT FORMAT
+Provide your response in Markdown.
+1. **Classification:** (Type A/B/C/D)
+2. **The Verdict:** (KILL / WARNING / APPROVED)
+3. **Risk Analysis:** (Bullet points on specific failure modes found)
+4. **Execution Check:** (Does the yield beat the 4.5% risk free rate + premium?)
+"""
+    return system_prompt
+
+
+def audit_key(op):
+    """Cache key: market, description hash and entry-price bucket."""
+    # Opportunities carry the hash, so badges never load the description
+    desc_hash = op.get("desc_hash") or description_hash(op.get("desc"))
+    bucket = int(op["real_entry"] / PRICE_BUCKET)
+    return f"{op['id']}:{desc_hash}:{bucket}"
+
+
+def parse_verdict(report):
+    """KILL / WARNING / APPROVED from the report's verdict line, or None."""
+    match = re.search(r"Verdict:?\**:?\s*\(?\s*\**(KILL|WARNING|APPROVED)", report or "", re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    found = [v for v in VERDICTS if v in (report or "").upper()]
+    return found[0] if len(found) == 1 else None
+
+
+# --- CACHE ---
+class AuditCache:
+    """Audit reports in SQLite, expiring after `ttl` seconds."""
+
+    def __init__(self, path=DB_PATH, ttl=AUDIT_TTL):
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """{"report", "verdict", "created_at"} if cached and fresh, else None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT created_at, verdict, report FROM audits WHERE key = ?", (key,)
+            ).fetchone()
+        if not row or time.time() - row[0] > self.ttl:
+            return None
+        return {"created_at": row[0], "verdict": row[1], "report": row[2]}
+
+    def put(self, key, market_id, report, verdict):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO audits (key, market_id, created_at, verdict, report) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, str(market_id), now, verdict, report),
+            )
+            self._db.execute("DELETE FROM audits WHERE created_at < ?", (now - self.ttl,))
+            self._db.commit()
+        return {"created_at": now, "verdict": verdict, "report": report}
+
+
+# --- QUEUE ---
+class AuditQueue:
+    """
+    Runs audits in the background, at most `concurrency` at a time.
+
+    `submit` is non-blocking and skips opportunities that are cached or
+    already in flight; `status` reports where an opportunity's audit is.
+    """
+
+    def __init__(self, concurrency=AUDIT_CONCURRENCY, cache=None, model=AUDIT_MODEL,
+                 base_url=OPENAI_BASE_URL):
+        self.cache = cache or AuditCache()
+        self.model = model
+        self.base_url = base_url
+        self.requests = 0
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="audit")
+        self._jobs = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _client(self, api_key):
+        import openai
+
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = self._clients[api_key] = openai.OpenAI(api_key=api_key, base_url=self.base_url)
+            return client
+
+    def _run(self, op, key, api_key):
+        with self._lock:
+            self.requests += 1
+        res = self._client(api_key).chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": audit_prompt(op)}]
+        )
+        report = res.choices[0].message.content
+        return self.cache.put(key, op["id"], report, parse_verdict(report))
+
+    def submit(self, op, api_key):
+        """Queue an audit unless it is cached or running. Returns its key."""
+        key = audit_key(op)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job and not (job.done() and job.exception()):
+                return key
+        if self.cache.get(key):
+            return key
+        with self._lock:
+            self._jobs[key] = self._pool.submit(self._run, op, key, api_key)
+        return key
+
+    def submit_many(self, ops, api_key):
+        return [self.submit(op, api_key) for op in ops]
+
+    def status(self, op):
+        """
+        ("done", entry), ("running", None), ("failed", error) or
+        (None, None) if the opportunity was never audited.
+        """
+        key = audit_key(op)
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None:
+            if not job.done():
+                return "running", None
+            if job.exception():
+                return "failed", str(job.exception())
+            with self._lock:
+                self._jobs.pop(key, None)
+            return "done", job.result()
+
+        entry = self.cache.get(key)
+        return ("done", entry) if entry else (None, None)
+
+    def pending(self):
+        """Number of audits queued or running."""
+        with self._lock:
+            return sum(not job.done() for job in self._jobs.values())
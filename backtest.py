@@ -0,0 +1,208 @@
+"""
+Vectorized backtest over the recorded scan history.
+
+Replays every recorded book through the fill simulation for a grid of
+bet sizes in one `BookBatch.fill`, applies the gates for every
+threshold combination as array masks, and joins against resolution
+outcomes. Each token is traded at most once, at the first scan in which
+it passes the gates.
+
+    python backtest.py --since 2026-08-01 --capital 1000 2000 5000 \\
+        --min-fill 0.9 0.95 --max-slippage 0.02 0.03 0.05 --band 0.85 0.99 --band 0.9 0.99
+
+Candidates were recorded with the entry band of the scan that found
+them, so a swept band only uses scans whose recorded band contains it;
+rows from narrower scans are left out of that band's results and counted
+in `uncovered` (partitions from before bands were recorded count as
+85-99c).
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import utils
+from history import HISTORY_DIR, load_history
+from utils import ENTRY_BAND, MAX_SLIPPAGE, MIN_FILL, logger, session
+
+RESOLUTIONS_FILE = "resolutions.json"
+RESOLUTION_CHUNK = 50
+
+
+# --- RESOLUTIONS ---
+def fetch_resolutions(token_ids):
+    """
+    Payout per token (1.0 won, 0.0 lost) for markets Gamma reports as
+    closed. Unresolved tokens are left out.
+    """
+    markets_url = utils.GAMMA_URL.rsplit("/", 1)[0] + "/markets"
+    token_ids = list(token_ids)
+    payouts = {}
+
+    for i in range(0, len(token_ids), RESOLUTION_CHUNK):
+        chunk = token_ids[i:i + RESOLUTION_CHUNK]
+        try:
+            r = session.get(markets_url, params={"clob_token_ids": chunk, "closed": "true"}, timeout=10)
+            r.raise_for_status()
+            markets = r.json()
+        except Exception as e:
+            logger.error(f"Resolution fetch failed: {e}")
+            continue
+
+        for m in markets:
+            ids = m.get("clobTokenIds")
+            prices = m.get("outcomePrices")
+            if isinstance(ids, str): ids = json.loads(ids)
+            if isinstance(prices, str): prices = json.loads(prices)
+            if not m.get("closed") or not ids or not prices:
+                continue
+            for token_id, price in zip(ids, prices):
+                payout = utils.safe_float(price)
+                if payout in (0.0, 1.0):
+                    payouts[str(token_id)] = payout
+    return payouts
+
+
+def load_resolutions(token_ids, path=HISTORY_DIR, refresh=True):
+    """
+    Resolutions cached next to the history; only tokens not yet known to
+    be resolved are looked up (if `refresh`).
+    """
+    cache_path = os.path.join(path, RESOLUTIONS_FILE)
+    try:
+        with open(cache_path) as f:
+            payouts = json.load(f)
+    except (OSError, ValueError):
+        payouts = {}
+
+    missing = [t for t in set(token_ids) if t not in payouts]
+    if refresh and missing:
+        payouts.update(fetch_resolutions(missing))
+        os.makedirs(path, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump(payouts, f)
+    return payouts
+
+
+# --- SWEEP ---
+def sweep(history, payouts, capitals, bands=(ENTRY_BAND,), max_slippages=(MAX_SLIPPAGE,),
+          min_fills=(MIN_FILL,)):
+    """
+    Backtest every combination of capital, entry band, slippage limit and
+    minimum fill. Returns one summary dict per combination.
+
+    Rows from scans whose recorded band does not contain the swept band
+    are left out (the outcomes such a scan skipped were never recorded).
+    """
+    capitals = np.asarray(capitals, dtype=np.float64)
+    fill_pct, avg_entry, slippage, max_liq, warn = history.book_batch().fill(capitals)
+
+    # Join outcomes once per distinct token, then broadcast to rows
+    tokens, codes = np.unique(history["token_id"], return_inverse=True)
+    payout = np.array([payouts.get(t, np.nan) for t in tokens])[codes]
+    resolved = ~np.isnan(payout)
+    price_raw = history["price_raw"]
+    # Rows grouped by token, in scan order within each group (sorted once)
+    by_token = np.argsort(codes, kind="stable")
+
+    results = []
+    for (lo, hi), j in itertools.product(bands, range(len(capitals))):
+        capital = capitals[j]
+        entry = avg_entry[:, j]
+        covered = history.covers((lo, hi))
+        uncovered = int((resolved & ~covered).sum())
+        base = (
+            resolved & covered & ~warn[:, j] & (price_raw >= lo) & (price_raw <= hi)
+            & (entry >= lo) & (entry <= hi)
+        )
+        for max_slip, min_fill in itertools.product(max_slippages, min_fills):
+            mask = base & (slippage[:, j] <= max_slip) & (fill_pct[:, j] >= min_fill)
+            # First passing row of each token group is its first entry
+            rows = by_token[mask[by_token]]
+            group = codes[rows]
+            rows = rows[np.concatenate(([True], group[1:] != group[:-1]))] if len(rows) else rows
+
+            stake = capital * fill_pct[rows, j]
+            shares = stake / entry[rows]
+            pnl = shares * payout[rows] - stake
+            predicted = (1.0 - entry[rows]) / entry[rows] * 100
+
+            results.append({
+                "capital": float(capital),
+                "band": (lo, hi),
+                "max_slippage": max_slip,
+                "min_fill": min_fill,
+                "trades": len(rows),
+                "wins": int((payout[rows] > 0).sum()),
+                "hit_rate": float((payout[rows] > 0).mean()) if len(rows) else 0.0,
+                "staked": float(stake.sum()),
+                "pnl": float(pnl.sum()),
+                "roi": float(pnl.sum() / stake.sum() * 100) if len(rows) else 0.0,
+                "predicted_roi": float(predicted.mean()) if len(rows) else 0.0,
+                "uncovered": uncovered,
+            })
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Replay recorded scans through the gates and score them against resolutions."
+    )
+    parser.add_argument("--history", default=HISTORY_DIR, help="history directory")
+    parser.add_argument("--since", help="first partition date (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last partition date (YYYY-MM-DD)")
+    parser.add_argument("--capital", type=float, nargs="+", default=[2000])
+    parser.add_argument(
+        "--band", type=float, nargs=2, action="append", metavar=("LOW", "HIGH"),
+        help="entry band (repeatable; default 0.85 0.99)"
+    )
+    parser.add_argument("--max-slippage", type=float, nargs="+", default=[MAX_SLIPPAGE])
+    parser.add_argument("--min-fill", type=float, nargs="+", default=[MIN_FILL])
+    parser.add_argument("--offline", action="store_true", help="use cached resolutions only")
+    args = parser.parse_args(argv)
+    args.band = [tuple(b) for b in args.band] if args.band else [ENTRY_BAND]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.history:
+        logger.error("History is disabled (SCANNER_HISTORY is empty).")
+        return 2
+
+    start = time.perf_counter()
+    history = load_history(args.history, args.since, args.until)
+    if not len(history):
+        logger.error(f"No recorded scans in {args.history}.")
+        return 1
+    payouts = load_resolutions(np.unique(history["token_id"]).tolist(), args.history, not args.offline)
+    loaded_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = sweep(history, payouts, args.capital, args.band, args.max_slippage, args.min_fill)
+    sweep_s = time.perf_counter() - start
+
+    for band, uncovered in sorted({r["band"]: r["uncovered"] for r in results}.items()):
+        if uncovered:
+            logger.warning(
+                f"Band {band[0]:.2f}-{band[1]:.2f}: {uncovered} resolved candidates left out, "
+                "recorded by scans with a narrower band"
+            )
+    results.sort(key=lambda r: r["pnl"], reverse=True)
+    print(f"{len(history)} recorded candidates, {len(payouts)} resolved tokens, "
+          f"{len(results)} combinations (load {loaded_s:.1f}s, sweep {sweep_s:.2f}s)")
+    print(f"{'capital':>8} {'band':>11} {'slip':>5} {'fill':>5} {'trades':>6} {'hit':>6} "
+          f"{'pnl':>10} {'roi':>7} {'pred':>6}")
+    for r in results:
+        print(f"{r['capital']:8.0f} {r['band'][0]:5.2f}-{r['band'][1]:.2f} {r['max_slippage']:5.3f} "
+              f"{r['min_fill']:5.2f} {r['trades']:6d} {r['hit_rate']:6.1%} {r['pnl']:10.2f} "
+              f"{r['roi']:6.2f}% {r['predicted_roi']:5.2f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
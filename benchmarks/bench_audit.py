@@ -0,0 +1,86 @@
+"""
+Benchmark: Red Team audits of the top N opportunities, one by one vs the
+background queue, then a repeat that is served from the audit cache.
+
+Runs against the OpenAI-compatible stand-in server; no API key or
+network access needed.
+
+Run from the repo root:
+    python -m benchmarks.bench_audit
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import openai
+
+from audit import AuditCache, AuditQueue, audit_prompt
+from benchmarks.standin import OpenAIStandin
+
+
+def make_ops(count):
+    return [
+        {
+            "id": f"tok{n}", "title": f"Synthetic event {n}", "desc": "Resolves per the synthetic oracle.",
+            "target_outcome": "Yes", "real_entry": 0.9 + (n % 9) / 100, "end_date_iso": "2026-12-01T00:00:00Z",
+            "days": 14, "max_liq": 25000.0, "volume": 1e5, "roi": 5.0, "slippage": 0.004,
+        }
+        for n in range(count)
+    ]
+
+
+def wait(queue, ops):
+    while queue.pending():
+        time.sleep(0.01)
+    return [queue.status(op) for op in ops]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="stand-in seconds per completion")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    for name in ("httpx", "httpx2"):  # the OpenAI client's per-request INFO lines
+        logging.getLogger(name).setLevel(logging.WARNING)
+    ops = make_ops(args.top)
+
+    with OpenAIStandin(latency=args.latency) as server:
+        client = openai.OpenAI(api_key="standin", base_url=server.url)
+        start = time.perf_counter()
+        for op in ops:
+            client.chat.completions.create(
+                model="gpt-4o", messages=[{"role": "user", "content": audit_prompt(op)}]
+            )
+        serial_s = time.perf_counter() - start
+
+        server.max_in_flight = 0
+        cache = AuditCache(os.path.join(tempfile.mkdtemp(), "audits.sqlite3"))
+        queue = AuditQueue(args.concurrency, cache=cache, base_url=server.url)
+        start = time.perf_counter()
+        queue.submit_many(ops, "standin")
+        submit_ms = (time.perf_counter() - start) * 1000
+        statuses = wait(queue, ops)
+        queued_s = time.perf_counter() - start
+        assert all(state == "done" and entry["verdict"] for state, entry in statuses), statuses
+
+        # A reload (or another session) with a fresh queue over the same cache
+        requests = server.requests
+        again = AuditQueue(args.concurrency, cache=cache, base_url=server.url)
+        start = time.perf_counter()
+        again.submit_many(ops, "standin")
+        statuses = wait(again, ops)
+        cached_ms = (time.perf_counter() - start) * 1000
+        assert all(state == "done" for state, _ in statuses)
+
+        print(f"{args.top} audits, {args.latency * 1000:.0f}ms per completion")
+        print(f"one by one : {serial_s:6.2f}s (script blocked throughout)")
+        print(f"queue/{args.concurrency}    : {queued_s:6.2f}s ({serial_s / queued_s:.1f}x), "
+              f"submit returned in {submit_ms:.1f}ms, peak {server.max_in_flight} in flight")
+        print(f"cached     : {cached_ms:6.1f}ms, {server.requests - requests} new completions")
+
+
+if __name__ == "__main__":
+    main()
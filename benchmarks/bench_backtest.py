@@ -0,0 +1,143 @@
+"""
+Benchmark: vectorized backtest sweep vs a row-by-row replay loop.
+
+Writes months of synthetic scan partitions (a drifting universe of
+tokens with synthetic books; every fourth scan recorded with a narrower
+88-99c band) to a temporary history, checks that the sweep matches a
+`calculate_slippage` loop on a sample, then times a full parameter
+sweep. The loop is timed on a slice and extrapolated.
+
+Run from the repo root:
+    python -m benchmarks.bench_backtest
+"""
+import argparse
+import itertools
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from backtest import sweep
+from benchmarks.standin import make_book
+from history import History, load_history, write_partition
+from utils import calculate_slippage, make_gates
+
+CAPITALS = [500, 1000, 2000, 5000, 10000]
+BANDS = [(0.85, 0.99), (0.88, 0.99), (0.9, 0.99), (0.85, 0.97)]
+SLIPPAGES = [0.01, 0.02, 0.03, 0.05]
+NARROW_GATES = make_gates(band=(0.88, 0.99))
+FILLS = [0.9, 0.95, 1.0]
+
+
+def make_history(path, days, scans_per_day, per_scan, universe, seed=7):
+    """Write synthetic partitions; returns synthetic payouts per token."""
+    rng = random.Random(seed)
+    base_prices = {f"tok{n}": rng.uniform(0.85, 0.99) for n in range(universe)}
+    payouts = {t: float(rng.random() < p + 0.02) for t, p in base_prices.items()}
+    start = time.time() - days * 86400
+
+    for scan in range(days * scans_per_day):
+        scanned_at = start + scan * 86400 / scans_per_day
+        tokens = rng.sample(list(base_prices), per_scan)
+        gates = NARROW_GATES if scan % 4 == 3 else make_gates()
+        candidates, asks = [], {}
+        for t in tokens:
+            price = round(min(0.99, max(0.85, base_prices[t] + rng.uniform(-0.01, 0.01))), 3)
+            if not gates.band[0] <= price <= gates.band[1]:
+                continue  # the scan would not have picked it up
+            candidates.append({"id": t, "title": t, "slug": t, "target_outcome": "Yes",
+                               "price_raw": price, "volume": 1e5, "end_date_iso": None})
+            asks[t] = make_book(t, price, seed=scan)["asks"]
+        write_partition(candidates, asks, CAPITALS, scanned_at, path, gates)
+    return payouts
+
+
+def loop_sweep(history, payouts, capitals, bands, slippages, fills):
+    """Row by row: rebuild each book, walk it with calculate_slippage, gate, first entry per token."""
+    # Scans recorded with a narrower band than the swept one are skipped
+    bounds = history["bounds"]
+    results = []
+    for (lo, hi), capital, max_slip, min_fill in itertools.product(bands, capitals, slippages, fills):
+        seen = set()
+        trades = 0
+        pnl = 0.0
+        for i, token_id in enumerate(history["token_id"]):
+            if token_id in seen or token_id not in payouts:
+                continue
+            if history["band_lo"][i] > lo or history["band_hi"][i] < hi:
+                continue
+            price_raw = history["price_raw"][i]
+            if not (lo <= price_raw <= hi):
+                continue
+            # Recorded levels are the sorted, valid ones; the spread check
+            # reads the full book's best and second-best prices
+            n = history["level_count"][i]
+            asks = [{"price": p, "size": s} for p, s in zip(
+                history["level_price"][bounds[i]:bounds[i + 1]], history["level_size"][bounds[i]:bounds[i + 1]]
+            )]
+            if n != len(asks) or not asks:
+                continue  # the sample only uses clean books
+            fill_pct, entry, slippage, _, warn = calculate_slippage(asks, capital)
+            if warn or fill_pct < min_fill or slippage > max_slip or not (lo <= entry <= hi):
+                continue
+            seen.add(token_id)
+            stake = capital * fill_pct
+            pnl += stake / entry * payouts[token_id] - stake
+            trades += 1
+        results.append((trades, pnl))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--scans-per-day", type=int, default=8)
+    parser.add_argument("--per-scan", type=int, default=300)
+    parser.add_argument("--universe", type=int, default=3000)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    start = time.perf_counter()
+    payouts = make_history(path, args.days, args.scans_per_day, args.per_scan, args.universe)
+    print(f"wrote {args.days * args.scans_per_day} partitions in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    history = load_history(path)
+    load_s = time.perf_counter() - start
+
+    combos = len(CAPITALS) * len(BANDS) * len(SLIPPAGES) * len(FILLS)
+    start = time.perf_counter()
+    results = sweep(history, payouts, CAPITALS, BANDS, SLIPPAGES, FILLS)
+    sweep_s = time.perf_counter() - start
+
+    # Parity and loop timing on the first few scans
+    sample_rows = args.per_scan * 20
+    c = history.columns
+    sample = History(
+        dict({k: c[k][:sample_rows] for k in c if k not in ("bounds", "level_price", "level_size")},
+             bounds=c["bounds"][:sample_rows + 1],
+             level_price=c["level_price"][:c["bounds"][sample_rows]],
+             level_size=c["level_size"][:c["bounds"][sample_rows]]),
+        [],
+    )
+    start = time.perf_counter()
+    expected = loop_sweep(sample, payouts, CAPITALS, BANDS, SLIPPAGES, FILLS)
+    loop_sample_s = time.perf_counter() - start
+    got = sweep(sample, payouts, CAPITALS, BANDS, SLIPPAGES, FILLS)
+    for (trades, pnl), r in zip(expected, got):
+        assert trades == r["trades"] and np.isclose(pnl, r["pnl"]), (trades, pnl, r)
+    loop_s = loop_sample_s * len(history) / sample_rows
+
+    print(f"{len(history)} recorded candidates over {args.days} days, {combos} parameter combinations")
+    print(f"load       : {load_s:6.2f}s")
+    print(f"sweep      : {sweep_s:6.2f}s")
+    print(f"row loop   : {loop_s:6.0f}s (extrapolated from {sample_rows} rows), "
+          f"{loop_s / sweep_s:.0f}x slower")
+    best = max(results, key=lambda r: r["pnl"])
+    print(f"best combo : capital {best['capital']:.0f}, band {best['band']}, slippage {best['max_slippage']}, "
+          f"fill {best['min_fill']} -> {best['trades']} trades, pnl {best['pnl']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: top-N-by-volume then filter vs server-side end-date window.
+
+Reports events and bytes transferred against in-window events kept, to
+show coverage going up while transfer goes down.
+
+Run from the repo root:
+    python -m benchmarks.bench_date_window
+"""
+import argparse
+import time
+from datetime import timedelta
+
+import utils
+from benchmarks.standin import StandinServer, make_events
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    now = utils.utc_now()
+    window = (now + timedelta(days=1), now + timedelta(days=30))
+    events = make_events(args.events)
+    in_window = sum(utils._in_window(e, *window) for e in events)
+
+    with StandinServer(events, latency=args.latency) as server:
+        utils.GAMMA_URL = f"{server.url}/events"
+
+        old_stats = {}
+        start = time.perf_counter()
+        top = utils.fetch_events_paginated(limit=400, stats=old_stats)
+        old_kept = [e for e in top if utils._in_window(e, *window)]
+        t_old = time.perf_counter() - start
+
+        new_stats = {}
+        start = time.perf_counter()
+        utils.fetch_events_paginated(limit=None, end_date_min=window[0], end_date_max=window[1],
+                                     stats=new_stats)
+        t_new = time.perf_counter() - start
+
+    print(f"universe {args.events} events, {in_window} resolve in 1-30 days")
+    print(f"top 400 + client filter : {old_stats['fetched']:>5} fetched, "
+          f"{old_stats['bytes'] / 1e6:6.2f} MB, {len(old_kept):>5} kept "
+          f"({len(old_kept) / in_window:5.1%} coverage) in {t_old:.2f}s")
+    print(f"server-side window      : {new_stats['fetched']:>5} fetched, "
+          f"{new_stats['bytes'] / 1e6:6.2f} MB, {new_stats['kept']:>5} kept "
+          f"({new_stats['kept'] / in_window:5.1%} coverage) in {t_new:.2f}s")
+    print(f"bytes per kept event    : {old_stats['bytes'] / max(len(old_kept), 1):,.0f} -> "
+          f"{new_stats['bytes'] / max(new_stats['kept'], 1):,.0f}")
+
+
+if __name__ == "__main__":
+    main()
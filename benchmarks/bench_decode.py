@@ -0,0 +1,136 @@
+"""
+Benchmark: Gamma page decoding, `r.json()` + per-market `json.loads` vs
+the projected decoder (orjson and stdlib backends).
+
+Synthetic events are padded with the metadata the real API returns
+(images, rewards, series, per-market config, ...), or a recorded
+fixture can be replayed with --fixture. Each path decodes pages of 100
+events and parses them into records; reports CPU time per page (best
+of 3 runs), the peak memory of decoding one page and what the decoded
+page retains.
+
+Run from the repo root:
+    python -m benchmarks.bench_decode
+"""
+import argparse
+import gzip
+import json
+import time
+import tracemalloc
+
+import gamma
+from benchmarks.standin import make_events
+from store import parse_record
+from utils import PAGE_SIZE
+
+
+def pad_event(e, n):
+    """Add the fields a real Gamma event and its markets carry but the scanner never reads."""
+    image = f"https://polymarket-upload.s3.us-east-2.amazonaws.com/event-{n}-a1b2c3d4e5f6.png"
+    e.update({
+        "ticker": e["slug"], "resolutionSource": "", "startDate": "2025-12-01T00:00:00Z",
+        "creationDate": "2025-12-01T00:00:00Z", "createdAt": "2025-11-30T18:00:00.000Z",
+        "image": image, "icon": image, "active": True, "closed": False, "archived": False,
+        "new": False, "featured": False, "restricted": True, "liquidity": 125000.5,
+        "openInterest": 0, "competitive": 0.93, "volume24hr": 1234.5, "volume1wk": 23456.7,
+        "volume1mo": 98765.4, "volume1yr": 198765.4, "enableOrderBook": True,
+        "liquidityClob": 125000.5, "negRisk": False, "commentCount": 12, "cyom": False,
+        "showAllOutcomes": True, "showMarketImages": True, "enableNegRisk": False,
+        "automaticallyActive": True, "seriesSlug": f"series-{n % 50}", "negRiskAugmented": False,
+        "pendingDeployment": False, "deploying": False,
+        "series": [{"id": str(n % 50), "ticker": f"series-{n % 50}", "slug": f"series-{n % 50}",
+                    "title": f"Series {n % 50}", "seriesType": "single", "recurrence": "weekly",
+                    "image": image, "icon": image, "active": True, "closed": False,
+                    "archived": False, "volume": 1e6, "liquidity": 5e4, "commentCount": 3}],
+    })
+    for t in e["tags"]:
+        t.update({"id": str(hash(t["label"]) % 10000), "slug": t["label"].lower().replace(" ", "-"),
+                  "forceShow": False, "updatedAt": "2025-10-01T00:00:00Z", "requiresTranslation": False})
+    for m in e["markets"]:
+        m.update({
+            "question": f"{e['title']}?", "conditionId": "0x" + "ab" * 32, "slug": f"{e['slug']}-{m['id']}",
+            "resolutionSource": "", "endDate": e["endDate"], "liquidity": "50000.1234",
+            "startDate": "2025-12-01T00:00:00Z", "image": image, "icon": image,
+            "description": e["description"], "volumeNum": float(m["volume"]), "liquidityNum": 50000.1234,
+            "endDateIso": e["endDate"][:10], "startDateIso": "2025-12-01", "hasReviewedDates": True,
+            "volume24hr": 123.4, "volume1wk": 2345.6, "volume1mo": 9876.5, "volume1yr": 19876.5,
+            "questionID": "0x" + "cd" * 32, "clobRewards": [{"id": "1", "conditionId": "0x" + "ab" * 32,
+                                                            "assetAddress": "0x" + "ef" * 20, "rewardsAmount": 0,
+                                                            "rewardsDailyRate": 5, "startDate": "2025-12-01",
+                                                            "endDate": "2500-12-31"}],
+            "umaBond": "500", "umaReward": "5", "orderPriceMinTickSize": 0.001, "orderMinSize": 5,
+            "marketMakerAddress": "", "active": True, "closed": False, "archived": False,
+            "restricted": True, "groupItemTitle": "", "groupItemThreshold": "0", "enableOrderBook": True,
+            "acceptingOrders": True, "negRisk": False, "spread": 0.01, "oneDayPriceChange": 0.002,
+            "lastTradePrice": 0.93, "bestBid": 0.92, "bestAsk": 0.93, "automaticallyActive": True,
+            "clearBookOnStart": True, "seriesColor": "", "showGmpSeries": False, "showGmpOutcome": False,
+            "manualActivation": False, "negRiskOther": False, "umaResolutionStatuses": "[]",
+            "pendingDeployment": False, "deploying": False, "rfqEnabled": False, "holdingRewardsEnabled": False,
+        })
+    return e
+
+
+def make_pages(events):
+    return [json.dumps(events[i:i + PAGE_SIZE]).encode() for i in range(0, len(events), PAGE_SIZE)]
+
+
+def stdlib_path(body):
+    """Today's path: requests' r.json(), then parse_market json.loads the three arrays."""
+    return json.loads(body)
+
+
+def projected_stdlib(body):
+    return [gamma.project_event(e) for e in json.loads(body)]
+
+
+def measure(decode, pages, repeat=3):
+    runs = []
+    for _ in range(repeat):
+        start = time.process_time()
+        for body in pages:
+            for e in decode(body):
+                parse_record(e)
+        runs.append(time.process_time() - start)
+    cpu_ms = min(runs) * 1000 / len(pages)
+
+    tracemalloc.start()
+    decoded = decode(pages[0])
+    retained = tracemalloc.get_traced_memory()[0]
+    records = [parse_record(e) for e in decoded]
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cpu_ms, peak, retained, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--fixture", help="recorded .json.gz fixture (see benchmarks/record.py)")
+    args = parser.parse_args()
+
+    if args.fixture:
+        with gzip.open(args.fixture, "rt") as f:
+            events = json.load(f)["events"]
+    else:
+        events = [pad_event(e, n) for n, e in enumerate(make_events(args.events))]
+    pages = make_pages(events)
+    print(f"{len(events)} events in {len(pages)} pages, {sum(map(len, pages)) / len(pages) / 1e3:.0f} kB per page")
+
+    paths = [("r.json() + json.loads", stdlib_path), ("projected, json", projected_stdlib)]
+    if gamma.orjson:
+        paths.append(("projected, orjson", gamma.decode_events))
+    else:
+        print("orjson not installed; only the stdlib backend is measured")
+
+    baseline = None
+    for label, decode in paths:
+        cpu_ms, peak, retained, records = measure(decode, pages)
+        if baseline is None:
+            baseline = (cpu_ms, records)
+        assert records == baseline[1], f"{label}: records differ"
+        print(f"{label:24s} {cpu_ms:6.2f}ms CPU/page ({baseline[0] / cpu_ms:4.1f}x) | "
+              f"peak {peak / 1e6:5.2f} MB | page retains {retained / 1e6:5.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
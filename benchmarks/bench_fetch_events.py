@@ -0,0 +1,43 @@
+"""
+Benchmark: sequential vs concurrent Gamma pagination.
+
+Run from the repo root:
+    python -m benchmarks.bench_fetch_events
+"""
+import argparse
+import time
+
+import utils
+from benchmarks.standin import StandinServer, make_events
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.15)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    with StandinServer(make_events(args.events), latency=args.latency) as server:
+        utils.GAMMA_URL = f"{server.url}/events"
+
+        seq, t_seq = timed(utils.fetch_events_paginated, args.limit, concurrency=1)
+        con, t_con = timed(utils.fetch_events_paginated, args.limit, concurrency=args.concurrency)
+
+    assert [e["id"] for e in seq] == [e["id"] for e in con], "event order differs"
+
+    print(f"pages of {utils.PAGE_SIZE}, {args.latency * 1000:.0f}ms per round-trip")
+    print(f"sequential      : {len(seq):>6} events in {t_seq:6.3f}s")
+    print(f"concurrency={args.concurrency:<3}: {len(con):>6} events in {t_con:6.3f}s")
+    print(f"speedup         : {t_seq / t_con:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: serial fixed-chunk vs parallel adaptive /books fetching.
+
+Injects a handful of invalid tokens so the split-and-retry path is
+exercised, and reports how many good books each strategy recovered.
+
+Run from the repo root:
+    python -m benchmarks.bench_fetch_liquidity
+"""
+import argparse
+import time
+
+import utils
+from benchmarks.standin import StandinServer, make_events, token_prices
+
+
+def serial_fixed_chunks(token_ids, chunk_size=20):
+    """The pre-parallel strategy: one chunk at a time, failed chunks dropped."""
+    results = {}
+    for i in range(0, len(token_ids), chunk_size):
+        chunk = token_ids[i:i + chunk_size]
+        books, _ = utils._post_books(chunk)
+        if books:
+            results.update(books)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--bad", type=int, default=5, help="invalid tokens to inject")
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    token_ids = list(token_prices(events))
+    bad = [f"bad-token-{i}" for i in range(args.bad)]
+    step = max(1, len(token_ids) // (len(bad) + 1))
+    for i, t in enumerate(bad, start=1):
+        token_ids.insert(i * step, t)
+
+    with StandinServer(events, latency=args.latency, bad_tokens=bad) as server:
+        utils.CLOB_URL = f"{server.url}/books"
+
+        start = time.perf_counter()
+        serial = serial_fixed_chunks(token_ids)
+        t_serial = time.perf_counter() - start
+
+        utils.chunk_sizer = utils.ChunkSizer()
+        start = time.perf_counter()
+        books, failed = utils.fetch_liquidity(token_ids, concurrency=args.concurrency)
+        t_parallel = time.perf_counter() - start
+
+    good = len(token_ids) - len(bad)
+    print(f"{len(token_ids)} tokens ({len(bad)} invalid), {args.latency * 1000:.0f}ms per round-trip")
+    print(f"serial, fixed 20   : {len(serial):>5}/{good} books in {t_serial:6.3f}s")
+    print(f"parallel, adaptive : {len(books):>5}/{good} books in {t_parallel:6.3f}s"
+          f"  (failed: {len(failed)}, final chunk size {utils.chunk_sizer.size})")
+    print(f"speedup            : {t_serial / t_parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
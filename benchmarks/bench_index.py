@@ -0,0 +1,102 @@
+"""
+Benchmark: moving the resolution window, entry band, gates, bet size or
+exclusions, by full rescan versus a MarketIndex re-query.
+
+Runs one indexed scan against the stand-in server, then for each
+parameter change times a re-query of the index (first and repeated;
+a wider band or fewer exclusions fetch their new books on the first
+query) and a fresh `run_scanner` with the same parameters from cold
+caches, as a rescan after the cache TTL would run. Checks that every
+re-query ranks the same markets as the rescan, with fills equal up to
+float rounding.
+
+Run from the repo root:
+    python -m benchmarks.bench_index
+"""
+import argparse
+import logging
+import math
+import os
+import tempfile
+import time
+
+# Scans would each record history; not what is timed here
+os.environ["SCANNER_HISTORY"] = ""
+
+import cache  # noqa: E402
+import ratelimit  # noqa: E402
+import utils  # noqa: E402
+from benchmarks.standin import StandinServer, make_events  # noqa: E402
+from scanner import DEFAULT_EXCLUDES, WINDOW_DAYS, run_scanner  # noqa: E402
+from store import IngestStore  # noqa: E402
+from utils import make_gates  # noqa: E402
+
+CAPITAL = 1000
+MOVES = (
+    ("window 1-7 days", CAPITAL, DEFAULT_EXCLUDES, (1, 7), make_gates()),
+    ("window 3-14 days", CAPITAL, DEFAULT_EXCLUDES, (3, 14), make_gates()),
+    ("band 0.88-0.97", CAPITAL, DEFAULT_EXCLUDES, WINDOW_DAYS, make_gates(band=(0.88, 0.97))),
+    ("band 0.80-0.99", CAPITAL, DEFAULT_EXCLUDES, WINDOW_DAYS, make_gates(band=(0.80, 0.99))),
+    ("fill 90%, slip 5c", CAPITAL, DEFAULT_EXCLUDES, WINDOW_DAYS, make_gates(min_fill=0.9, max_slippage=0.05)),
+    ("bet $5000", 5000, DEFAULT_EXCLUDES, WINDOW_DAYS, make_gates()),
+    ("exclude Politics", CAPITAL, ["Politics"], WINDOW_DAYS, make_gates()),
+)
+
+
+def ranking(report):
+    return [(r["id"], r["real_entry"], r["roi"]) for r in report.results]
+
+
+def same_ranking(a, b):
+    """Same markets in the same order, with fills equal up to float rounding."""
+    # Vectorised fills round differently with the batch they land in
+    return len(a) == len(b) and all(
+        x[0] == y[0] and math.isclose(x[1], y[1], rel_tol=1e-9) and math.isclose(x[2], y[2], rel_tol=1e-9)
+        for x, y in zip(a, b)
+    )
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    value = fn(*args)
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    args = parser.parse_args()
+    logging.getLogger("Scanner").setLevel(logging.WARNING)
+    # The stand-in's end dates move with every run: start from an empty store
+    cache._store = IngestStore(os.path.join(tempfile.mkdtemp(), "ingest.sqlite3"))
+
+    with StandinServer(make_events(args.events), latency=args.latency) as server:
+        ratelimit.configure(server.url.split("//", 1)[1], 1000.0, 1000, 1000.0)
+        utils.GAMMA_URL = f"{server.url}/events"
+        utils.CLOB_URL = f"{server.url}/books"
+
+        base, scan_s = timed(run_scanner, CAPITAL, DEFAULT_EXCLUDES, WINDOW_DAYS, make_gates(), True)
+        index = base.index
+        print(f"{args.events} events, {args.latency * 1000:.0f}ms latency; indexed scan "
+              f"{scan_s:.2f}s, {len(index.records)} events, {len(index)} outcomes indexed")
+        print(f"{'change':<20} {'rescan':>8} {'re-query':>9} {'repeat':>8} {'requests':>9} {'results':>8}")
+
+        for name, capital, excludes, window, gates in MOVES:
+            requests = server.requests
+            first, first_s = timed(index.query, capital, excludes, window, gates)
+            query_requests = server.requests - requests
+            repeat, repeat_s = timed(index.query, capital, excludes, window, gates)
+            cache.event_cache.clear()
+            cache.book_cache.clear()
+            rescan, rescan_s = timed(run_scanner, capital, excludes, window, gates)
+            for report in (first, repeat):
+                if not same_ranking(ranking(report), ranking(rescan)):
+                    raise SystemExit(f"{name}: re-query ranks differently from the rescan")
+            print(f"{name:<20} {rescan_s * 1000:6.0f}ms {first_s * 1000:7.1f}ms {repeat_s * 1000:6.1f}ms "
+                  f"{query_requests:9d} {len(rescan.results):8d}")
+        print("parity: every re-query ranks as a fresh scan with the same parameters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: cold scan vs restart + rescan with the persistent ingest store.
+
+Times three cases against the stand-in Gamma server, each in a fresh
+IngestStore and a fresh rate-limit budget, as after a process restart:
+  cold            empty store: fetch + parse everything
+  restart (fresh) last sync within TTL: served from disk, no network
+  restart (stale) refetch every page, but only new or changed markets
+                  are re-parsed
+
+The fetch and the ingest (its CPU time) are reported separately: only
+the restart within the TTL skips the network, so past it the store
+saves ingest time and nothing on the fetch.
+
+Run from the repo root:
+    python -m benchmarks.bench_ingest
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import ratelimit
+import utils
+from benchmarks.standin import StandinServer, make_events, touch_events
+from store import IngestStore
+
+
+def scan(store, key, window, max_age):
+    """Returns (records, fetch seconds, ingest CPU seconds)."""
+    start = time.perf_counter()
+    records = store.load_sync(key, max_age)
+    if records is not None:
+        return records, 0.0, time.perf_counter() - start
+    raw = utils.fetch_events_paginated(limit=None, end_date_min=window[0], end_date_max=window[1])
+    fetch_s = time.perf_counter() - start
+    cpu = time.thread_time()
+    records = store.ingest(raw, key=key)
+    return records, fetch_s, time.thread_time() - cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of markets re-priced")
+    args = parser.parse_args()
+
+    now = utils.utc_now()
+    window = (now + timedelta(days=1), now + timedelta(days=30))
+    events = make_events(args.events)
+    path = os.path.join(tempfile.mkdtemp(), "ingest.sqlite3")
+
+    with StandinServer(events, latency=args.latency) as server:
+        utils.GAMMA_URL = f"{server.url}/events"
+        rows = []
+
+        for label, max_age in (("cold", 60), ("restart (fresh)", 60), ("restart (stale)", 0)):
+            if label == "restart (stale)":
+                touched = touch_events(events, args.changed)
+            # A restarted process starts with a full request budget
+            ratelimit.configure(server.url.split("//")[1], *ratelimit.DEFAULT_LIMIT)
+            before = server.requests
+            start = time.perf_counter()
+            store = IngestStore(path)
+            records, fetch_s, ingest_s = scan(store, "bench", window, max_age)
+            elapsed = time.perf_counter() - start
+            rows.append((label, elapsed, fetch_s, ingest_s, server.requests - before,
+                         store.counts["parsed"], len(records)))
+            store.close()
+
+    print(f"{args.events} events in universe, {touched} markets re-priced before the stale rescan")
+    for label, elapsed, fetch_s, ingest_s, requests, parsed, kept in rows:
+        print(f"{label:<16}: {elapsed * 1000:8.1f}ms (fetch {fetch_s * 1000:6.1f}ms, ingest CPU "
+              f"{ingest_s * 1000:6.1f}ms), {requests:>3} HTTP requests, {parsed:>5} markets parsed, {kept} events")
+
+
+if __name__ == "__main__":
+    main()
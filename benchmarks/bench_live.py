@@ -0,0 +1,79 @@
+"""
+Benchmark: live incremental re-scoring vs a full re-score per update.
+
+Replays a book snapshot plus price_change deltas from the stand-in
+WebSocket server into a LiveScanner and reports frame-to-ranked latency.
+Pass --recording to replay a JSONL file captured with `record_path`.
+
+Run from the repo root:
+    python -m benchmarks.bench_live
+"""
+import argparse
+import statistics
+import time
+
+from benchmarks.standin import ReplayServer, make_book, make_events, make_market_messages, token_prices
+from live import LiveScanner
+from orderbook import BookBatch
+from utils import ENTRY_BAND
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=400)
+    parser.add_argument("--deltas", type=int, default=2000)
+    parser.add_argument("--capital", type=float, default=2000)
+    parser.add_argument("--interval", type=float, default=0.002, help="seconds between frames")
+    parser.add_argument("--recording", help="JSONL recording to replay instead of synthetic frames")
+    args = parser.parse_args()
+
+    prices = {
+        t: p for t, p in token_prices(make_events(args.events)).items()
+        if ENTRY_BAND[0] <= p <= ENTRY_BAND[1]
+    }
+    candidates = [{"id": t, "title": t, "price_raw": p} for t, p in prices.items()]
+
+    if args.recording:
+        server = ReplayServer.from_recording(args.recording, args.interval)
+    else:
+        server = ReplayServer(make_market_messages(prices, args.deltas), args.interval)
+
+    done_at = []
+    handler_ms = []
+    with server:
+        scanner = LiveScanner(candidates, args.capital, url=server.url)
+        handle = scanner.on_message
+
+        def timed_on_message(raw):
+            start = time.perf_counter()
+            changed = handle(raw)
+            scanner.ranked()
+            done_at.append(time.perf_counter())
+            handler_ms.append((done_at[-1] - start) * 1000)
+            return changed
+
+        scanner.on_message = timed_on_message
+        scanner.start()
+        server.done.wait(120)
+        deadline = time.time() + 10
+        while len(done_at) < len(server.frames) and time.time() < deadline:
+            time.sleep(0.01)
+        scanner.stop()
+
+    latencies = [(d - s) * 1000 for s, d in zip(server.sent_at[1:], done_at[1:])]
+
+    books = {t: make_book(t, p) for t, p in prices.items()}
+    start = time.perf_counter()
+    BookBatch.from_books({t: b["asks"] for t, b in books.items()}).fill(args.capital)
+    t_full = (time.perf_counter() - start) * 1000
+
+    print(f"{len(candidates)} candidates, {len(latencies)} deltas replayed, "
+          f"{len(scanner.ranked())} live opportunities")
+    print(f"incremental re-score      : median {statistics.median(handler_ms[1:]):.3f}ms per delta")
+    print(f"incremental frame->ranked : median {statistics.median(latencies):.3f}ms, "
+          f"p99 {statistics.quantiles(latencies, n=100)[98]:.3f}ms")
+    print(f"full re-score per update  : {t_full:.3f}ms (parse + fill every book)")
+
+
+if __name__ == "__main__":
+    main()
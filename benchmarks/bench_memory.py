@@ -0,0 +1,180 @@
+"""
+Benchmark: resident memory of a scan's candidates, results, books and
+snapshot, as dicts versus the compact records.
+
+Builds a universe whose markets all land in the entry band and window,
+runs it through the ingest store, extraction and scoring until there
+are `--results` opportunities, and measures with `tracemalloc` what each
+structure keeps alive:
+
+- event records: the store's in-memory rows (descriptions replaced by
+  their hash) vs the parsed records with descriptions
+- candidates + results: `Candidate`/`Opportunity` records sharing one
+  `EventInfo` per event vs one dict per candidate and per result
+- books: cached `{"asks": Ladder}` vs the /books JSON
+- snapshot: a shared snapshot as loaded by another process, new format
+  vs candidate dicts with their descriptions
+
+Checks that the compact results equal the dicts field for field
+(descriptions read back from the store) and that the snapshot round
+trip returns the same ranking.
+
+Run from the repo root:
+    python -m benchmarks.bench_memory
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import random
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+import opportunity
+from benchmarks.standin import make_book, make_events
+from orderbook import compact_book
+from scanner import ScanReport, extract_candidates, score_candidates
+from scheduler import Snapshot
+from store import IngestStore, parse_record
+from utils import rank_key, utc_now
+
+
+def make_universe(count, seed=7):
+    """`count` events whose markets all quote inside the entry band and resolve in 2-29 days."""
+    rng = random.Random(seed)
+    now = utc_now()
+    events = make_events(count, seed)
+    for e in events:
+        e["endDate"] = (now + timedelta(days=rng.uniform(2, 29))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for m in e["markets"]:
+            yes = round(rng.uniform(0.86, 0.95), 3)
+            m["outcomePrices"] = json.dumps([str(yes), str(round(1 - yes, 3))])
+    # As decoded from Gamma: every event its own strings
+    return json.loads(json.dumps(events))
+
+
+def retained(build):
+    """(result of build(), bytes it allocated that are still alive)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, after - before
+
+
+# --- DICT LAYOUT ---
+def dict_candidate(c):
+    """A candidate as the scanner used to build it (event fields copied in, tags a list)."""
+    d = dict(c, desc=c["desc"])
+    d["tags"] = list(d["tags"])
+    return d
+
+
+def dict_results(candidates, results):
+    by_id = {c["id"]: c for c in candidates}
+    return [
+        dict(by_id[r.id], real_entry=r.real_entry, slippage=r.slippage, roi=r.roi,
+             profit=r.profit, max_liq=r.max_liq)
+        for r in results
+    ]
+
+
+def dict_snapshot_json(snapshot, desc_by_event):
+    """The snapshot file as it was: whole candidate dicts, descriptions included."""
+    candidates = [dict(dict_candidate(c), desc=desc_by_event[c.event.id]) for c in snapshot.candidates]
+    return json.dumps({"candidates": candidates, "rows": {str(k): v for k, v in snapshot.rows.items()}})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--results", type=int, default=10000)
+    parser.add_argument("--capital", type=float, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("Scanner").setLevel(logging.WARNING)
+
+    events = make_universe(args.results)
+    store = IngestStore(os.path.join(tempfile.mkdtemp(), "ingest.sqlite3"))
+    opportunity.description_source = store.description
+
+    # Grow the universe until it yields enough opportunities
+    now = utc_now()
+    while True:
+        store_records = store.ingest(events)
+        candidates = list(extract_candidates(store_records, [], ScanReport(keep_candidates=False), now=now))
+        raw_books = {c.id: make_book(c.id, c.price_raw) for c in candidates}
+        results = score_candidates(candidates, raw_books, args.capital)
+        if len(results) >= args.results:
+            break
+        events = make_universe(int(len(events) * args.results / max(len(results), 1) * 1.1) + 1)
+    kept = {r.id for r in sorted(results, key=rank_key, reverse=True)[:args.results]}
+    candidates = [c for c in candidates if c.id in kept]
+    raw_books = {t: b for t, b in raw_books.items() if t in kept}
+    # Fills round with the batch they are in: score exactly the kept ones
+    results = sorted(score_candidates(candidates, raw_books, args.capital), key=rank_key, reverse=True)
+    n = len(results)
+    desc_by_event = {e["id"]: e["description"] for e in events}
+
+    # Event records: parsed with descriptions vs a fresh store's rows, each
+    # from freshly decoded pages (only what the records keep stays alive)
+    body = json.dumps(events)
+    full_records, size_records_dict = retained(lambda: [parse_record(e) for e in json.loads(body)])
+    _, size_records = retained(
+        lambda: IngestStore(os.path.join(tempfile.mkdtemp(), "ingest.sqlite3")).ingest(json.loads(body))
+    )
+
+    def extract(records):
+        report = ScanReport(keep_candidates=False)
+        return [c for c in extract_candidates(records, [], report, now=now) if c.id in kept]
+
+    # Candidates and results: dicts (descriptions shared with the records,
+    # as before) vs compact records from the store
+    full_candidates = extract(full_records)
+    dicts, size_dicts = retained(lambda: (
+        lambda cs: (cs, dict_results(cs, results))
+    )([dict_candidate(c) for c in full_candidates]))
+    compact, size_compact = retained(lambda: (
+        lambda cs: (cs, score_candidates(cs, raw_books, args.capital))
+    )(extract(store_records)))
+    ranked = sorted(compact[1], key=rank_key, reverse=True)
+    if [dict_candidate(r) for r in ranked] != dicts[1]:
+        raise SystemExit("compact results differ from the dict results")
+
+    # Books
+    _, size_raw_books = retained(lambda: json.loads(json.dumps(raw_books)))
+    _, size_books = retained(lambda: {t: compact_book(b) for t, b in raw_books.items()})
+
+    # Snapshot as another process loads it
+    report = ScanReport()
+    report.candidates = candidates
+    snapshot = Snapshot.from_scan(report, {args.capital: results}, [], (1, 30))
+    new_json, old_json = snapshot.to_json(), dict_snapshot_json(snapshot, desc_by_event)
+    loaded, size_snapshot = retained(lambda: Snapshot.from_json(new_json))
+    _, size_snapshot_dict = retained(lambda: json.loads(old_json))
+    if loaded.results_for(args.capital) != results:
+        raise SystemExit("snapshot round trip changed the results")
+
+    rows = (
+        ("event records", size_records_dict, size_records, len(events), "per event"),
+        ("candidates + results", size_dicts, size_compact, n, "per opportunity"),
+        ("books", size_raw_books, size_books, n, "per opportunity"),
+        ("snapshot (loaded)", size_snapshot_dict, size_snapshot, n, "per opportunity"),
+    )
+    print(f"{n} opportunities from {len(events)} events")
+    print(f"{'structure':<22} {'dicts':>10} {'compact':>10} {'saved':>7}")
+    for name, old, new, count, unit in rows:
+        print(f"{name:<22} {old / count:8.0f} B {new / count:8.0f} B {1 - new / old:6.0%}  {unit}")
+    total_old = size_dicts + size_raw_books + size_snapshot_dict
+    total_new = size_compact + size_books + size_snapshot
+    print(f"{'per opportunity total':<22} {total_old / n:8.0f} B {total_new / n:8.0f} B "
+          f"{1 - total_new / total_old:6.0%}")
+    print(f"snapshot file: {len(old_json) / 1e6:.1f} MB -> {len(new_json) / 1e6:.1f} MB")
+    print(f"parity: {n} compact results equal the dicts, snapshot round trip intact")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: array-backed BookBatch vs `calculate_slippage`.
+
+First checks that both agree on a golden set of hand-built edge cases and
+random books, then times fills over thousands of books for one capital and
+for a grid of capitals.
+
+Run from the repo root:
+    python -m benchmarks.bench_orderbook
+"""
+import argparse
+import math
+import random
+import time
+
+from orderbook import BookBatch
+from utils import calculate_slippage
+
+GOLDEN_BOOKS = {
+    "empty": [],
+    "two-levels": [{"price": "0.9", "size": "100"}, {"price": "0.91", "size": "100"}],
+    "wide-spread": [
+        {"price": "0.90", "size": "100"},
+        {"price": "0.97", "size": "100"},
+        {"price": "0.98", "size": "100"},
+    ],
+    "unsorted": [
+        {"price": "0.93", "size": "500"},
+        {"price": "0.90", "size": "1000"},
+        {"price": "0.91", "size": "2000"},
+        {"price": "0.95", "size": "4000"},
+    ],
+    "exact-boundary": [
+        {"price": "0.5", "size": "2000"},
+        {"price": "0.5", "size": "2000"},
+        {"price": "0.55", "size": "2000"},
+    ],
+    "invalid-levels": [
+        {"price": "0.90", "size": "0"},
+        {"price": "bad", "size": "10"},
+        {"price": "0.92", "size": "300"},
+        {"price": "0.94", "size": None},
+        {"price": "0.95", "size": "800"},
+    ],
+    "thin": [
+        {"price": "0.96", "size": "10"},
+        {"price": "0.97", "size": "10"},
+        {"price": "0.98", "size": "10"},
+    ],
+}
+GOLDEN_CAPITALS = [-5, 0, 1, 500, 1000, 2000, 2500, 50000]
+
+
+def random_book(rng):
+    price = rng.uniform(0.5, 0.99)
+    asks = []
+    for _ in range(rng.randint(1, 40)):
+        asks.append({"price": f"{price:.3f}", "size": f"{rng.uniform(1, 5000):.2f}"})
+        price += rng.choice([0.001, 0.002, 0.01, 0.03, 0.06])
+    rng.shuffle(asks)
+    return asks
+
+
+def check_parity(books, capitals):
+    batch = BookBatch.from_books(books)
+    mismatches = 0
+    for capital in capitals:
+        arrays = batch.fill(capital)
+        for b, token_id in enumerate(batch.token_ids):
+            expected = calculate_slippage(books[token_id], capital)
+            got = tuple(a[b] for a in arrays)
+            same = bool(got[4]) == expected[4] and all(
+                math.isclose(g, e, rel_tol=1e-9, abs_tol=1e-9) for g, e in zip(got[:4], expected[:4])
+            )
+            if not same:
+                mismatches += 1
+                print(f"MISMATCH {token_id} @ {capital}: {got} != {expected}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=5000)
+    parser.add_argument("--grid", type=int, default=20, help="capitals in the grid run")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    books = {f"b{i}": random_book(rng) for i in range(args.books)}
+
+    mismatches = check_parity(GOLDEN_BOOKS, GOLDEN_CAPITALS)
+    mismatches += check_parity(dict(list(books.items())[:500]), GOLDEN_CAPITALS)
+    print(f"golden parity: {'OK' if not mismatches else f'{mismatches} mismatches'}")
+
+    capitals = [500 * (i + 1) for i in range(args.grid)]
+
+    start = time.perf_counter()
+    for asks in books.values():
+        calculate_slippage(asks, 2000)
+    t_loop_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for capital in capitals:
+        for asks in books.values():
+            calculate_slippage(asks, capital)
+    t_loop_grid = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = BookBatch.from_books(books)
+    t_parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.fill(2000)
+    t_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch.fill(capitals)
+    t_grid = time.perf_counter() - start
+
+    print(f"{args.books} books, {len(batch.prices)} valid levels")
+    print(f"parse + sort once        : {t_parse * 1000:8.1f}ms")
+    print(f"1 capital   loop / batch : {t_loop_one * 1000:8.1f}ms / {t_one * 1000:6.2f}ms"
+          f"  ({t_loop_one / t_one:.0f}x)")
+    print(f"{len(capitals):<2} capitals loop / batch : {t_loop_grid * 1000:8.1f}ms / {t_grid * 1000:6.2f}ms"
+          f"  ({t_loop_grid / t_grid:.0f}x, {t_loop_grid / (t_parse + t_grid):.1f}x incl. parse)")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: time to first actionable result, progressive vs batch scan.
+
+Both runs start from cold caches and an empty ingest store against the
+stand-in Gamma/CLOB server, reached under two host names so that, as in
+production, event pages and /books chunks draw on separate rate-limit
+budgets. Fails if the progressive scan finishes more than `--tolerance`
+times (plus a small slack) later than the batch scan.
+
+Run from the repo root:
+    python -m benchmarks.bench_progressive
+"""
+import argparse
+import os
+import tempfile
+
+# Scans would each record history; not what is timed here
+os.environ["SCANNER_HISTORY"] = ""
+
+import cache  # noqa: E402
+import utils  # noqa: E402
+from benchmarks.standin import StandinServer, make_events  # noqa: E402
+from scanner import DEFAULT_EXCLUDES, iter_scan  # noqa: E402
+from store import IngestStore  # noqa: E402
+
+SLACK_S = 0.05
+
+
+def cold_scan(chunk_size):
+    cache.event_cache.clear()
+    cache.book_cache.clear()
+    cache._store = IngestStore(os.path.join(tempfile.mkdtemp(), "ingest.sqlite3"))
+    for report, _ in iter_scan(2000, DEFAULT_EXCLUDES, chunk_size=chunk_size):
+        pass
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--chunk", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with StandinServer(make_events(args.events), latency=args.latency) as server:
+        utils.GAMMA_URL = f"{server.url}/events"
+        utils.CLOB_URL = f"{server.url.replace('127.0.0.1', 'localhost')}/books"
+        batch = cold_scan(None)
+        progressive = cold_scan(args.chunk)
+
+    assert [r["id"] for r in batch.results] == [r["id"] for r in progressive.results]
+
+    print(f"{args.events} events, {args.latency * 1000:.0f}ms per round-trip, "
+          f"{len(batch.results)} opportunities")
+    for label, report in (("batch", batch), (f"progressive/{args.chunk}", progressive)):
+        print(f"{label:<15}: first result {report.first_result_s:6.2f}s, full scan {report.elapsed_s:6.2f}s")
+    if progressive.elapsed_s > batch.elapsed_s * args.tolerance + SLACK_S:
+        raise SystemExit(
+            f"progressive full scan {progressive.elapsed_s:.2f}s is slower than "
+            f"{args.tolerance}x the batch scan ({batch.elapsed_s:.2f}s)"
+        )
+    print(f"full scan within {args.tolerance}x of batch (+{SLACK_S * 1000:.0f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark: concurrent scans against a rate-limited stand-in server,
+with and without the shared token-bucket limiter.
+
+Several threads each run a full event + book fetch at once, like several
+dashboard sessions scanning together. Reports 429s seen by the server,
+data lost, and wall-clock time.
+
+Run from the repo root:
+    python -m benchmarks.bench_ratelimit
+"""
+import argparse
+import threading
+import time
+
+import ratelimit
+import requests
+import transport
+import utils
+from benchmarks.standin import StandinServer, make_events, token_prices
+from urllib3.util.retry import Retry
+
+
+def unlimited_session():
+    """The pre-limiter session: urllib3 status retries, no shared budget (same pool size)."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = requests.adapters.HTTPAdapter(max_retries=retries, pool_maxsize=transport.POOL_SIZE)
+    session.mount("http://", adapter)
+    return session
+
+
+def run_scans(scans, events_wanted, tokens):
+    complete = []
+
+    def scan():
+        events = utils.fetch_events_paginated(limit=None)
+        books, failed = utils.fetch_liquidity(tokens)
+        complete.append(len(events) == events_wanted and not failed)
+
+    threads = [threading.Thread(target=scan) for _ in range(scans)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(complete), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--scans", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=20, help="server limit, requests/sec")
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    tokens = list(token_prices(events))[:400]
+
+    for label in ("no limiter", "shared limiter"):
+        with StandinServer(events, latency=0.02, rate_limit=args.rate) as server:
+            utils.GAMMA_URL = f"{server.url}/events"
+            utils.CLOB_URL = f"{server.url}/books"
+            if label == "no limiter":
+                utils.session = unlimited_session()
+            else:
+                utils.session = utils.get_session()
+                host = server.url.split("//")[1]
+                ratelimit.configure(host, rate=args.rate * 0.8, burst=int(args.rate), max_rate=args.rate)
+            ok, elapsed = run_scans(args.scans, args.events, tokens)
+            print(f"{label:<15}: {ok}/{args.scans} scans complete, {server.throttled:>4} x 429, "
+                  f"{server.requests:>4} requests, {elapsed:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: dashboard render time for 50, 500 and 5,000 opportunities,
+one card element and button per opportunity vs one batched page.
+
+Runs the real dashboard (main.py) headless with Streamlit's AppTest and
+a synthetic result list in session state; the per-card layout is timed
+with the same card HTML. The paged times include the whole dashboard
+(sidebar and all), so its fixed cost is printed first. No network
+access needed.
+
+Run from the repo root:
+    python -m benchmarks.bench_render
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# No scheduler, snapshot, history or shared audit database for the runs
+_tmp = tempfile.mkdtemp()
+os.environ.update(
+    SCANNER_REFRESH="0", SCANNER_HISTORY="", SCANNER_SNAPSHOT=os.path.join(_tmp, "snapshot.json"),
+    SCANNER_DB=os.path.join(_tmp, "ingest.sqlite3"),
+)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from cards import PAGE_SIZE  # noqa: E402
+
+SIZES = (50, 500, 5000)
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+
+def make_results(count):
+    return [
+        {
+            "id": f"tok{n}", "title": f"Will synthetic event {n} resolve Yes?", "slug": f"event-{n}",
+            "desc": "Synthetic.", "target_outcome": "Yes", "tags": ["Economy", "Finance"],
+            "real_entry": 0.93, "roi": 7.5 - n * 1e-4, "profit": 150.0, "volume": 125000.0,
+            "max_liq": 20000.0, "slippage": 0.004, "date_str": "Nov 02", "days": 16,
+            "end_date_iso": "2026-11-02T00:00:00Z",
+        }
+        for n in range(count)
+    ]
+
+
+def per_card_app(items):
+    """The previous layout: one markdown element and one button per opportunity."""
+    import streamlit as st
+
+    from cards import card_html
+
+    for i, item in enumerate(items):
+        st.markdown(card_html(item, i + 1), unsafe_allow_html=True)
+        st.button("Red Team Audit 🛡", key=f"audit_{item['id']}")
+
+
+def timed_runs(at, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        at.run(timeout=120)
+        times.append(time.perf_counter() - start)
+        assert not at.exception, at.exception
+    return statistics.median(times)
+
+
+def page_stats(at):
+    html = sum(len(m.value) for m in at.markdown if 'class="card"' in m.value)
+    elements = sum(1 for m in at.markdown if 'class="card"' in m.value) + len(at.button)
+    return elements, html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    empty = AppTest.from_file(MAIN, default_timeout=120)
+    empty.run()
+    print(f"dashboard without results: {timed_runs(empty, args.repeat) * 1000:.0f}ms per rerun")
+    print(f"{'rows':>6} {'layout':>9} {'rerun':>9} {'elements':>9} {'card HTML':>10}")
+    for size in SIZES:
+        items = make_results(size)
+
+        legacy = AppTest.from_function(per_card_app, args=(items,), default_timeout=120)
+        legacy.run()
+        legacy_s = timed_runs(legacy, args.repeat)
+        elements, html = page_stats(legacy)
+        print(f"{size:6d} {'per-card':>9} {legacy_s * 1000:7.0f}ms {elements:9d} {html / 1e3:8.0f}kB")
+
+        paged = AppTest.from_file(MAIN, default_timeout=120)
+        paged.session_state.data = items
+        paged.run()
+        paged_s = timed_runs(paged, args.repeat)
+        elements, html = page_stats(paged)
+        assert html and sum('class="card"' in m.value for m in paged.markdown) == 1
+        print(f"{size:6d} {'paged':>9} {paged_s * 1000:7.0f}ms {elements:9d} {html / 1e3:8.0f}kB "
+              f"({legacy_s / paged_s:.1f}x, page size {PAGE_SIZE}, whole dashboard)")
+
+        # Opening an audit panel (in the browser, a rerun of the card list fragment only)
+        paged.button(key="cards_audit").click().run()
+        assert any("Forensic Auditor" in m.value for m in paged.markdown)
+
+
+if __name__ == "__main__":
+    main()
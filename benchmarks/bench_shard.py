@@ -0,0 +1,110 @@
+"""
+Benchmark: single-process scan vs the sharded process-pool scan on a
+synthetic universe of about 50,000 markets.
+
+Gamma pages are pre-encoded and books pre-built, so only the CPU work
+(decode, parse, filter, fill, gates, ranking) is timed. Each page
+repeats the previous page's last event, as when volume shifts between
+page requests. Checks that every worker count returns the
+single-process ranking (fills equal up to float rounding: a batch's
+cumulative sums depend on its books) and the same event, market and
+rejection counts.
+
+Run from the repo root:
+    python -m benchmarks.bench_shard --workers 1 2 4 8
+"""
+import argparse
+import json
+import os
+import time
+
+# Neither path records history here (run_scanner and the sharded scan both would)
+os.environ["SCANNER_HISTORY"] = ""
+
+import numpy as np  # noqa: E402
+
+from benchmarks.standin import make_book, make_events  # noqa: E402
+from gamma import decode_events  # noqa: E402
+from scanner import DEFAULT_EXCLUDES, ScanReport, iter_opportunities  # noqa: E402
+from shard import scan_sharded  # noqa: E402
+from store import parse_record  # noqa: E402
+from utils import ENTRY_BAND, PAGE_SIZE, rank_key  # noqa: E402
+
+WINDOW = (0, 60)
+
+
+def serial_scan(pages, capital, fetch_books):
+    """What run_scanner does, over the same pages and books. Returns (results, counts)."""
+    report = ScanReport()
+    # The Gamma walk keeps each event once, from the first page it is on
+    seen = set()
+    raw = (e for body in pages for e in decode_events(body) if not (e["id"] in seen or seen.add(e["id"])))
+    records = (parse_record(e) for e in raw)
+    results = list(iter_opportunities(
+        records, capital, DEFAULT_EXCLUDES, report, fetch_books=fetch_books,
+        chunk_size=None, window_days=WINDOW,
+    ))
+    results.sort(key=rank_key, reverse=True)
+    return results, counts(report)
+
+
+def counts(report):
+    return report.events, report.markets, dict(report.rejections)
+
+
+def same_results(got, expected):
+    if [r["id"] for r in got] != [r["id"] for r in expected]:
+        return False
+    numbers = ("real_entry", "slippage", "roi", "profit", "max_liq")
+    return all(
+        np.isclose(g[k], e[k]) if k in numbers else g[k] == e[k]
+        for g, e in zip(got, expected) for k in e
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=25000, help="about 2 markets per event")
+    parser.add_argument("--capital", type=float, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    pages = [
+        json.dumps(events[max(i - 1, 0):i + PAGE_SIZE]).encode() for i in range(0, len(events), PAGE_SIZE)
+    ]
+    markets = sum(len(e["markets"]) for e in events)
+    books = {}
+    for e in events:
+        for m in e["markets"]:
+            for token_id, price in zip(json.loads(m["clobTokenIds"]), json.loads(m["outcomePrices"])):
+                if ENTRY_BAND[0] <= float(price) <= ENTRY_BAND[1]:
+                    books[token_id] = make_book(token_id, float(price))
+
+    def fetch_books(ids):
+        return {t: books[t] for t in ids if t in books}, []
+
+    start = time.perf_counter()
+    expected, expected_counts = serial_scan(pages, args.capital, fetch_books)
+    serial_s = time.perf_counter() - start
+    print(f"{markets} markets in {len(pages)} pages, {len(books)} books, {os.cpu_count()} CPUs")
+    print(f"single process : {serial_s:6.2f}s, {len(expected)} opportunities")
+
+    for workers in args.workers:
+        start, cpu = time.perf_counter(), time.process_time()
+        report = scan_sharded(
+            args.capital, DEFAULT_EXCLUDES, WINDOW, workers, pages=pages, fetch_books=fetch_books
+        )
+        elapsed, cpu = time.perf_counter() - start, time.process_time() - cpu
+        assert same_results(report.results, expected), f"{workers} workers: results differ"
+        assert counts(report) == expected_counts, f"{workers} workers: counts differ"
+        stages = " | ".join(f"{k} {v:.2f}s" for k, v in report.stage_times().items() if v)
+        print(f"{workers:2d} workers     : {elapsed:6.2f}s ({serial_s / elapsed:.2f}x), parent CPU {cpu:.2f}s "
+              f"[{stages}]")
+    # The parent's own CPU time (dispatch, candidate rebuild, packing,
+    # merge) is the serial part left; it bounds the speedup on many cores.
+    print(f"speedup bound from the parent's serial work: {serial_s / cpu:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: dashboard cold start, with an import-time breakdown.
+
+Prints where the dashboard's imports spend their time (`python -X
+importtime`), then boots the real dashboard (main.py) headless with
+Streamlit's AppTest in a fresh interpreter and times, from process
+start, the first render and the first useful screen (one with
+opportunity cards):
+
+- no snapshot: nothing persisted yet, so the first screen waits for the
+  scheduler's first scan (AppTest reruns stand in for the poll fragment)
+- stale snapshot + pandas: the previous boot, importing pandas and
+  rescanning on boot while the persisted snapshot renders (without
+  pandas where it is not installed)
+- fresh snapshot: a restart within the refresh interval; the persisted
+  snapshot renders at once and the rescan waits until it falls due
+
+Runs against the stand-in API server; no network access needed.
+
+Run from the repo root:
+    python -m benchmarks.bench_startup
+"""
+import argparse
+import ast
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.standin import StandinServer, make_events
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT, "main.py")
+# pandas is no longer a dependency: compare against it only where it is installed
+HAS_PANDAS = importlib.util.find_spec("pandas") is not None
+
+
+# --- IMPORT TIME ---
+def main_imports():
+    """main.py's top-level import statements, as source."""
+    with open(MAIN) as f:
+        tree = ast.parse(f.read())
+    return "\n".join(
+        ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def import_times(code):
+    """{top-level module: cumulative import seconds} for running `code`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, capture_output=True, text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):  # nested imports are indented
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+# --- FIRST SCREEN ---
+def child(with_pandas):
+    """Boot the dashboard and print when the first render and first cards landed."""
+    t0 = float(os.environ["BENCH_T0"])
+    if with_pandas:
+        import pandas  # noqa: F401  (the import main.py used to make)
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(MAIN, default_timeout=120)
+    render_s = useful_s = None
+    reruns = 0
+    while useful_s is None and time.time() - t0 < 120:
+        at.run()
+        assert not at.exception, at.exception
+        if render_s is None:
+            render_s = time.time() - t0
+        if any('class="card"' in m.value for m in at.markdown):
+            useful_s = time.time() - t0
+        else:
+            reruns += 1
+            time.sleep(0.25)
+    print(json.dumps({"render_s": render_s, "useful_s": useful_s, "reruns": reruns}))
+
+
+def boot(env, with_pandas=False):
+    env = dict(os.environ, **env, BENCH_T0=str(time.time()))
+    cmd = [sys.executable, "-m", "benchmarks.bench_startup", "--child"]
+    if with_pandas:
+        cmd.append("--with-pandas")
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def age_snapshot(path, seconds):
+    """Backdate a persisted snapshot, as if the dashboard had been down for `seconds`."""
+    with open(path) as f:
+        data = json.load(f)
+    data["created_at"] -= seconds
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--with-pandas", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.with_pandas)
+
+    imports = main_imports()
+    interpreter = import_times("pass")  # site, encodings, ...: paid by any Python process
+    times = {k: v for k, v in import_times(imports).items() if k not in interpreter}
+    print(f"main.py imports: {sum(times.values()) * 1000:.0f}ms")
+    for name, seconds in sorted(times.items(), key=lambda kv: kv[1], reverse=True)[:10]:
+        print(f"  {name:<24} {seconds * 1000:6.0f}ms")
+    if HAS_PANDAS:
+        pandas_s = import_times(f"{imports}\nimport pandas").get("pandas", 0.0)
+        print(f"  {'pandas (no longer)':<24} {pandas_s * 1000:6.0f}ms")
+    else:
+        print(f"  {'pandas (no longer)':<24} not installed, skipped")
+
+    with StandinServer(make_events(args.events), latency=args.latency) as server:
+        tmp = tempfile.mkdtemp()
+        snapshot = os.path.join(tmp, "snapshot.json")
+        env = dict(
+            GAMMA_URL=f"{server.url}/events", CLOB_URL=f"{server.url}/books", SCANNER_REFRESH="600",
+            SCANNER_HISTORY="", SCANNER_SNAPSHOT=snapshot, SCANNER_DB=os.path.join(tmp, "ingest.sqlite3"),
+        )
+
+        print(f"\n{args.events} events, {args.latency * 1000:.0f}ms latency, median of {args.repeat} boots")
+        print(f"{'boot':<28} {'first render':>12} {'first cards':>12}")
+        scenarios = (
+            ("no snapshot", False, None),
+            ("stale snapshot + pandas", True, 3600) if HAS_PANDAS else ("stale snapshot", False, 3600),
+            ("fresh snapshot", False, 0),
+        )
+        for name, with_pandas, age in scenarios:
+            runs = []
+            for _ in range(args.repeat):
+                if age is None and os.path.exists(snapshot):
+                    os.remove(snapshot)
+                elif age is not None and not os.path.exists(snapshot):
+                    boot(env)  # persist one
+                if age:
+                    age_snapshot(snapshot, age)
+                runs.append(boot(env, with_pandas))
+            render = statistics.median(r["render_s"] for r in runs)
+            useful = statistics.median(r["useful_s"] or float("nan") for r in runs)
+            print(f"{name:<28} {render * 1000:10.0f}ms {useful * 1000:10.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: tag exclusion, nested substring loop vs compiled matcher.
+
+Checks that both give the same verdict for every event, then times a
+scan-sized pass over synthetic events at several universe sizes, for the
+default exclusion set and a long one.
+
+Run from the repo root:
+    python -m benchmarks.bench_tags
+"""
+import argparse
+import random
+import time
+
+from benchmarks.standin import TAG_POOL
+from scanner import DEFAULT_EXCLUDES, TagMatcher
+
+
+def nested_loop(tag_lists, forbidden_tags):
+    """The original per-scan filter."""
+    forbidden_lower = [f.lower() for f in forbidden_tags]
+    verdicts = []
+    for tags in tag_lists:
+        is_forbidden = False
+        for t in tags:
+            t_lower = t.lower()
+            for bad in forbidden_lower:
+                if bad in t_lower:
+                    is_forbidden = True
+                    break
+            if is_forbidden:
+                break
+        verdicts.append(is_forbidden)
+    return verdicts
+
+
+def make_tag_lists(count, seed=7):
+    """Tag lists drawn from a realistic, repeating vocabulary of labels."""
+    rng = random.Random(seed)
+    vocabulary = TAG_POOL + [f"{t} {n}" for t in TAG_POOL for n in range(20)]
+    vocabulary += ["NBA Finals", "Pop-Culture", "memecoins", "Twitter Spaces", "US Politics"]
+    return [rng.sample(vocabulary, rng.randint(1, 6)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    long_excludes = DEFAULT_EXCLUDES + [f"{t} {n}" for t in ("Esports", "Weather") for n in range(20)]
+    for label, excludes in (("default", DEFAULT_EXCLUDES), ("long", long_excludes)):
+        print(f"{label} exclusion set ({len(excludes)} tags)")
+        for size in args.sizes:
+            tag_lists = make_tag_lists(size)
+
+            start = time.perf_counter()
+            expected = nested_loop(tag_lists, excludes)
+            loop_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            matcher = TagMatcher(excludes)
+            got = [matcher.excluded(tags) for tags in tag_lists]
+            matcher_s = time.perf_counter() - start
+
+            assert got == expected
+            print(f"  {size:>6} events ({sum(got)} excluded): loop {loop_s * 1000:7.1f}ms, "
+                  f"matcher {matcher_s * 1000:6.1f}ms ({loop_s / matcher_s:.1f}x), "
+                  f"{matcher_s / size * 1e6:.2f}us/event")
+
+
+if __name__ == "__main__":
+    main()
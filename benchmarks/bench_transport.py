@@ -0,0 +1,115 @@
+"""
+Benchmark: one scan's network fetch (every Gamma page, then every order
+book) over the HTTP transports.
+
+- HTTP/1.1 uncompressed, cold: requests, `Accept-Encoding: identity`,
+  connections opened on demand
+- HTTP/1.1 gzip/br, pre-warmed: the default requests session
+- HTTP/2 gzip/br, pre-warmed: the httpx session, multiplexed
+
+Runs against the stand-in server with a per-connection handshake delay
+and a bandwidth cap, padded to realistic Gamma event sizes; each mode
+gets a fresh server and session. Checks that every mode fetches the
+same events and books, and reports time, bytes on the wire and decoded,
+connections opened, connection reuse and mean request latency (from
+`metrics`).
+
+Run from the repo root:
+    python -m benchmarks.bench_transport
+"""
+import argparse
+import logging
+import time
+
+import metrics
+import ratelimit
+import transport
+import utils
+from benchmarks.bench_decode import pad_event
+from benchmarks.standin import StandinServer, make_events
+
+MODES = (
+    ("HTTP/1.1 uncompressed, cold", "requests", "0", False, False),
+    ("HTTP/1.1 gzip/br, pre-warmed", "requests", "0", True, True),
+    ("HTTP/2 gzip/br, pre-warmed", "httpx", "prior", True, True),
+)
+
+
+def fetch_all():
+    """Every event (pages arrive in any order), then all their books. Returns (ids, books, timings)."""
+    start = time.perf_counter()
+    events = [e for page in utils.iter_event_pages() for e in page]
+    events_s = time.perf_counter() - start
+
+    token_ids = [t for e in events for m in e["markets"] for t in m.get("clobTokenIds") or []]
+    start = time.perf_counter()
+    books, failed_ids = utils.fetch_liquidity(token_ids)
+    books_s = time.perf_counter() - start
+    assert not failed_ids, failed_ids
+    return sorted(e["id"] for e in events), books, events_s, books_s
+
+
+def run(events, mode, args):
+    name, kind, http2, compressed, warm = mode
+    with StandinServer(
+        events, latency=args.latency, compress=True, handshake=args.handshake,
+        bandwidth=args.bandwidth * 1e6, http2=http2 == "prior",
+    ) as server:
+        host = server.url.split("//", 1)[1]
+        ratelimit.configure(host, 1000.0, 1000, 1000.0)  # time the transport, not the budget
+        utils.GAMMA_URL = f"{server.url}/events"
+        utils.CLOB_URL = f"{server.url}/books"
+        utils.session = transport.get_session(kind, http2)
+        if not compressed:
+            utils.session.headers["Accept-Encoding"] = "identity"
+
+        start = time.perf_counter()
+        if warm:
+            for thread in utils.prewarm([utils.GAMMA_URL, utils.CLOB_URL]):
+                thread.join()
+        ids, books, events_s, books_s = fetch_all()
+        elapsed = time.perf_counter() - start
+        utils.session.close()
+
+    endpoints = {k: v for k, v in metrics.http_summary().items() if k.startswith(host + "/")}
+    requests = sum(v["requests"] for v in endpoints.values())
+    return {
+        "name": name, "ids": ids, "books": books, "elapsed": elapsed, "events_s": events_s,
+        "books_s": books_s, "wire": sum(v["wire_bytes"] for v in endpoints.values()),
+        "decoded": sum(v["bytes"] for v in endpoints.values()),
+        "connections": server.connections, "reuse": metrics.connection_summary()[host]["reuse"],
+        "mean_ms": sum(v["mean_s"] * v["requests"] for v in endpoints.values()) / requests * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per request")
+    parser.add_argument("--handshake", type=float, default=0.15, help="seconds per new connection")
+    parser.add_argument("--bandwidth", type=float, default=5.0, help="MB/s per response")
+    args = parser.parse_args()
+    logging.getLogger("Scanner").setLevel(logging.WARNING)
+
+    events = [pad_event(e, n) for n, e in enumerate(make_events(args.events))]
+    print(f"{args.events} events, {args.latency * 1000:.0f}ms latency, "
+          f"{args.handshake * 1000:.0f}ms handshake, {args.bandwidth:.0f} MB/s")
+    print(f"{'transport':<30} {'total':>7} {'events':>7} {'books':>7} {'wire MB':>8} "
+          f"{'decoded':>8} {'conns':>6} {'reuse':>6} {'mean':>7}")
+
+    baseline = None
+    for mode in MODES:
+        r = run(events, mode, args)
+        if baseline is None:
+            baseline = r
+        elif r["ids"] != baseline["ids"] or r["books"] != baseline["books"]:
+            raise SystemExit(f"{r['name']}: fetched data differs from {baseline['name']}")
+        print(f"{r['name']:<30} {r['elapsed']:6.2f}s {r['events_s']:6.2f}s {r['books_s']:6.2f}s "
+              f"{r['wire'] / 1e6:8.2f} {r['decoded'] / 1e6:8.2f} {r['connections']:6d} "
+              f"{r['reuse']:6.1%} {r['mean_ms']:5.0f}ms")
+    print(f"parity: every mode fetched the same {len(baseline['ids'])} events and "
+          f"{len(baseline['books'])} books")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Record live Gamma /events pages and CLOB /books responses as a fixture.
+
+The fixture is a gzipped JSON file holding the events (as projected by
+`gamma.decode_events`), the raw book entries for every candidate-band
+token, and the recording time, so the replay can shift end dates to keep
+the same resolution window.
+
+Run from the repo root (needs network access):
+    python -m benchmarks.record benchmarks/fixtures/gamma-clob.json.gz
+"""
+import argparse
+import gzip
+import json
+from datetime import timedelta
+
+from store import parse_record
+from utils import ENTRY_BAND, fetch_events_paginated, fetch_liquidity, utc_now
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", help="output .json.gz fixture")
+    parser.add_argument("--limit", type=int, default=None, help="max events (default: whole window)")
+    parser.add_argument("--days", type=int, default=30, help="end-date window to record")
+    args = parser.parse_args()
+
+    now = utc_now()
+    events = fetch_events_paginated(limit=args.limit, end_date_max=now + timedelta(days=args.days))
+
+    token_ids = []
+    for e in events:
+        for m in parse_record(e)["markets"]:
+            for token_id, price in zip(m["token_ids"], m["prices"]):
+                if ENTRY_BAND[0] <= price <= ENTRY_BAND[1]:
+                    token_ids.append(token_id)
+    books, failed = fetch_liquidity(token_ids)
+
+    with gzip.open(args.path, "wt") as f:
+        json.dump({"recorded_at": now.isoformat(), "events": events, "books": books}, f)
+    print(f"recorded {len(events)} events and {len(books)} books ({len(failed)} failed) to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
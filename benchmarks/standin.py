@@ -0,0 +1,584 @@
+"""
+Local stand-in for the Polymarket APIs.
+
+Serves synthetic Gamma `/events` pages and CLOB `/books` batches over
+plain HTTP/1.1 or HTTP/2 with configurable per-request latency,
+compression and failure injection, replays market-channel frames over a
+WebSocket, and answers OpenAI-compatible chat completions, so fetch,
+streaming and audit paths can be benchmarked without the network.
+"""
+import asyncio
+import gzip
+import json
+import random
+import socket
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from utils import utc_now
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TAG_POOL = [
+    "Politics", "Crypto", "Sports", "Economy", "Tech", "Memecoin",
+    "Elections", "Tweet Markets", "Pop Culture", "Geopolitics", "Business",
+]
+
+
+def make_events(count, seed=7):
+    """Build `count` synthetic Gamma events, ordered by volume descending."""
+    rng = random.Random(seed)
+    now = utc_now()
+    events = []
+
+    for n in range(count):
+        end_date = now + timedelta(days=rng.uniform(0, 60))
+        markets = []
+        for k in range(rng.randint(1, 3)):
+            yes = round(rng.uniform(0.02, 0.99), 3)
+            markets.append({
+                "id": f"m{n}-{k}",
+                "updatedAt": "2026-01-01T00:00:00Z",
+                "outcomes": json.dumps(["Yes", "No"]),
+                "outcomePrices": json.dumps([str(yes), str(round(1 - yes, 3))]),
+                "clobTokenIds": json.dumps([f"tok{n}-{k}-y", f"tok{n}-{k}-n"]),
+                "volume": str(round(rng.uniform(1e3, 1e6), 2)),
+            })
+        events.append({
+            "id": str(n),
+            "title": f"Synthetic event {n}",
+            "description": "Resolves per the synthetic oracle. " * 20,
+            "slug": f"synthetic-event-{n}",
+            "endDate": end_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "updatedAt": "2026-01-01T00:00:00Z",
+            "tags": [{"label": t} for t in rng.sample(TAG_POOL, 3)],
+            "volume": 1e7 / (n + 1),
+            "markets": markets,
+        })
+
+    return events
+
+
+def touch_events(events, fraction, seed=7):
+    """Re-price a random `fraction` of markets in place, as a later scan would see."""
+    rng = random.Random(seed)
+    touched = 0
+    for e in events:
+        for m in e["markets"]:
+            if rng.random() < fraction:
+                yes = round(rng.uniform(0.02, 0.99), 3)
+                m["outcomePrices"] = json.dumps([str(yes), str(round(1 - yes, 3))])
+                m["updatedAt"] = utc_now().strftime("%Y-%m-%dT%H:%M:%SZ")
+                e["updatedAt"] = m["updatedAt"]
+                touched += 1
+    return touched
+
+
+def make_book(token_id, price, seed=7, levels=8):
+    """Build a synthetic CLOB book whose best ask sits at `price`."""
+    rng = random.Random(f"{seed}:{token_id}")
+    asks = []
+    level_price = price
+    for _ in range(levels):
+        asks.append({"price": f"{min(level_price, 0.999):.3f}", "size": f"{rng.uniform(50, 5000):.2f}"})
+        level_price += rng.choice([0.001, 0.002, 0.005, 0.01])
+    bids = [{"price": f"{max(price - 0.01, 0.001):.3f}", "size": "100"}]
+    rng.shuffle(asks)  # the CLOB does not promise sorted levels
+    return {"asset_id": token_id, "market": token_id.rsplit("-", 1)[0], "asks": asks, "bids": bids}
+
+
+def token_prices(events):
+    """Map every clobTokenId in `events` to its quoted outcome price."""
+    prices = {}
+    for e in events:
+        for m in e.get("markets", []):
+            ids = json.loads(m["clobTokenIds"])
+            quotes = json.loads(m["outcomePrices"])
+            for token_id, quote in zip(ids, quotes):
+                prices[token_id] = float(quote)
+    return prices
+
+
+class StandinServer:
+    """
+    Threaded HTTP server emulating the Gamma and CLOB APIs.
+
+    `bad_tokens` makes any /books batch containing one of them fail with a
+    400, the way the CLOB rejects a batch with an unknown token.
+    `error_rate` fails that fraction of all requests with a 500.
+    `rate_limit` (requests/sec, with a burst of the same size) answers
+    requests over budget with a 429 and a Retry-After header.
+    `books` maps token IDs to recorded /books entries; other tokens get
+    synthetic books.
+    `compress` brotli- or gzip-encodes bodies for clients that accept it,
+    `handshake` delays every new connection (standing in for the TCP and
+    TLS round trips), `bandwidth` (bytes/sec) delays each response by its
+    size on the wire, and `http2` serves HTTP/2 with prior knowledge
+    instead of HTTP/1.1 (needs `h2`). `connections` counts accepted
+    connections, `book_tokens` token IDs asked of /books and `bytes_sent`
+    response body bytes.
+    Use as a context manager; `url` points at the server root.
+    """
+
+    def __init__(self, events=None, latency=0.05, bad_tokens=(), error_rate=0.0, seed=7,
+                 rate_limit=None, books=None, compress=False, handshake=0.0, bandwidth=None,
+                 http2=False):
+        self.events = events if events is not None else make_events(400)
+        self.prices = token_prices(self.events)
+        self.books = books or {}
+        self.latency = latency
+        self.bad_tokens = set(bad_tokens)
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.compress = compress
+        self.handshake = handshake
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.throttled = 0
+        self.connections = 0
+        self.book_tokens = 0
+        self.bytes_sent = 0
+        self._allowance = float(rate_limit or 0)
+        self._allowance_at = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if http2:
+            self._httpd = H2Server(self)
+        else:
+            self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}"
+
+    def on_connect(self):
+        with self._lock:
+            self.connections += 1
+        time.sleep(self.handshake)
+
+    def _begin(self):
+        """Count the request and apply latency; an error response if it should fail."""
+        with self._lock:
+            self.requests += 1
+            failing = self._rng.random() < self.error_rate
+            throttled = False
+            if self.rate_limit:
+                now = time.monotonic()
+                self._allowance = min(
+                    self.rate_limit,
+                    self._allowance + (now - self._allowance_at) * self.rate_limit,
+                )
+                self._allowance_at = now
+                if self._allowance < 1:
+                    throttled = True
+                    self.throttled += 1
+                else:
+                    self._allowance -= 1
+        if throttled:
+            return 429, {"error": "rate limited"}, {"Retry-After": "1"}
+        time.sleep(self.latency)
+        if failing:
+            return 500, {"error": "injected failure"}, {}
+        return None
+
+    def _route(self, method, path, body):
+        """(status, JSON payload, extra headers) for one request."""
+        error = self._begin()
+        if error:
+            return error
+
+        parsed = urlparse(path)
+        if parsed.path == "/" and method in ("GET", "HEAD"):
+            return 200, "OK", {}
+
+        if parsed.path == "/events" and method in ("GET", "HEAD"):
+            query = parse_qs(parsed.query)
+            limit = int(query.get("limit", ["100"])[0])
+            offset = int(query.get("offset", ["0"])[0])
+            events = self.events
+            # ISO timestamps in one format compare correctly as strings
+            if "end_date_min" in query:
+                events = [e for e in events if e["endDate"] >= query["end_date_min"][0]]
+            if "end_date_max" in query:
+                events = [e for e in events if e["endDate"] <= query["end_date_max"][0]]
+            return 200, events[offset:offset + limit], {}
+
+        if parsed.path == "/books" and method == "POST":
+            token_ids = [str(item.get("token_id")) for item in json.loads(body or b"[]")]
+            with self._lock:
+                self.book_tokens += len(token_ids)
+            if self.bad_tokens.intersection(token_ids):
+                return 400, {"error": "invalid token id"}, {}
+
+            books = []
+            for t in token_ids:
+                if t in self.books:
+                    books.append(self.books[t])
+                elif t in self.prices:
+                    books.append(make_book(t, self.prices[t]))
+            return 200, books, {}
+
+        return 404, {"error": "not found"}, {}
+
+    def respond(self, method, path, body=b"", accept_encoding=""):
+        """(status, headers, body bytes) for one request, compressed if enabled and accepted."""
+        status, payload, headers = self._route(method, path, body)
+        data = json.dumps(payload).encode()
+        headers = dict(headers, **{"Content-Type": "application/json"})
+
+        accepted = {e.split(";")[0].strip() for e in accept_encoding.split(",")}
+        if self.compress and "br" in accepted and brotli:
+            data = brotli.compress(data, quality=4)
+            headers["Content-Encoding"] = "br"
+        elif self.compress and "gzip" in accepted:
+            data = gzip.compress(data, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+
+        if method != "HEAD":
+            with self._lock:
+                self.bytes_sent += len(data)
+            if self.bandwidth:
+                time.sleep(len(data) / self.bandwidth)
+        return status, headers, data
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                server.on_connect()
+
+            def _reply(self, method, body=b""):
+                status, headers, data = server.respond(
+                    method, self.path, body, self.headers.get("Accept-Encoding", "")
+                )
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_HEAD(self):
+                self._reply("HEAD")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._reply("POST", self.rfile.read(length))
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class H2Server:
+    """
+    Minimal threaded HTTP/2 server (cleartext, prior knowledge) answering
+    through a StandinServer's `respond`. Each stream is answered on its
+    own thread, so requests on one connection are served concurrently.
+    """
+
+    def __init__(self, standin):
+        self.standin = standin
+        self.socket = socket.create_server(("127.0.0.1", 0))
+        self.server_address = self.socket.getsockname()
+
+    def serve_forever(self):
+        while True:
+            try:
+                sock, _ = self.socket.accept()
+            except OSError:
+                return  # closed by shutdown
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _serve(self, sock):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.exceptions
+
+        self.standin.on_connect()
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        # Guards `conn` and the socket; notified when flow control may have opened
+        lock = threading.Condition()
+        requests = {}
+        with lock:
+            conn.initiate_connection()
+            sock.sendall(conn.data_to_send())
+
+        with sock:
+            while True:
+                try:
+                    data = sock.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                with lock:
+                    try:
+                        events = conn.receive_data(data)
+                    except h2.exceptions.StreamClosedError:
+                        events = []  # a frame for a stream already answered
+                    for event in events:
+                        if isinstance(event, h2.events.RequestReceived):
+                            requests[event.stream_id] = (dict(event.headers), bytearray())
+                        elif isinstance(event, h2.events.DataReceived):
+                            requests[event.stream_id][1].extend(event.data)
+                            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            headers, body = requests.pop(event.stream_id)
+                            threading.Thread(
+                                target=self._respond, args=(sock, conn, lock, event.stream_id, headers, body),
+                                daemon=True,
+                            ).start()
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    lock.notify_all()
+                    sock.sendall(conn.data_to_send())
+
+    def _respond(self, sock, conn, lock, stream_id, request_headers, body):
+        method = request_headers[":method"]
+        status, headers, data = self.standin.respond(
+            method, request_headers[":path"], bytes(body), request_headers.get("accept-encoding", "")
+        )
+        data = b"" if method == "HEAD" else data
+        response_headers = [(":status", str(status))] + [(k.lower(), v) for k, v in headers.items()]
+        try:
+            with lock:
+                conn.send_headers(stream_id, response_headers, end_stream=not data)
+                sock.sendall(conn.data_to_send())
+                while data:
+                    window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                    if window <= 0:
+                        lock.wait()
+                        continue
+                    chunk, data = data[:window], data[window:]
+                    conn.send_data(stream_id, chunk, end_stream=not data)
+                    sock.sendall(conn.data_to_send())
+        except Exception:
+            pass  # stream reset or connection gone
+
+    def shutdown(self):
+        self.socket.close()
+
+    def server_close(self):
+        self.socket.close()
+
+
+class OpenAIStandin:
+    """
+    OpenAI-compatible `/v1/chat/completions` server returning canned Red
+    Team reports after `latency` seconds. The verdict is derived from the
+    prompt, so repeated audits of a market agree. Tracks `requests` and
+    the peak number of requests in flight (`max_in_flight`).
+    Use as a context manager; point the client's base_url at `url`.
+    """
+
+    def __init__(self, latency=1.0):
+        self.latency = latency
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/v1"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    time.sleep(server.latency)
+                    prompt = payload["messages"][-1]["content"]
+                    verdict = ("KILL", "WARNING", "APPROVED")[sum(prompt.encode()) % 3]
+                    content = (
+                        "1. **Classification:** Type B\n"
+                        f"2. **The Verdict:** {verdict}\n"
+                        "3. **Risk Analysis:**\n- Stand-in report, no research performed.\n"
+                        "4. **Execution Check:** n/a\n"
+                    )
+                    body = json.dumps({
+                        "id": f"chatcmpl-standin-{server.requests}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": payload.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    }).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def make_market_messages(prices, deltas=1000, seed=7):
+    """
+    Synthetic market-channel frames: one `book` snapshot per token, then
+    `deltas` single-level `price_change` updates on random tokens.
+    """
+    rng = random.Random(seed)
+    frames = [json.dumps([dict(make_book(t, p, seed), event_type="book") for t, p in prices.items()])]
+    token_ids = list(prices)
+
+    for _ in range(deltas):
+        token_id = rng.choice(token_ids)
+        price = prices[token_id] + rng.choice([0.0, 0.001, 0.002, 0.005, 0.01])
+        size = rng.choice([0, rng.uniform(10, 5000)])
+        frames.append(json.dumps({
+            "event_type": "price_change",
+            "market": token_id.rsplit("-", 1)[0],
+            "price_changes": [{
+                "asset_id": token_id,
+                "price": f"{min(price, 0.999):.3f}",
+                "size": f"{size:.2f}",
+                "side": "SELL",
+            }],
+        }))
+
+    return frames
+
+
+class ReplayServer:
+    """
+    Stand-in for the CLOB market WebSocket.
+
+    Replays `frames` (e.g. a recording made with LiveScanner's
+    `record_path`) to each client after its subscribe message, waiting
+    `interval` seconds between frames. `sent_at` holds each frame's send
+    time for latency measurements.
+    """
+
+    def __init__(self, frames, interval=0.0):
+        self.frames = list(frames)
+        self.interval = interval
+        self.subscriptions = []
+        self.sent_at = []
+        self.done = threading.Event()
+        self._ready = threading.Event()
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self.port = None
+
+    @classmethod
+    def from_recording(cls, path, interval=0.0):
+        with open(path) as f:
+            return cls([line.rstrip("\n") for line in f if line.strip()], interval)
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def _handler(self, ws):
+        self.subscriptions.append(json.loads(await ws.recv()))
+        for frame in self.frames:
+            self.sent_at.append(time.perf_counter())
+            await ws.send(frame)
+            if self.interval:
+                await asyncio.sleep(self.interval)
+        self.done.set()
+        await ws.wait_closed()
+
+    async def _main(self):
+        import websockets
+
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, "127.0.0.1", 0) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    def start(self):
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self._main())
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
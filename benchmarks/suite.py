@@ -0,0 +1,214 @@
+"""
+Benchmark suite: per-stage timings of the scan pipeline, with a baseline.
+
+Replays a recorded fixture (see `benchmarks/record.py`), or synthetic
+events when none is given, through the stand-in server at several
+universe sizes, and times each stage: fetch, ingest, tag filter, book
+fetch, book scoring and ranking. Events come in as a scan gets them: the
+Gamma walk streamed through `cache.iter_event_records` into a fresh
+ingest store, with "ingest" the time spent merging pages into the store
+and "fetch" the rest of the walk. Timings are compared against a stored
+baseline; any stage slower than `--tolerance` times its baseline (plus a
+small absolute slack for timer noise) fails the run.
+
+Run from the repo root:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --fixture benchmarks/fixtures/gamma-clob.json.gz --latency 0.1
+    python -m benchmarks.suite --update-baseline
+
+Baselines are machine-specific; regenerate them on the machine that
+checks for regressions.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import cache
+import ratelimit
+import utils
+from benchmarks.standin import StandinServer, make_events
+from scanner import DEFAULT_EXCLUDES, WINDOW_DAYS, ScanReport, extract_candidates, score_candidates
+from store import IngestStore
+from utils import fetch_liquidity, parse_iso_date, rank_key, utc_now
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+STAGES = ["fetch", "ingest", "tag_filter", "book_fetch", "scoring", "ranking"]
+SLACK_S = 0.05
+
+
+class TimedStore(IngestStore):
+    """An ingest store that adds up the time spent in `ingest`."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.ingest_s = 0.0
+
+    def ingest(self, raw_events, key=None):
+        start = time.perf_counter()
+        try:
+            return super().ingest(raw_events, key)
+        finally:
+            self.ingest_s += time.perf_counter() - start
+
+
+def load_fixture(path):
+    """
+    Load a recorded fixture, with end dates shifted by the time elapsed
+    since recording so the same events fall inside the scan window.
+    Returns (events, books by token_id).
+    """
+    with gzip.open(path, "rt") as f:
+        fixture = json.load(f)
+
+    shift = utc_now() - parse_iso_date(fixture["recorded_at"])
+    for e in fixture["events"]:
+        end_date = parse_iso_date(e.get("endDate"))
+        if end_date:
+            e["endDate"] = (end_date + shift).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return fixture["events"], fixture["books"]
+
+
+def scale_universe(events, books, size):
+    """
+    Repeat `events` (and their books) under suffixed IDs until there are
+    `size` events, so one fixture can be replayed at any universe size.
+    """
+    scaled_events, scaled_books = [], {}
+    copy = 0
+    while len(scaled_events) < size:
+        for e in events:
+            if len(scaled_events) == size:
+                break
+            suffix = f"~{copy}" if copy else ""
+            e = dict(e, id=f"{e.get('id')}{suffix}", slug=f"{e.get('slug')}{suffix}")
+            markets = []
+            for m in e.get("markets", []):
+                token_ids = m.get("clobTokenIds")
+                if isinstance(token_ids, str):
+                    token_ids = json.loads(token_ids)
+                token_ids = [f"{t}{suffix}" for t in token_ids or []]
+                for token_id in token_ids:
+                    book = books.get(token_id[:len(token_id) - len(suffix)])
+                    if book:
+                        scaled_books[token_id] = dict(book, asset_id=token_id)
+                markets.append(dict(m, id=f"{m.get('id')}{suffix}", clobTokenIds=json.dumps(token_ids)))
+            e["markets"] = markets
+            scaled_events.append(e)
+        copy += 1
+        if not events:
+            break
+    return scaled_events, scaled_books
+
+
+def run_stages(server_url, window_days=WINDOW_DAYS, capital=2000):
+    """Run one scan stage by stage. Returns ({stage: seconds}, opportunities)."""
+    utils.GAMMA_URL = f"{server_url}/events"
+    utils.CLOB_URL = f"{server_url}/books"
+    timings = {}
+    now = utc_now()
+    # Cold: no cached records and an empty store, as on a first scan
+    cache.event_cache.clear()
+    store = cache._store = TimedStore(os.path.join(tempfile.mkdtemp(), "ingest.sqlite3"))
+
+    start = time.perf_counter()
+    records = cache.get_event_records(None, window_days)
+    walk_s = time.perf_counter() - start
+    timings["ingest"] = store.ingest_s
+    timings["fetch"] = walk_s - store.ingest_s
+
+    start = time.perf_counter()
+    report = ScanReport(keep_candidates=False)
+    candidates = list(extract_candidates(records, DEFAULT_EXCLUDES, report, window_days, now))
+    timings["tag_filter"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    books, _ = fetch_liquidity([c["id"] for c in candidates])
+    timings["book_fetch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = score_candidates(candidates, books, capital)
+    timings["scoring"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results.sort(key=rank_key, reverse=True)
+    timings["ranking"] = time.perf_counter() - start
+
+    return timings, results
+
+
+def check(timings, baseline, tolerance):
+    """List the (size, stage, seconds, baseline) entries that regressed."""
+    regressions = []
+    for size, stages in timings.items():
+        for stage, seconds in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is not None and seconds > reference * tolerance + SLACK_S:
+                regressions.append((size, stage, seconds, reference))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", help="recorded .json.gz fixture (default: synthetic events)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed with 500")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the fastest counts")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger("Scanner").setLevel(logging.WARNING)
+
+    if args.fixture:
+        fixture_events, fixture_books = load_fixture(args.fixture)
+
+    timings = {}
+    for size in args.sizes:
+        if args.fixture:
+            events, books = scale_universe(fixture_events, fixture_books, size)
+        else:
+            events, books = make_events(size), None
+
+        best = None
+        with StandinServer(events, latency=args.latency, error_rate=args.error_rate, books=books) as server:
+            # Measure the pipeline, not the client-side request budget
+            ratelimit.configure(server.url.split("//")[1], rate=1000.0, burst=1000, max_rate=1000.0)
+            for _ in range(args.repeat):
+                run, results = run_stages(server.url)
+                best = run if best is None else {s: min(best[s], run[s]) for s in STAGES}
+
+        timings[str(size)] = best
+        print(f"{size:>6} events, {len(results):>4} opportunities: "
+              + "  ".join(f"{s} {best[s] * 1000:8.1f}ms" for s in STAGES))
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            rounded = {size: {s: round(v, 5) for s, v in stages.items()} for size, stages in timings.items()}
+            json.dump(rounded, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = check(timings, baseline, args.tolerance)
+    for size, stage, seconds, reference in regressions:
+        print(f"REGRESSION {size} events / {stage}: {seconds * 1000:.1f}ms vs baseline {reference * 1000:.1f}ms")
+    if regressions:
+        return 1
+    print(f"No regressions (tolerance {args.tolerance}x + {SLACK_S * 1000:.0f}ms).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
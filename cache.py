@@ -0,0 +1,330 @@
+"""
+Process-wide caches for API data.
+
+Gamma events (parsed via the ingest store) and CLOB books are cached
+independently of scan parameters, so re-ranking for a new bet size or tag
+set is served from memory. Books are cached compacted to their ask
+ladders (`orderbook.compact_book`).
+
+Fetches are also coalesced while in flight: concurrent scans (dashboard
+sessions, the scheduler, different bet sizes or tag sets) that miss the
+cache for the same books or the same event window share one fetch and
+its result instead of each calling the API.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+
+import metrics
+import opportunity
+import utils
+from orderbook import compact_book
+from store import IngestStore
+from utils import fetch_liquidity, iter_event_pages, logger, prewarm, utc_now
+
+# --- CONFIG ---
+EVENT_TTL = 60
+BOOK_TTL = 60
+COALESCE = os.environ.get("SCANNER_COALESCE", "1") != "0"
+
+
+class TTLCache:
+    """Thread-safe key/value cache with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, name, ttl):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return (found, missing): fresh entries by key, and keys to fetch."""
+        now = time.monotonic()
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry and now - entry[0] < self.ttl:
+                    found[key] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(key)
+                    self.misses += 1
+        return found, missing
+
+    def set_many(self, items):
+        now = time.monotonic()
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (now, value)
+            self._purge(now)
+
+    def _purge(self, now):
+        expired = [k for k, (stamp, _) in self._data.items() if now - stamp >= self.ttl]
+        for key in expired:
+            del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._data),
+            }
+
+
+class InFlight:
+    """
+    Thread-safe registry of fetches in flight, one handle per key.
+
+    `claim` hands each key to exactly one caller to fetch, with a new
+    handle (a Future, or a SharedStream for streamed results) it must
+    complete and `release`; callers asking for a key already being fetched
+    get its handle instead and count as coalesced. With `enabled` off
+    every caller fetches its own keys.
+    """
+
+    def __init__(self, name, enabled=True):
+        self.name = name
+        self.enabled = enabled
+        self.fetched = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def claim(self, keys, factory=Future):
+        """Return (owned, joined): new handles for keys to fetch, in-flight handles to wait on."""
+        owned, joined = {}, {}
+        with self._lock:
+            for key in keys:
+                flight = self._flights.get(key) if self.enabled else None
+                if flight is None:
+                    flight = owned[key] = factory()
+                    if self.enabled:
+                        self._flights[key] = flight
+                else:
+                    joined[key] = flight
+            self.fetched += len(owned)
+            self.coalesced += len(joined)
+        if joined:
+            metrics.coalesced.inc(len(joined), kind=self.name)
+        return owned, joined
+
+    def release(self, owned):
+        """Retire `owned` flights; call once their results are cached."""
+        with self._lock:
+            for key, flight in owned.items():
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "fetched": self.fetched,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+            }
+
+
+class SharedStream:
+    """Items appended by one producer, iterated by any number of consumers as they arrive."""
+
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def extend(self, items):
+        with self._cond:
+            self.items.extend(items)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self._cond:
+                while i == len(self.items) and not self.done:
+                    self._cond.wait()
+                batch, done, error = self.items[i:], self.done, self.error
+            i += len(batch)
+            yield from batch
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+event_cache = TTLCache("events", EVENT_TTL)
+book_cache = TTLCache("books", BOOK_TTL)
+event_flights = InFlight("events", COALESCE)
+book_flights = InFlight("books", COALESCE)
+
+# Transfer stats of the most recent Gamma fetch (pages, bytes, fetched, kept)
+last_event_fetch = {}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def ingest_store():
+    """The process-wide ingest store, opened on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = IngestStore()
+        return _store
+
+
+def _description(event_id):
+    return ingest_store().description(event_id)
+
+
+# Candidates of store records read their descriptions back from the store
+opportunity.description_source = _description
+
+
+def iter_event_records(limit=None, window_days=(1, 30)):
+    """
+    Parsed event records resolving within `window_days` of now.
+
+    Served from memory while fresh, then from the ingest store's last sync
+    (e.g. after a restart). Otherwise Gamma pages are streamed on a
+    background thread, merged incrementally into the store and yielded as
+    each page arrives, so downstream stages can start before the last
+    page; concurrent callers for the same window share that one walk.
+    `limit=None` fetches the whole window.
+    """
+    key = (limit, window_days)
+    found, _ = event_cache.get_many([key])
+    if key in found:
+        yield from found[key]
+        return
+
+    sync_key = f"{limit}:{window_days}"
+    records = ingest_store().load_sync(sync_key, EVENT_TTL)
+    if records is not None:
+        event_cache.set_many({key: records})
+        yield from records
+        return
+
+    owned, joined = event_flights.claim([key], SharedStream)
+    if owned:
+        threading.Thread(target=_stream_events, args=(owned, key, sync_key), daemon=True).start()
+    yield from (owned or joined)[key]
+
+
+def _stream_events(owned, key, sync_key):
+    """Walk Gamma for `key` into its owned stream, then cache the records."""
+    stream = owned[key]
+    limit, window_days = key
+    end_date_min = end_date_max = None
+    if window_days:
+        now = utc_now()
+        end_date_min = now + timedelta(days=window_days[0])
+        end_date_max = now + timedelta(days=window_days[1])
+
+    stats = {}
+    try:
+        logger.info("Streaming events from Gamma API...")
+        # Book fetching starts with the first candidates: have its connections ready
+        prewarm([utils.CLOB_URL])
+        pages = iter_event_pages(
+            limit=limit, end_date_min=end_date_min, end_date_max=end_date_max, stats=stats
+        )
+        for page in pages:
+            stream.extend(ingest_store().ingest(page))
+
+        records = stream.items
+        last_event_fetch.clear()
+        last_event_fetch.update(stats)
+        # A walk with dropped pages is served once but never cached or synced
+        if stats.get("failed_pages"):
+            logger.warning(f"{stats['failed_pages']} Gamma pages failed; not caching this walk.")
+        elif records:
+            ingest_store().save_sync(sync_key, records)
+            event_cache.set_many({key: records})
+    except Exception as e:
+        logger.error(f"Event walk failed: {e}")
+        event_flights.release(owned)
+        stream.finish(e)
+        return
+    event_flights.release(owned)
+    stream.finish()
+
+
+def get_event_records(limit=None, window_days=(1, 30)):
+    """All records of `iter_event_records` as a list."""
+    return list(iter_event_records(limit, window_days))
+
+
+def get_books(token_ids):
+    """
+    Order books for `token_ids`, fetching only tokens neither cached nor
+    already being fetched by another caller.
+    Returns (books, failed_ids) like `fetch_liquidity`, with each book
+    compacted to {"asks": Ladder}.
+    """
+    ids = list(dict.fromkeys(str(t) for t in token_ids if t))
+    found, missing = book_cache.get_many(ids)
+    failed_ids = []
+
+    owned, joined = book_flights.claim(missing)
+    if owned:
+        # Whatever happens, every owned token is released and its joiners answered
+        error = None
+        try:
+            fetched, failed = fetch_liquidity(list(owned))
+            failed = set(failed)
+            # Cache "no book" too, but never a failed fetch
+            fresh = {
+                t: compact_book(fetched[t]) if fetched.get(t) else None
+                for t in owned if t not in failed
+            }
+            book_cache.set_many(fresh)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            book_flights.release(owned)
+            for t, future in owned.items():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result((fresh.get(t), t in failed))
+
+    for t, future in dict(owned, **joined).items():
+        book, failed = future.result()
+        if failed:
+            failed_ids.append(t)
+        else:
+            found[t] = book
+
+    books = {t: b for t, b in found.items() if b is not None}
+    return books, failed_ids
+
+
+def cache_stats():
+    return [event_cache.stats(), book_cache.stats()]
+
+
+def coalesce_stats():
+    return [event_flights.stats(), book_flights.stats()]
@@ -0,0 +1,64 @@
+"""
+Opportunity card HTML for the dashboard.
+
+A page of cards is built as one HTML string and rendered as a single
+Streamlit element, and only the visible page of a result list is ever
+built, so render cost stays flat however many opportunities a scan finds.
+"""
+import os
+
+# --- CONFIG ---
+PAGE_SIZE = int(os.environ.get("SCANNER_PAGE_SIZE", 25))
+
+
+def page_count(total, size=PAGE_SIZE):
+    return max(1, -(-total // size))
+
+
+def page_window(total, page, size=PAGE_SIZE):
+    """(start, end) row indices of 1-based `page`, clamped to the last page."""
+    page = min(max(page, 1), page_count(total, size))
+    start = (page - 1) * size
+    return start, min(start + size, total)
+
+
+def card_html(item, rank, badge=""):
+    tags_html = "".join(
+        f"<span class='tag-bubble'>{t}</span>" for t in item["tags"]
+    )
+    market_url = f"https://polymarket.com/event/{item['slug']}"
+
+    # Format volume
+    vol_display = f"${item['volume']:,.0f}" if item['volume'] > 1000 else f"${item['volume']:.0f}"
+
+    # No indentation or blank lines: cards are concatenated into one markdown block
+    return (
+        f'<div class="card">'
+        f'<div style="display:flex; justify-content:space-between;">'
+        f'<div>'
+        f'<div style="color:#8b949e;">#{rank}</div>'
+        f'<div class="title-text"><a href="{market_url}" target="_blank">{item["title"]} ↗</a></div>'
+        f'{tags_html}'
+        f'</div>'
+        f'<div><span class="win-tag">{item["target_outcome"].upper()}</span>{badge}</div>'
+        f'</div>'
+        f'<hr>'
+        f'<div style="display:flex; justify-content:space-between;">'
+        f'<div><div class="sub-stat">Entry</div><div class="big-stat">{item["real_entry"]*100:.1f}¢</div></div>'
+        f'<div><div class="sub-stat">ROI</div><div class="roi-stat">+{item["roi"]:.2f}%</div></div>'
+        f'<div><div class="sub-stat">Profit</div><div class="roi-stat">${item["profit"]:.0f}</div></div>'
+        f'<div><div class="sub-stat">Volume</div><div class="big-stat">{vol_display}</div></div>'
+        f'<div><div class="sub-stat">Ends</div><div class="big-stat">{item["date_str"]}</div></div>'
+        f'</div>'
+        f'</div>'
+    )
+
+
+def cards_html(items, start=0, badge=None):
+    """
+    One HTML block for `items`, numbered from `start` + 1. `badge(item)`
+    may return extra HTML shown next to the outcome.
+    """
+    return "\n".join(
+        card_html(item, start + i + 1, badge(item) if badge else "") for i, item in enumerate(items)
+    )
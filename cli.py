@@ -0,0 +1,158 @@
+"""
+Command-line scanner.
+
+Streams each verified opportunity to stdout as a JSONL record as soon as
+it passes the gates. Events are read page by page and books fetched per
+chunk, so memory stays flat however many events are scanned.
+
+    python cli.py --capital 2000 --exclude Sports --exclude Memecoin
+    python cli.py --watch 60 > opportunities.jsonl
+    python cli.py --workers 8 > ranked.jsonl
+    python cli.py --window 1 7 --band 0.9 0.99 --min-fill 0.9 --max-slippage 0.05
+
+With --workers, pages are parsed and books scored on a process pool
+(see shard.py) and the opportunities are written ranked, once the scan
+is complete.
+
+Exit codes: 0 opportunities found, 1 none found, 3 Gamma fetch failed.
+In --watch mode the process runs until interrupted and exits 0.
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import timedelta
+
+import metrics
+from scanner import DEFAULT_EXCLUDES, WINDOW_DAYS, BOOK_CHUNK, ScanReport, iter_opportunities
+from shard import scan_sharded
+from store import parse_record
+from utils import (ENTRY_BAND, MAX_SLIPPAGE, MIN_FILL, EventFetchError, fetch_liquidity, iter_event_pages,
+                   logger, make_gates, utc_now)
+
+EXIT_FOUND = 0
+EXIT_NONE = 1
+EXIT_FETCH_FAILED = 3
+
+RECORD_FIELDS = [
+    "id", "title", "target_outcome", "real_entry", "slippage", "roi", "profit",
+    "max_liq", "volume", "days", "end_date_iso", "slug", "tags",
+]
+
+
+def iter_records(window_days, stats):
+    """Parsed event records streamed straight from Gamma, page by page."""
+    now = utc_now()
+    pages = iter_event_pages(
+        end_date_min=now + timedelta(days=window_days[0]),
+        end_date_max=now + timedelta(days=window_days[1]),
+        stats=stats,
+    )
+    for page in pages:
+        for e in page:
+            yield parse_record(e)
+
+
+def scan_once(args, out):
+    """Run one streaming scan. Returns an exit code."""
+    report = ScanReport(keep_candidates=False)
+    stats = {}
+    found = 0
+    start = time.perf_counter()
+
+    try:
+        if args.workers:
+            report = scan_sharded(
+                args.capital, args.exclude, args.window, args.workers,
+                fetch_books=fetch_liquidity, stats=stats, gates=args.gates,
+            )
+            opportunities = report.results
+        else:
+            opportunities = iter_opportunities(
+                iter_records(args.window, stats), args.capital, args.exclude, report,
+                fetch_books=fetch_liquidity, chunk_size=args.chunk, window_days=args.window, gates=args.gates,
+            )
+        for op in opportunities:
+            record = {k: op[k] for k in RECORD_FIELDS}
+            record["url"] = f"https://polymarket.com/event/{op['slug']}"
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            found += 1
+    except EventFetchError as e:
+        logger.error(f"Scan aborted after {found} opportunities: {e}")
+        return EXIT_FETCH_FAILED
+
+    report.elapsed_s = time.perf_counter() - start
+    if not args.workers:
+        metrics.record_scan(report, found)
+    logger.info(
+        f"Scan done in {report.elapsed_s:.1f}s: {report.events} events, "
+        f"{report.scored} candidates scored, {found} opportunities, "
+        f"{len(report.failed_ids)} books unfetchable."
+    )
+    if report.rejections:
+        logger.info("Rejected: " + ", ".join(f"{r} {n}" for r, n in report.rejections.most_common()))
+
+    if not stats.get("pages"):
+        return EXIT_FETCH_FAILED
+    return EXIT_FOUND if found else EXIT_NONE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Scan Polymarket for mispriced high-confidence outcomes (JSONL to stdout)."
+    )
+    parser.add_argument("--capital", type=float, default=2000, help="bet size in USD (default 2000)")
+    parser.add_argument(
+        "--exclude", action="append", metavar="TAG",
+        help="tag to exclude (repeatable; default: the dashboard's default excludes)"
+    )
+    parser.add_argument(
+        "--window", type=int, nargs=2, default=list(WINDOW_DAYS), metavar=("MIN_DAYS", "MAX_DAYS"),
+        help="resolution window in days from now (default 1 30)"
+    )
+    parser.add_argument(
+        "--band", type=float, nargs=2, default=list(ENTRY_BAND), metavar=("LOW", "HIGH"),
+        help="entry band for the quoted price and the simulated entry (default 0.85 0.99)"
+    )
+    parser.add_argument("--min-fill", type=float, default=MIN_FILL, help="minimum fraction filled (default 0.95)")
+    parser.add_argument(
+        "--max-slippage", type=float, default=MAX_SLIPPAGE, help="maximum slippage in USD/share (default 0.03)"
+    )
+    parser.add_argument("--chunk", type=int, default=BOOK_CHUNK, help="candidates per /books round")
+    parser.add_argument(
+        "--workers", type=int, metavar="N",
+        help="parse and score on N processes, output ranked at the end (for large universes)"
+    )
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="rescan every SECONDS")
+    parser.add_argument(
+        "--metrics-port", type=int, default=metrics.METRICS_PORT, metavar="PORT",
+        help="serve Prometheus metrics on PORT/metrics (default: $SCANNER_METRICS_PORT)"
+    )
+    args = parser.parse_args(argv)
+    if args.exclude is None:
+        args.exclude = list(DEFAULT_EXCLUDES)
+    args.window = tuple(args.window)
+    args.gates = make_gates(args.band, args.min_fill, args.max_slippage)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+
+    if not args.watch:
+        return scan_once(args, sys.stdout)
+
+    try:
+        while True:
+            started = time.monotonic()
+            scan_once(args, sys.stdout)
+            time.sleep(max(0.0, args.watch - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return EXIT_FOUND
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Projected decoding of Gamma `/events` pages.
+
+Pages are parsed with orjson when it is installed (`pip install orjson`),
+else with the standard library, and every event is cut down to the
+fields the scanner reads. The stringified `outcomes`, `outcomePrices` and
+`clobTokenIds` arrays are decoded in the same pass, so nothing downstream
+parses JSON again and the rest of the page (images, rewards, nested
+series, ...) is released as soon as the page is decoded.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# --- CONFIG ---
+JSON_BACKEND = "orjson" if orjson else "json"
+loads = orjson.loads if orjson else json.loads
+
+EVENT_FIELDS = ("id", "slug", "title", "description", "endDate", "updatedAt")
+MARKET_FIELDS = ("id", "volume", "updatedAt")
+ARRAY_FIELDS = ("outcomes", "outcomePrices", "clobTokenIds")
+
+
+def _array(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        return loads(value)
+    except ValueError:
+        return value  # left as is for parse_market to reject
+
+
+def project_market(m):
+    market = {k: m[k] for k in MARKET_FIELDS if k in m}
+    for k in ARRAY_FIELDS:
+        if k in m:
+            market[k] = _array(m[k])
+    return market
+
+
+def project_event(e):
+    """The scanner's fields of a raw Gamma event, markets included."""
+    event = {k: e[k] for k in EVENT_FIELDS if k in e}
+    event["tags"] = [{"label": t.get("label")} for t in e.get("tags") or []]
+    event["markets"] = [project_market(m) for m in e.get("markets") or []]
+    return event
+
+
+def decode_events(content):
+    """Decode a Gamma `/events` response body into projected events."""
+    return [project_event(e) for e in loads(content) or []]
@@ -0,0 +1,241 @@
+"""
+Columnar scan history.
+
+Each scan's candidates, their ask books (already sorted and cleaned, as
+`BookBatch` keeps them) and the fills computed for its bet sizes are
+appended as one compressed NumPy `.npz` partition under
+`HISTORY_DIR/date=YYYY-MM-DD/`. `load_history` concatenates partitions
+back into flat columns, so the backtest can rebuild the books without
+re-parsing anything. Each partition also stores the gates its scan ran
+with: the entry band decided which outcomes became candidates at all.
+"""
+import glob
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from orderbook import BookBatch
+from utils import DEFAULT_GATES, logger, make_gates, parse_iso_date
+
+# --- CONFIG ---
+# Set SCANNER_HISTORY to an empty string to stop recording
+HISTORY_DIR = os.environ.get("SCANNER_HISTORY", os.path.join(".scanner", "history")) or None
+# Days of partitions kept; older date folders are removed after each write (0 keeps all)
+HISTORY_DAYS = int(os.environ.get("SCANNER_HISTORY_DAYS", "30"))
+
+# Per-candidate text and number columns, taken from the candidate dicts
+TEXT_COLUMNS = ("token_id", "title", "slug", "outcome")
+FILL_COLUMNS = ("fill_pct", "real_entry", "slippage", "max_liq", "roi", "passed")
+
+
+class HistoryRecorder:
+    """
+    Collects one scan's candidates and books (chunk by chunk, if the scan
+    is progressive) and writes them as a single partition on `flush`.
+    """
+
+    def __init__(self, capitals, path=HISTORY_DIR, gates=DEFAULT_GATES, keep_days=HISTORY_DAYS):
+        self.capitals = [float(c) for c in np.atleast_1d(capitals)]
+        self.path = path
+        self.gates = gates
+        self.keep_days = keep_days
+        self.candidates = []
+        self.asks = {}
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, candidates, books):
+        with self._lock:
+            for c in candidates:
+                token_id = str(c["id"])
+                if token_id in self.asks:
+                    continue
+                book = books.get(token_id)
+                self.asks[token_id] = book.get("asks", []) if book else None
+                self.candidates.append(c)
+
+    def flush(self):
+        """Write the partition. Returns its path, or None if there was nothing to record."""
+        with self._lock:
+            candidates, asks = self.candidates, self.asks
+            self.candidates, self.asks = [], {}
+        if not candidates or not self.path:
+            return None
+        try:
+            target = write_partition(candidates, asks, self.capitals, self.started_at, self.path, self.gates)
+            prune(self.path, self.keep_days)
+            return target
+        except OSError as e:
+            logger.error(f"History write failed: {e}")
+            return None
+
+
+def recorder(capitals, gates=DEFAULT_GATES):
+    """A HistoryRecorder for `capitals` (scored with `gates`), or None if history is disabled."""
+    return HistoryRecorder(capitals, gates=gates) if HISTORY_DIR else None
+
+
+def write_partition(candidates, asks, capitals, scanned_at, path=HISTORY_DIR, gates=DEFAULT_GATES):
+    """Write one scan as `path/date=YYYY-MM-DD/scan-<unix ms>.npz`."""
+    token_ids = [str(c["id"]) for c in candidates]
+    batch = BookBatch.from_books({t: asks.get(t) or [] for t in token_ids})
+    capitals = np.asarray(capitals, dtype=np.float64)
+    fill_pct, avg_entry, slippage, max_liq, warn = batch.fill(capitals)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roi = np.where(avg_entry > 0, (1.0 - avg_entry) / avg_entry * 100, 0.0)
+    passed = (
+        ~warn & (fill_pct >= gates.min_fill) & (slippage <= gates.max_slippage)
+        & (avg_entry >= gates.band[0]) & (avg_entry <= gates.band[1])
+    )
+
+    end_ts = []
+    for c in candidates:
+        end_date = parse_iso_date(c.get("end_date_iso"))
+        end_ts.append(end_date.timestamp() if end_date else np.nan)
+
+    day = datetime.fromtimestamp(scanned_at, timezone.utc).strftime("%Y-%m-%d")
+    folder = os.path.join(path, f"date={day}")
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, f"scan-{int(scanned_at * 1000)}.npz")
+    tmp = f"{target}.{os.getpid()}.tmp.npz"
+
+    np.savez_compressed(
+        tmp,
+        scanned_at=np.float64(scanned_at),
+        token_id=np.array(token_ids, dtype=str),
+        title=np.array([c.get("title") or "" for c in candidates], dtype=str),
+        slug=np.array([c.get("slug") or "" for c in candidates], dtype=str),
+        outcome=np.array([c.get("target_outcome") or "" for c in candidates], dtype=str),
+        price_raw=np.array([c["price_raw"] for c in candidates], dtype=np.float64),
+        volume=np.array([c.get("volume", 0.0) for c in candidates], dtype=np.float64),
+        end_ts=np.array(end_ts, dtype=np.float64),
+        has_book=np.array([asks.get(t) is not None for t in token_ids]),
+        level_price=batch.prices,
+        level_size=batch.sizes,
+        bounds=np.concatenate((batch.start, batch.end[-1:])),
+        level_count=batch.level_counts,
+        best=batch.best,
+        second=batch.second,
+        capitals=capitals,
+        fill_pct=fill_pct,
+        real_entry=avg_entry,
+        slippage=slippage,
+        max_liq=max_liq,
+        roi=roi,
+        passed=passed,
+        band=np.asarray(gates.band, dtype=np.float64),
+        min_fill=np.float64(gates.min_fill),
+        max_slippage=np.float64(gates.max_slippage),
+    )
+    os.replace(tmp, target)
+    return target
+
+
+class History:
+    """
+    Concatenated partitions: one row per (scan, candidate), with the
+    books' levels in flat arrays and `bounds` rebased across partitions.
+    Each row carries its scan's entry band (`band_lo`, `band_hi`; the
+    default band for partitions written before gates were recorded).
+    Stored fills and the gates they were judged by are kept per partition
+    in `fills` (grids may differ).
+    """
+
+    def __init__(self, columns, fills):
+        self.columns = columns
+        self.fills = fills
+
+    def __len__(self):
+        return len(self.columns["token_id"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def covers(self, band):
+        """Row mask: scans whose recorded entry band contains `band`."""
+        return (self.columns["band_lo"] <= band[0] + 1e-9) & (self.columns["band_hi"] >= band[1] - 1e-9)
+
+    def book_batch(self):
+        """Every recorded book as one BookBatch, rebuilt without parsing."""
+        c = self.columns
+        return BookBatch(
+            c["token_id"], c["level_price"], c["level_size"], c["bounds"],
+            c["level_count"], c["best"], c["second"],
+        )
+
+
+def prune(path=HISTORY_DIR, keep_days=HISTORY_DAYS, now=None):
+    """Remove date folders older than `keep_days` days. Returns how many were removed."""
+    if not path or keep_days <= 0:
+        return 0
+    now = datetime.fromtimestamp(now if now is not None else time.time(), timezone.utc)
+    oldest = (now - timedelta(days=keep_days - 1)).strftime("%Y-%m-%d")
+    removed = 0
+    for folder in sorted(glob.glob(os.path.join(path, "date=*"))):
+        if os.path.basename(folder)[len("date="):] >= oldest:
+            break
+        shutil.rmtree(folder)
+        removed += 1
+    if removed:
+        logger.info(f"History: removed {removed} partition folder(s) older than {keep_days} days")
+    return removed
+
+
+def partitions(path=HISTORY_DIR, since=None, until=None):
+    """Partition files (oldest first), optionally limited to dates `since`..`until` (YYYY-MM-DD)."""
+    files = []
+    for folder in sorted(glob.glob(os.path.join(path, "date=*"))):
+        day = os.path.basename(folder)[len("date="):]
+        if (since and day < since) or (until and day > until):
+            continue
+        files.extend(sorted(glob.glob(os.path.join(folder, "scan-*.npz"))))
+    return files
+
+
+def load_history(path=HISTORY_DIR, since=None, until=None):
+    """Load and concatenate partitions into a History, ordered by scan time."""
+    parts = []
+    for file in partitions(path, since, until):
+        with np.load(file) as data:
+            parts.append({k: data[k] for k in data.files})
+
+    columns = {}
+    if not parts:
+        empty = {k: np.zeros(0, dtype=str) for k in TEXT_COLUMNS}
+        empty.update({k: np.zeros(0) for k in ("scanned_at", "price_raw", "volume", "end_ts", "level_price",
+                                              "level_size", "best", "second")})
+        empty.update(has_book=np.zeros(0, bool), level_count=np.zeros(0, np.int64),
+                     bounds=np.zeros(1, np.int64), band_lo=np.zeros(0), band_hi=np.zeros(0))
+        return History(empty, [])
+
+    rows = [len(p["token_id"]) for p in parts]
+    columns["scanned_at"] = np.repeat([float(p["scanned_at"]) for p in parts], rows)
+    bands = [p["band"] if "band" in p else DEFAULT_GATES.band for p in parts]
+    columns["band_lo"] = np.repeat([float(b[0]) for b in bands], rows)
+    columns["band_hi"] = np.repeat([float(b[1]) for b in bands], rows)
+    for key in TEXT_COLUMNS + ("price_raw", "volume", "end_ts", "has_book", "level_price",
+                               "level_size", "level_count", "best", "second"):
+        columns[key] = np.concatenate([p[key] for p in parts])
+
+    # Shift each partition's level offsets past the levels before it
+    bounds, offset = [np.zeros(1, np.int64)], 0
+    for p in parts:
+        bounds.append(p["bounds"][1:] + offset)
+        offset += len(p["level_price"])
+    columns["bounds"] = np.concatenate(bounds)
+
+    fills = []
+    for p in parts:
+        fill = {k: p[k] for k in ("capitals",) + FILL_COLUMNS}
+        fill["gates"] = make_gates(
+            tuple(p["band"]) if "band" in p else DEFAULT_GATES.band,
+            float(p["min_fill"]) if "min_fill" in p else DEFAULT_GATES.min_fill,
+            float(p["max_slippage"]) if "max_slippage" in p else DEFAULT_GATES.max_slippage,
+        )
+        fills.append(fill)
+    return History(columns, fills)
@@ -0,0 +1,209 @@
+"""
+Live order books over the CLOB market WebSocket.
+
+Subscribes to the candidate token IDs, keeps local L2 ask books up to date
+from `book` snapshots and `price_change` deltas, and re-scores only the
+opportunity whose book changed, so the ranked list tracks the market
+without polling /books.
+"""
+import asyncio
+import json
+import threading
+import time
+
+from orderbook import BookBatch
+from utils import DEFAULT_GATES, logger, safe_float, score_fill, rank_key
+
+# --- CONFIG ---
+MARKET_WS_URL = "wss://ws-subscriptions-clob.polymarket.com/ws/market"
+PING_INTERVAL = 10
+
+
+class LiveBooks:
+    """
+    Local L2 ask books keyed by token_id, each a {price: size} map.
+
+    Written by the WebSocket thread and read by the dashboard, so every
+    change and every read holds the lock; readers get copies.
+    """
+
+    def __init__(self):
+        self.asks = {}
+        self._lock = threading.RLock()
+
+    def load(self, token_id, asks):
+        book = {
+            safe_float(level.get("price")): safe_float(level.get("size"))
+            for level in asks or []
+        }
+        with self._lock:
+            self.asks[str(token_id)] = book
+
+    def apply(self, message):
+        """
+        Apply one market-channel event.
+        Returns the set of token IDs whose ask book changed.
+        """
+        with self._lock:
+            return self._apply(message)
+
+    def _apply(self, message):
+        event_type = message.get("event_type")
+
+        if event_type == "book":
+            token_id = str(message.get("asset_id"))
+            self.load(token_id, message.get("asks", message.get("sells")))
+            return {token_id}
+
+        if event_type == "price_change":
+            changed = set()
+            changes = message.get("price_changes", message.get("changes", []))
+            for change in changes:
+                if str(change.get("side", "")).upper() != "SELL":
+                    continue
+                token_id = str(change.get("asset_id", message.get("asset_id")))
+                book = self.asks.setdefault(token_id, {})
+                price = safe_float(change.get("price"))
+                size = safe_float(change.get("size"))
+                if size > 0:
+                    book[price] = size
+                else:
+                    book.pop(price, None)
+                changed.add(token_id)
+            return changed
+
+        return set()
+
+    def asks_for(self, token_id):
+        """A copy of one token's ask ladder as /books-style levels."""
+        with self._lock:
+            return [{"price": p, "size": s} for p, s in self.asks.get(token_id, {}).items()]
+
+
+class LiveScanner:
+    """
+    Keeps a ranked opportunity list current from streamed book updates.
+
+    Seeded with the candidates (and optionally the /books snapshot) from a
+    scan; thereafter each book change re-runs the fill and gates for that
+    one candidate only. With `record_path`, raw frames are appended to a
+    JSONL file that the stand-in replay server can play back.
+    """
+
+    def __init__(self, candidates, capital, books=None, url=MARKET_WS_URL, record_path=None,
+                 gates=DEFAULT_GATES):
+        self.url = url
+        self.record_path = record_path
+        self.capital = capital
+        self.gates = gates
+        self.candidates = {str(c["id"]): c for c in candidates}
+        self.books = LiveBooks()
+        self.results = {}
+        self.updates = 0
+        self.last_update = None
+        self.connected = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        for token_id, book in (books or {}).items():
+            if token_id in self.candidates and book:
+                self.books.load(token_id, book.get("asks", []))
+                self._rescore(token_id)
+
+    def _rescore(self, token_id):
+        batch = BookBatch.from_asks(self.books.asks_for(token_id))
+        fill_pct, avg_entry, slippage, max_liq, warn = (a[0] for a in batch.fill(self.capital))
+        scored = score_fill(
+            self.candidates[token_id], self.capital,
+            float(fill_pct), float(avg_entry), float(slippage), float(max_liq), bool(warn), self.gates
+        )
+        with self._lock:
+            if scored:
+                self.results[token_id] = scored
+            else:
+                self.results.pop(token_id, None)
+
+    def on_message(self, raw):
+        """Handle one raw WebSocket frame. Returns the re-scored token IDs."""
+        if self.record_path:
+            with open(self.record_path, "a") as f:
+                f.write(raw if isinstance(raw, str) else raw.decode())
+                f.write("\n")
+
+        try:
+            payload = json.loads(raw)
+        except (TypeError, ValueError):
+            return set()  # PONG and other non-JSON frames
+
+        events = payload if isinstance(payload, list) else [payload]
+        changed = set()
+        for event in events:
+            if isinstance(event, dict):
+                changed |= self.books.apply(event)
+
+        changed &= self.candidates.keys()
+        for token_id in changed:
+            self._rescore(token_id)
+
+        if changed:
+            self.updates += 1
+            self.last_update = time.time()
+        return changed
+
+    def ranked(self):
+        with self._lock:
+            results = list(self.results.values())
+        results.sort(key=rank_key, reverse=True)
+        return results
+
+    async def _ping(self, ws):
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            await ws.send("PING")
+
+    async def run(self):
+        """Stream until `stop()` is called, reconnecting with backoff."""
+        import websockets
+
+        backoff = 1.0
+        subscribe = json.dumps({"assets_ids": list(self.candidates), "type": "market"})
+
+        while not self._stop.is_set():
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    await ws.send(subscribe)
+                    self.connected = True
+                    backoff = 1.0
+                    pinger = asyncio.create_task(self._ping(ws))
+                    try:
+                        while not self._stop.is_set():
+                            try:
+                                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            self.on_message(raw)
+                    finally:
+                        pinger.cancel()
+            except Exception as e:
+                logger.warning(f"Market stream dropped: {e}")
+            finally:
+                self.connected = False
+
+            if not self._stop.is_set():
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def start(self):
+        """Run the stream on a background thread."""
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self):
+        asyncio.run(self.run())
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
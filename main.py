@@ -1,18 +1,16 @@
 import streamlit as st
-import pandas as pd
-import openai
 import os
-import json
-import logging
-from datetime import timedelta, datetime
-from utils import (
-    fetch_events_paginated,
-    fetch_liquidity,
-    safe_float,
-    utc_now,
-    parse_iso_date,
-    calculate_slippage
-)
+import time
+from cache import get_books, cache_stats, coalesce_stats, last_event_fetch
+from scanner import iter_scan, DEFAULT_EXCLUDES, WINDOW_DAYS
+from live import LiveScanner
+from allocator import allocate
+from audit import AuditQueue
+from cards import cards_html, page_count, page_window
+from ratelimit import limiter_stats
+from scheduler import SnapshotScheduler, latest_snapshot, REFRESH_INTERVAL
+from utils import ENTRY_BAND, MAX_SLIPPAGE, MIN_FILL, EventFetchError, make_gates
+import metrics
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -21,6 +19,27 @@ st.set_page_config(
     page_icon="🎯"
 )
 
+@st.cache_resource
+def start_metrics_server():
+    """Expose /metrics once per process if SCANNER_METRICS_PORT is set."""
+    return metrics.serve() if metrics.METRICS_PORT else None
+
+start_metrics_server()
+
+@st.cache_resource
+def start_scheduler():
+    """One background scan loop per process, shared by every session."""
+    return SnapshotScheduler().start() if REFRESH_INTERVAL > 0 else None
+
+scheduler = start_scheduler()
+
+@st.cache_resource
+def start_audit_queue():
+    """One audit pool per process, so sessions share in-flight audits and the cache."""
+    return AuditQueue()
+
+audits = start_audit_queue()
+
 # --- CUSTOM CSS ---
 st.markdown("""
 <style>
@@ -64,6 +83,18 @@ st.markdown("""
         font-size: 0.75rem;
         margin-right: 5px;
     }
+    .verdict {
+        padding: 2px 8px;
+        border-radius: 4px;
+        font-size: 0.8rem;
+        font-weight: bold;
+        margin-left: 6px;
+        color: white;
+    }
+    .verdict-KILL { background-color: #da3633; }
+    .verdict-WARNING { background-color: #9e6a03; }
+    .verdict-APPROVED { background-color: #238636; }
+    .verdict-pending { background-color: #30363d; color: #8b949e; }
     .title-text {
         font-size: 1.2rem;
         font-weight: 600;
@@ -82,12 +113,21 @@ st.markdown("""
 # --- STATE ---
 if "data" not in st.session_state:
     st.session_state.data = []
-if "view" not in st.session_state:
-    st.session_state.view = "DASHBOARD"
-if "selected_op" not in st.session_state:
-    st.session_state.selected_op = None
-if "audit_log" not in st.session_state:
-    st.session_state.audit_log = {}
+if "failed_books" not in st.session_state:
+    st.session_state.failed_books = 0
+if "candidates" not in st.session_state:
+    st.session_state.candidates = []
+if "scan_timing" not in st.session_state:
+    st.session_state.scan_timing = (None, None)
+if "scan_at" not in st.session_state:
+    st.session_state.scan_at = None
+    st.session_state.scan_params = None
+    st.session_state.index = None
+if "scan_diag" not in st.session_state:
+    st.session_state.scan_diag = None
+if "live" not in st.session_state:
+    st.session_state.live = None
+    st.session_state.live_key = None
 if "all_tags" not in st.session_state:
     st.session_state.all_tags = set([
         "Sports", "Memecoin", "Twitter", "Tweets", "Tweet Markets", "Gaming", 
@@ -111,18 +151,6 @@ with st.sidebar:
     # Dynamic Tag List (Sorted)
     sorted_tags = sorted(list(st.session_state.all_tags))
     
-    # Default Excludes
-    DEFAULT_EXCLUDES = [
-        "Sports",
-        "Memecoin",
-        "Twitter",
-        "Tweets",
-        "Tweet Markets",
-        "Pop Culture",
-        "Gaming",
-        "Social"
-    ]
-
     # Pre-select defaults only if they exist in the list
     default_selections = [t for t in DEFAULT_EXCLUDES if t in sorted_tags]
 
@@ -132,6 +160,26 @@ with st.sidebar:
         default=default_selections
     )
 
+    window_days = st.slider(
+        "Resolves in (days)", min_value=0, max_value=90, value=WINDOW_DAYS,
+        help="Inside the window of the last scan, changes re-query it instantly."
+    )
+    band = st.slider(
+        "Entry band (¢)", min_value=50, max_value=99,
+        value=(round(ENTRY_BAND[0] * 100), round(ENTRY_BAND[1] * 100)),
+        help="Quoted price and simulated average entry must both fall in this band."
+    )
+    min_fill = st.slider("Min fill (%)", min_value=50, max_value=100, value=round(MIN_FILL * 100))
+    max_slippage = st.slider(
+        "Max slippage (¢)", min_value=0.0, max_value=10.0, value=MAX_SLIPPAGE * 100, step=0.5
+    )
+    gates = make_gates((band[0] / 100, band[1] / 100), min_fill / 100, max_slippage / 100)
+
+    live_mode = st.toggle(
+        "📡 Live order books",
+        help="Stream book updates over WebSocket and re-rank as they arrive."
+    )
+
     st.divider()
 
     default_key = os.environ.get("OPENAI_API_KEY", "")
@@ -140,6 +188,10 @@ with st.sidebar:
         value=default_key,
         type="password"
     )
+    audit_top = st.slider(
+        "Audit top N", min_value=1, max_value=50, value=10,
+        help="How many of the top opportunities the batch audit button sends to the auditor."
+    )
 
     st.info("""
 **Ranking Logic**
@@ -148,330 +200,350 @@ with st.sidebar:
 3. Liquidity depth as tiebreaker
 """)
 
-# --- CORE SCANNER ---
-@st.cache_data(ttl=60, show_spinner=False)
-def run_scanner(capital_usd, forbidden_tags):
-    raw_events = fetch_events_paginated(limit=400)
-    now = utc_now()
-    min_date = now + timedelta(days=1)
-    max_date = now + timedelta(days=30)
-
-    candidates = []
-    token_ids = []
-    found_tags = set()
-
-    # Convert forbidden tags to lowercase for case-insensitive matching
-    forbidden_lower = [f.lower() for f in forbidden_tags]
-
-    for e in raw_events:
-        # Collect all tags found
-        tags = [t.get("label") for t in e.get("tags", [])]
-        for t in tags:
-            found_tags.add(t)
-
-        # Filter Logic (Case Insensitive)
-        # Check if any forbidden tag appears inside the event tags
-        is_forbidden = False
-        for t in tags:
-            t_lower = t.lower()
-            for bad in forbidden_lower:
-                if bad in t_lower:
-                    is_forbidden = True
-                    break
-            if is_forbidden:
-                break
-        
-        if is_forbidden:
-            continue
-
-        end_date = parse_iso_date(e.get("endDate"))
-        if not end_date or not (min_date <= end_date <= max_date):
-            continue
-
-        days_left = (end_date - now).days
-        
-        # Format Date (e.g., "Jan 12")
-        date_str = end_date.strftime("%b %d")
-
-        markets = e.get("markets", [])
-        if not markets:
-            continue
-
-        for m in markets:
-            try:
-                outcomes = m.get("outcomes")
-                prices = m.get("outcomePrices")
-                token_ids_raw = m.get("clobTokenIds")
-                volume_str = m.get("volume", "0") 
-
-                if isinstance(outcomes, str): outcomes = json.loads(outcomes)
-                if isinstance(prices, str): prices = json.loads(prices)
-                if isinstance(token_ids_raw, str): token_ids_raw = json.loads(token_ids_raw)
-
-                if not outcomes or not prices or not token_ids_raw:
-                    continue
-                if len(outcomes) != len(prices) or len(prices) != len(token_ids_raw):
-                    continue
-
-                best_idx = -1
-                for i, p in enumerate(prices):
-                    p_val = safe_float(p)
-                    if 0.85 <= p_val <= 0.99:
-                        best_idx = i
-                        break
-
-                if best_idx == -1:
-                    continue
-
-                candidates.append({
-                    "id": token_ids_raw[best_idx],
-                    "title": e["title"],
-                    "desc": e.get("description", ""),
-                    "tags": tags[:3],
-                    "target_outcome": outcomes[best_idx],
-                    "price_raw": safe_float(prices[best_idx]),
-                    "days": days_left,
-                    "date_str": date_str, # New formatted date
-                    "slug": e.get("slug"),
-                    "volume": safe_float(volume_str), 
-                    "end_date_iso": e.get("endDate")
-                })
-                token_ids.append(token_ids_raw[best_idx])
-
-            except Exception as err:
-                logging.error(f"Market parse error: {err}")
-
-    books = fetch_liquidity(token_ids)
-    results = []
-
-    for c in candidates:
-        book = books.get(str(c["id"]))
-        if not book:
-            continue
-
-        asks = book.get("asks", [])
-        fill_pct, avg_entry, slippage, max_liq, spread_warn = calculate_slippage(
-            asks, capital_usd
-        )
+    with st.expander("⚡ Cache"):
+        for stat in cache_stats():
+            st.caption(
+                f"**{stat['name']}**: {stat['hits']} hits / {stat['misses']} misses "
+                f"({stat['entries']} cached)"
+            )
+        for stat in coalesce_stats():
+            st.caption(
+                f"**{stat['name']} in flight**: {stat['coalesced']} shared / {stat['fetched']} fetched "
+                f"({stat['in_flight']} now)"
+            )
+        if last_event_fetch:
+            st.caption(
+                f"**last Gamma fetch**: {last_event_fetch['pages']} pages, "
+                f"{last_event_fetch['bytes'] / 1e6:.1f} MB, "
+                f"{last_event_fetch['fetched']} events → {last_event_fetch['kept']} kept"
+            )
 
-        if spread_warn:
-            continue
-        if fill_pct < 0.95:
-            continue
-        if slippage > 0.03:
-            continue
-        if not (0.85 <= avg_entry <= 0.99):
-            continue
-
-        roi_pct = ((1.0 - avg_entry) / avg_entry) * 100
-        profit = (capital_usd / avg_entry) - capital_usd
-
-        c.update({
-            "real_entry": avg_entry,
-            "slippage": slippage,
-            "roi": roi_pct,
-            "profit": profit,
-            "max_liq": max_liq
-        })
-        results.append(c)
-
-    results.sort(key=lambda x: (x["roi"], x["max_liq"]), reverse=True)
-    return results, found_tags
+    with st.expander("🚦 API budget"):
+        for stat in limiter_stats():
+            st.caption(
+                f"**{stat['name']}**: {stat['rate']:.1f} req/s, {stat['requests']} requests, "
+                f"{stat['throttled']} throttled, {stat['waited_s']:.1f}s queued"
+            )
+
+    with st.expander("🩺 Scan diagnostics"):
+        diag = st.session_state.scan_diag
+        if diag:
+            st.caption(f"**last scan**: {diag['events']} events, {diag['markets']} markets")
+            st.caption("**stages**: " + " | ".join(
+                f"{stage} {seconds:.2f}s" for stage, seconds in diag["stages"].items()
+            ))
+            st.caption("**rejected**: " + (" | ".join(
+                f"{reason} {diag['rejections'][reason]}"
+                for reason in metrics.REJECTION_REASONS if diag["rejections"].get(reason)
+            ) or "none"))
+        for endpoint, stat in metrics.http_summary().items():
+            st.caption(
+                f"**{endpoint}**: {stat['requests']} requests, {stat['mean_s'] * 1000:.0f}ms mean, "
+                f"{stat['errors']} errors, {stat['bytes'] / 1e6:.1f} MB "
+                f"({stat['wire_bytes'] / 1e6:.1f} MB on the wire)"
+            )
+        for host, stat in metrics.connection_summary().items():
+            st.caption(
+                f"**{host}**: {stat['connections']} connections for {stat['requests']} requests "
+                f"({stat['reuse']:.0%} reused)"
+            )
+        if metrics.METRICS_PORT:
+            st.caption(f"Prometheus metrics on port {metrics.METRICS_PORT} at /metrics")
 
 # --- VIEWS ---
+PREVIEW_CARDS = 20
+AUDIT_POLL_S = 2
+SNAPSHOT_POLL_S = 2
+
+def verdict_badge(item):
+    state, result = audits.status(item)
+    if state == "done":
+        verdict = result["verdict"] or "pending"
+        return f"<span class='verdict verdict-{verdict}'>🛡 {result['verdict'] or 'UNCLEAR'}</span>"
+    if state == "running":
+        return "<span class='verdict verdict-pending'>⏳ auditing</span>"
+    if state == "failed":
+        return "<span class='verdict verdict-pending'>⚠ audit failed</span>"
+    return ""
+
+def render_cards(items, start=0):
+    st.markdown(cards_html(items, start, verdict_badge), unsafe_allow_html=True)
+
+def render_allocation(items, books_for, key):
+    """Optional bankroll split across `items`; `books_for(ids)` supplies the ask ladders."""
+    if not items or not st.toggle("💼 Allocate a bankroll across these opportunities", key=f"{key}_on"):
+        return
+
+    col1, col2 = st.columns(2)
+    bankroll = col1.number_input(
+        "Bankroll ($)", min_value=500, value=capital * 10, step=500, key=f"{key}_bankroll"
+    )
+    cap_pct = col2.slider("Max per market (%)", 5, 100, 25, step=5, key=f"{key}_cap")
+
+    allocations, undeployed = allocate(
+        items, books_for([i["id"] for i in items]), bankroll, market_cap=bankroll * cap_pct / 100,
+        max_slippage=gates.max_slippage,
+    )
+    deployed = bankroll - undeployed
+    profit = sum(a["alloc_profit"] for a in allocations)
+    st.caption(
+        f"${deployed:,.0f} deployed across {len(allocations)} markets "
+        f"(${undeployed:,.0f} undeployed) | expected profit ${profit:,.0f}"
+        + (f" ({profit / deployed * 100:.2f}%)" if deployed else "")
+    )
+    st.dataframe([
+        {
+            "Market": a["title"],
+            "Outcome": a["target_outcome"],
+            "Allocation ($)": round(a["alloc"], 2),
+            "Avg entry (¢)": round(a["alloc_entry"] * 100, 2),
+            "Profit ($)": round(a["alloc_profit"], 2),
+            "ROI (%)": round(a["alloc_roi"], 2),
+        }
+        for a in allocations
+    ], hide_index=True)
+
+def card_list(items, key, polling=False):
+    """
+    One page of cards with an audit picker and panel. As a fragment,
+    paging and opening an audit rerun only this list, never the whole
+    dashboard.
+    """
+    pages = page_count(len(items))
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+
+    col1, col2 = st.columns([1, 4])
+    page = col1.number_input("Page", min_value=1, max_value=pages, key=page_key)
+    start, end = page_window(len(items), page)
+    col2.caption(f"Showing {start + 1}–{end} of {len(items)} | {pages} pages")
+
+    window = items[start:end]
+    col1, col2 = st.columns([4, 1])
+    pick = col1.selectbox(
+        "Audit market", range(len(window)), key=f"{key}_pick", label_visibility="collapsed",
+        format_func=lambda i: f"#{start + i + 1} {window[i]['title']} ({window[i]['target_outcome']})"
+    )
+    if col2.button("Red Team Audit 🛡", key=f"{key}_audit", disabled=not window):
+        st.session_state[f"{key}_detail"] = window[pick]
+
+    op = st.session_state.get(f"{key}_detail")
+    if op:
+        audit_panel(op, key)
+    render_cards(window, start)
+
+    # Last audit finished: one full rerun turns the polling off again
+    if polling and not audits.pending():
+        st.rerun()
+
+def render_card_list(items, key):
+    """Paged cards whose verdicts fill in as background audits complete."""
+    polling = audits.pending() > 0
+    st.fragment(card_list, run_every=AUDIT_POLL_S if polling else None)(items, key, polling)
+
+def audit_batch_button(items):
+    label = f"🛡 Audit top {min(audit_top, len(items))} in background"
+    if st.button(label, disabled=not api_key, help=None if api_key else "OpenAI key required."):
+        audits.submit_many(items[:audit_top], api_key)
+        st.rerun()
+
+def live_books_for(live):
+    return lambda ids: {t: {"asks": live.books.asks_for(t)} for t in ids}
+
+def cached_books_for(ids):
+    books, _ = get_books(ids)
+    return books
+
+def sync_live_mode(candidates):
+    """Start, restart or stop the live book stream to match the sidebar."""
+    live = st.session_state.live
+    wanted = live_mode and bool(candidates)
+    # Refreshes that keep the same markets keep the stream subscribed
+    key = (capital, gates, frozenset(str(c["id"]) for c in candidates))
+
+    if live and (not wanted or st.session_state.live_key != key):
+        live.stop()
+        st.session_state.live = live = None
+
+    if wanted and not live:
+        books, _ = get_books([c["id"] for c in candidates])
+        st.session_state.live = LiveScanner(candidates, capital, books=books, gates=gates).start()
+        st.session_state.live_key = key
+
+@st.fragment(run_every=2)
+def live_cards():
+    live = st.session_state.live
+    status = "Connected" if live.connected else "Connecting..."
+    st.caption(f"📡 Live order books: {status} | {live.updates} book updates")
+
+    items = live.ranked()
+    st.success(f"Found {len(items)} opportunities")
+    render_allocation(items, live_books_for(live), key="live_alloc")
+    audit_batch_button(items)
+    card_list(items, key="live")
+
+def newest_index(window_days):
+    """The newest market index (this session's scan or the scheduler's) covering `window_days`."""
+    indexes = [st.session_state.index, scheduler.index if scheduler else None]
+    indexes = [i for i in indexes if i is not None and i.covers(window_days)]
+    return max(indexes, key=lambda i: i.created_at, default=None)
+
 def view_dashboard():
     st.title("🎯 Mispriced Ops Scanner")
-    st.caption(f"Scanning for ${capital} bets | Resolving in 1–30 days")
+    st.caption(
+        f"Scanning for ${capital} bets | Resolving in {window_days[0]}–{window_days[1]} days | "
+        f"Entry {band[0]}–{band[1]}¢, fill ≥{min_fill}%, slippage ≤{max_slippage:g}¢"
+    )
+    params = (capital, frozenset(excluded_tags), window_days, gates)
 
     if st.button("🔎 Scan & Rank Markets", type="primary"):
-        with st.spinner("Scanning markets..."):
-            data, new_tags = run_scanner(capital, excluded_tags)
-            st.session_state.data = data
-            # Update dynamic tags for next run
-            st.session_state.all_tags.update(new_tags)
-            st.rerun()
-
-    if st.session_state.data:
-        st.success(f"Found {len(st.session_state.data)} opportunities")
-
-        for i, item in enumerate(st.session_state.data):
-            depth_ratio = item["max_liq"] / capital
-            depth_label = "Deep" if depth_ratio > 3 else "Moderate"
-            tags_html = "".join(
-                f"<span class='tag-bubble'>{t}</span>" for t in item["tags"]
-            )
-            market_url = f"https://polymarket.com/event/{item['slug']}"
-
-            # Format volume
-            vol_display = f"${item['volume']:,.0f}" if item['volume'] > 1000 else f"${item['volume']:.0f}"
-
-            st.markdown(f"""
-            <div class="card">
-                <div style="display:flex; justify-content:space-between;">
-                    <div>
-                        <div style="color:#8b949e;">#{i+1}</div>
-                        <div class="title-text">
-                            <a href="{market_url}" target="_blank">{item["title"]} ↗</a>
-                        </div>
-                        {tags_html}
-                    </div>
-                    <span class="win-tag">{item["target_outcome"].upper()}</span>
-                </div>
-                <hr>
-                <div style="display:flex; justify-content:space-between;">
-                    <div><div class="sub-stat">Entry</div><div class="big-stat">{item["real_entry"]*100:.1f}¢</div></div>
-                    <div><div class="sub-stat">ROI</div><div class="roi-stat">+{item["roi"]:.2f}%</div></div>
-                    <div><div class="sub-stat">Profit</div><div class="roi-stat">${item["profit"]:.0f}</div></div>
-                    <div><div class="sub-stat">Volume</div><div class="big-stat">{vol_display}</div></div>
-                    <div><div class="sub-stat">Ends</div><div class="big-stat">{item["date_str"]}</div></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            if st.button("Red Team Audit 🛡", key=f"audit_{item['id']}"):
-                st.session_state.selected_op = item
-                st.session_state.view = "DETAIL"
-                st.rerun()
-
-def view_detail():
-    op = st.session_state.selected_op
-    if st.button("← Back"):
-        st.session_state.view = "DASHBOARD"
+        progress = st.progress(0.0, text="Scanning markets...")
+        board = st.empty()
+
+        # Opportunities are inserted into the ranked preview as each chunk
+        # of books is scored; buttons appear after the final rerun.
+        try:
+            for report, new_results in iter_scan(capital, excluded_tags, window_days, gates=gates, index=True):
+                scored = report.scored / max(report.extracted, 1)
+                progress.progress(
+                    min(scored, 1.0),
+                    text=f"{report.events} events | {report.scored}/{report.extracted} candidates scored | "
+                         f"{len(report.results)} opportunities"
+                )
+                if new_results:
+                    with board.container():
+                        render_cards(report.results[:PREVIEW_CARDS])
+        except EventFetchError as e:
+            progress.empty()
+            board.empty()
+            st.error(f"Scan failed: {e}. Try again shortly.")
+            return
+
+        st.session_state.scan_timing = (report.first_result_s, report.elapsed_s)
+        st.session_state.scan_diag = {
+            "events": report.events,
+            "markets": report.markets,
+            "stages": report.stage_times(),
+            "rejections": dict(report.rejections),
+        }
+        st.session_state.data = report.results
+        st.session_state.candidates = report.candidates
+        st.session_state.scan_at = time.time()
+        st.session_state.scan_params = params
+        st.session_state.index = report.index
+        st.session_state.failed_books = len(report.failed_ids)
+        # Update dynamic tags for next run
+        st.session_state.all_tags.update(report.found_tags)
         st.rerun()
 
-    st.header(op["title"])
-    st.markdown(f"**Market Link:** [View on Polymarket](https://polymarket.com/event/{op['slug']})")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Outcome", op['target_outcome'])
-    col2.metric("Entry Price", f"{op['real_entry']*100:.2f}¢")
-    col3.metric("Est. ROI", f"+{op['roi']:.2f}%")
-    col4.metric("Ends On", op['date_str'])
+    # The shared snapshot answers default scans without any network I/O,
+    # and the newest market index re-queries any other settings inside its
+    # window; a session's own scan wins only while it is newer than both
+    # and still matches the sidebar.
+    snapshot = latest_snapshot()
+    index = newest_index(window_days)
+    newest = max((s.created_at for s in (snapshot, index) if s is not None), default=0.0)
+    own_scan_current = st.session_state.scan_params == params and st.session_state.scan_at > newest
+    if snapshot and snapshot.covers(capital, excluded_tags, window_days, gates) and not own_scan_current:
+        st.session_state.data = []
+        st.session_state.candidates = []
+        st.session_state.all_tags.update(snapshot.found_tags)
+        data = snapshot.results_for(capital)
+        candidates = snapshot.candidates
+        failed_books = snapshot.failed_books
+        refreshing = scheduler is not None and scheduler.refreshing
+        st.caption(
+            f"📦 Shared snapshot, {snapshot.age():.0f}s old "
+            f"(refreshed every {REFRESH_INTERVAL:.0f}s; scan {snapshot.elapsed_s:.1f}s)"
+            + (" | 🔄 refreshing..." if refreshing else "")
+        )
+        if refreshing:
+            st.fragment(snapshot_poll, run_every=SNAPSHOT_POLL_S)(snapshot.created_at)
+    elif index is not None and not own_scan_current:
+        # Books a wider band or fewer exclusions admit are fetched once
+        with st.spinner("Re-querying scanned markets..."):
+            report = index.query(capital, excluded_tags, window_days, gates)
+        data = report.results
+        candidates = report.candidates
+        failed_books = len(report.failed_ids)
+        st.session_state.all_tags.update(report.found_tags)
+        st.caption(
+            f"⚡ Re-queried {report.events} events from a scan {index.age():.0f}s old "
+            f"in {report.elapsed_s * 1000:.0f}ms | press Scan for fresh prices"
+        )
+    else:
+        data = st.session_state.data
+        candidates = st.session_state.candidates
+        failed_books = st.session_state.failed_books
+        first_result_s, elapsed_s = st.session_state.scan_timing
+        if elapsed_s is not None:
+            first = f"{first_result_s:.1f}s" if first_result_s is not None else "n/a"
+            st.caption(f"⏱ First result after {first} | full scan {elapsed_s:.1f}s")
+        elif snapshot is None and scheduler is not None and scheduler.refreshing:
+            st.info("🔄 Building the first shared snapshot; results appear here when it lands.")
+            st.fragment(snapshot_poll, run_every=SNAPSHOT_POLL_S)(0.0)
+
+    if failed_books:
+        st.warning(
+            f"{failed_books} order books could not be fetched; "
+            "those markets were skipped, not ruled out."
+        )
+
+    sync_live_mode(candidates)
+    if st.session_state.live:
+        live_cards()
+    elif data:
+        st.success(f"Found {len(data)} opportunities")
+        render_allocation(data, cached_books_for, key="alloc")
+        audit_batch_button(data)
+        render_card_list(data, key="cards")
+
+def snapshot_poll(created_at):
+    # A newer snapshot has been published: redraw the dashboard with it
+    snapshot = latest_snapshot()
+    if snapshot is not None and snapshot.created_at > created_at:
+        st.rerun()
 
-    if op["id"] in st.session_state.audit_log:
+def audit_panel(op, key):
+    with st.container(border=True):
+        col1, col2 = st.columns([5, 1])
+        col1.subheader(op["title"])
+        col2.button("✕ Close", key=f"{key}_close", on_click=st.session_state.pop, args=(f"{key}_detail", None))
+        st.markdown(f"**Market Link:** [View on Polymarket](https://polymarket.com/event/{op['slug']})")
+
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Outcome", op['target_outcome'])
+        col2.metric("Entry Price", f"{op['real_entry']*100:.2f}¢")
+        col3.metric("Est. ROI", f"+{op['roi']:.2f}%")
+        col4.metric("Ends On", op['date_str'])
+
+        st.divider()
+        audit_status(op, key)
+
+def audit_status(op, key):
+    state, result = audits.status(op)
+    if state == "running":
+        st.fragment(audit_poll, run_every=AUDIT_POLL_S)(op)
+        return
+    if state == "done":
         st.markdown("### 🛡 Red Team Report")
-        st.markdown(st.session_state.audit_log[op["id"]])
+        st.markdown(result["report"])
         return
+    if state == "failed":
+        st.error(f"Audit failed: {result}")
 
-    st.divider()
     st.write("Click below to send this market to the Forensic Auditor AI agent.")
-    
-    if st.button("Run Forensic Audit (GPT-4o)"):
-        if not api_key:
-            st.error("OpenAI key required.")
-            return
+    st.button(
+        "Run Forensic Audit (GPT-4o)", key=f"{key}_run", disabled=not api_key,
+        help=None if api_key else "OpenAI key required.", on_click=audits.submit, args=(op, api_key)
+    )
 
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Prepare Data Block
-        market_info = f"""
-        MARKET: {op['title']}
-        DESCRIPTION: {op['desc']}
-        OUTCOME: {op['target_outcome']}
-        CURRENT PRICE: {op['real_entry']} (Implied Probability: {op['real_entry']*100:.1f}%)
-        RESOLUTION DATE: {op['end_date_iso']} (approx {op['days']} days)
-        LIQUIDITY DEPTH: ${op['max_liq']:.2f}
-        TOTAL VOLUME: ${op['volume']:.2f}
-        POTENTIAL ROI: {op['roi']:.2f}%
-        SLIPPAGE ESTIMATE: {op['slippage']*100:.2f}%
-        """
-
-        current_date = datetime.now().strftime("%Y-%m-%d")
-        
-        # THE PROMPT
-        system_prompt = f"""
-# ROLE
-You are a Forensic Auditor and Adversarial Risk Manager specializing in Markets, Politics, and Conflict.
-Your job is NOT to find a good bet. Your job is to disqualify bad bets.
-You treat every market as a potential "Trap" until the data proves otherwise.
-
-# CONTEXT
-- Current Date: {current_date}
-- Risk-Free Rate: You must approximate the current "3-Month US Treasury Bill" yield for calculations (e.g., if T-Bills are 4%, use 0.04).
-
-# INPUT DATA
-{market_info}
-
-# MISSION
-Perform a "Red Team" investigation on the candidates above.
-First, determine the Market Type for each candidate:
-1. TYPE A (Polling/Elections): Approval Ratings, Special Election Margins.
-2. TYPE B (Procedural/Legal): Legislative Votes, Court Rulings, SEC Decisions.
-3. TYPE C (Corporate/Data): M&A, Earnings, Central Bank Rates.
-4. TYPE D (Geopolitics/War): Ceasefires, Treaties, Territorial Control.
-
----
-
-# PHASE 1: THE "SOURCE OF TRUTH" AUDIT
-
-### IF TYPE A (POLLING MARKET):
-Apply the "Recent-Cycle Accuracy" Standard:
-Judge pollsters based on their performance in the LAST General Election cycle.
-- TIER 1 (TRUST): Top-rated firms with <2pt error in the last cycle (e.g., AtlasIntel/Verasight in recent eras).
-- TIER 2 (VERIFY): Traditional high-volume pollsters (e.g., NYT/Siena, Emerson).
-- TIER 3 (REJECT): Any firm that had a >4pt "Historic Miss" in the last major cycle.
-- CRITICAL CHECK: If the race is Local/State, REJECT National-only pollsters (they often lack local weighting models).
-
-### IF TYPE B (PROCEDURAL MARKET):
-Apply the "Whip Count" Standard:
-- REJECT: News articles, op-eds, or "Insider" tweets.
-- ACCEPT: Official Government Domains (congress.gov, supremecourt.gov, etc.) or Court Dockets (PACER).
-- TRAP CHECK: Ensure "Passed Senate" is not confused with "Signed into Law."
-
-### IF TYPE C (CORPORATE/DATA):
-Apply the "Ledger" Standard:
-- REJECT: Substack rumors or "Sources close to the matter."
-- ACCEPT: SEC EDGAR (8-K/10-Q), Official Central Bank Press Releases, Bureau of Labor Statistics (.gov).
-
-### IF TYPE D (GEOPOLITICS/WAR):
-Apply the "Triangulation" Standard (Anti-Propaganda Filter):
-- THE UNILATERAL BAN: Never trust a combatant's official statement about their own success or adherence to a truce unless the enemy confirms it.
-- Example: "Army A says truce holding" = REJECT (Bias).
-- Example: "Army A and Army B issue joint start time" = ACCEPT (Bilateral).
-- TRUSTED NEUTRALS: If bilateral confirmation is missing, accept only on-ground verification from:
-- IAEA (Nuclear), UN Security Council (Resolutions), Red Cross/Crescent (Humanitarian Access).
-- TRAP CHECK: Watch for "Ceasefire Agreed" vs "Ceasefire in Effect." (Agreements are easy; "in effect" markets are traps because one bullet voids the bet).
-
----
-
-# PHASE 2: THE "NEGATIVE SEARCH" (The Black Swan Hunt)
-Do not search for confirmation. Search for the failure mode.
-Run these queries based on the market type:
-
-- Type A/B/C: "[Candidate/Bill]" delay OR lawsuit OR "blocked by"
-- Type D (War): "[Location]" "violations" OR "skirmish" OR "fighting reported" -official
-- Note: The "-official" tag helps find independent reports contradicting government narratives.
-
-- Immediate Kill Rule: If any credible report from the last 24h mentions a "TRO" (Restraining Order), "Indefinite Recess," or "Sporadic Clashes" (for war), REJECT.
-
----
-
-# PHASE 3: EXECUTION MATH (Python)
-(Note: You are the AI, perform the mental check of this logic)
-Use the user's entry price of {op['real_entry']} and {op['days']} days to resolution.
-Compare against a Risk Free Rate of ~4.5%.
-
-# OUTPUT FORMAT
-Provide your response in Markdown.
-1. **Classification:** (Type A/B/C/D)
-2. **The Verdict:** (KILL / WARNING / APPROVED)
-3. **Risk Analysis:** (Bullet points on specific failure modes found)
-4. **Execution Check:** (Does the yield beat the 4.5% risk free rate + premium?)
-"""
-
-        with st.spinner("Forensic Auditor is analyzing..."):
-            try:
-                res = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=[{"role": "user", "content": system_prompt}]
-                )
-                st.session_state.audit_log[op["id"]] = res.choices[0].message.content
-                st.rerun()
-            except Exception as e:
-                st.error(f"Audit failed: {e}")
-
-# --- ROUTER ---
-if st.session_state.view == "DASHBOARD":
-    view_dashboard()
-else:
-    view_detail()
+def audit_poll(op):
+    # Finished: redraw the report and the card badges
+    if audits.status(op)[0] != "running":
+        st.rerun()
+    st.info("⏳ Forensic Auditor is analyzing...")
+
+# --- MAIN ---
+view_dashboard()
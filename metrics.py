@@ -0,0 +1,235 @@
+"""
+Process-wide scan metrics.
+
+Counters and histograms for HTTP traffic, scan stage timings and
+rejection reasons, rendered in the Prometheus text exposition format.
+`serve` exposes them on `/metrics` from a background thread.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# --- CONFIG ---
+METRICS_PORT = int(os.environ.get("SCANNER_METRICS_PORT", 0)) or None
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Why a market (or whole event) was dropped, in pipeline order
+REJECTION_REASONS = [
+    "missing_prices", "tag", "date_window", "entry_band", "missing_book",
+    "spread_warn", "low_fill", "high_slippage", "fill_entry_band",
+]
+
+
+def _num(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _label_str(labelnames, key):
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{n}="{v}"' for n, v in zip(labelnames, key))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        """{label values: count}"""
+        with self._lock:
+            return dict(self.values)
+
+    def lines(self):
+        return [
+            f"{self.name}{_label_str(self.labelnames, key)} {_num(value)}"
+            for key, value in sorted(self.snapshot().items())
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            entry = self.values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self):
+        """{label values: (bucket counts, sum, count)}"""
+        with self._lock:
+            return {k: (list(v[0]), v[1], v[2]) for k, v in self.values.items()}
+
+    def lines(self):
+        out = []
+        for key, (counts, total, count) in sorted(self.snapshot().items()):
+            for bound, c in zip(self.buckets, counts):
+                labels = _label_str(self.labelnames + ("le",), key + (f"{bound:g}",))
+                out.append(f"{self.name}_bucket{labels} {c}")
+            labels = _label_str(self.labelnames + ("le",), key + ("+Inf",))
+            out.append(f"{self.name}_bucket{labels} {count}")
+            out.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {_num(total)}")
+            out.append(f"{self.name}_count{_label_str(self.labelnames, key)} {count}")
+        return out
+
+
+http_requests = Counter(
+    "scanner_http_requests_total", "HTTP requests by endpoint and status.", ["endpoint", "status"]
+)
+http_latency = Histogram(
+    "scanner_http_request_seconds", "HTTP request latency by endpoint.", ["endpoint"]
+)
+http_bytes = Counter(
+    "scanner_http_response_bytes_total", "Response body bytes by endpoint.", ["endpoint"]
+)
+http_wire_bytes = Counter(
+    "scanner_http_wire_bytes_total", "Response body bytes on the wire (compressed) by endpoint.",
+    ["endpoint"]
+)
+http_connections = Counter(
+    "scanner_http_connections_total", "New HTTP connections by host.", ["host"]
+)
+coalesced = Counter(
+    "scanner_coalesced_total", "Fetches served by another caller's in-flight fetch, by kind.",
+    ["kind"]
+)
+# `kind` is "scan" for fetching scans, "requery" for MarketIndex re-queries
+stage_seconds = Histogram(
+    "scanner_stage_seconds", "Time spent per scan stage.", ["kind", "stage"], buckets=STAGE_BUCKETS
+)
+scans = Counter("scanner_scans_total", "Completed scans.", ["kind"])
+rejections = Counter("scanner_rejections_total", "Markets dropped by reason.", ["kind", "reason"])
+opportunities = Counter("scanner_opportunities_total", "Opportunities that passed every gate.", ["kind"])
+
+REGISTRY = [
+    http_requests, http_latency, http_bytes, http_wire_bytes, http_connections, coalesced,
+    stage_seconds, scans, rejections, opportunities,
+]
+
+
+def endpoint_of(url):
+    """Low-cardinality endpoint label: host and path, no query."""
+    parts = urlparse(url)
+    return f"{parts.netloc}{parts.path}"
+
+
+def observe_http(url, status, seconds, nbytes, wire_bytes=None):
+    """One response: `nbytes` decoded, `wire_bytes` as received (if known)."""
+    endpoint = endpoint_of(url)
+    http_requests.inc(endpoint=endpoint, status=status)
+    http_latency.observe(seconds, endpoint=endpoint)
+    http_bytes.inc(nbytes, endpoint=endpoint)
+    http_wire_bytes.inc(nbytes if wire_bytes is None else wire_bytes, endpoint=endpoint)
+
+
+def observe_connection(host):
+    http_connections.inc(host=host)
+
+
+def record_scan(report, found=None, kind="scan"):
+    """
+    Fold one finished ScanReport into the process-wide metrics. `found`
+    overrides the opportunity count for scans that stream results
+    instead of keeping them; `kind` labels re-queries apart from scans.
+    """
+    scans.inc(kind=kind)
+    opportunities.inc(len(report.results) if found is None else found, kind=kind)
+    for stage, seconds in report.stage_times().items():
+        stage_seconds.observe(seconds, kind=kind, stage=stage)
+    for reason, count in report.rejections.items():
+        rejections.inc(count, kind=kind, reason=reason)
+
+
+def http_summary():
+    """Per-endpoint request count, mean latency, error count and bytes, for the UI."""
+    summary = {}
+    for (endpoint,), (_, total, count) in http_latency.snapshot().items():
+        summary[endpoint] = {
+            "requests": count, "mean_s": total / count, "errors": 0, "bytes": 0, "wire_bytes": 0,
+        }
+    for (endpoint, status), count in http_requests.snapshot().items():
+        if endpoint in summary and not status.startswith("2"):
+            summary[endpoint]["errors"] += count
+    for (endpoint,), nbytes in http_bytes.snapshot().items():
+        if endpoint in summary:
+            summary[endpoint]["bytes"] = nbytes
+    for (endpoint,), nbytes in http_wire_bytes.snapshot().items():
+        if endpoint in summary:
+            summary[endpoint]["wire_bytes"] = nbytes
+    return summary
+
+
+def connection_summary():
+    """Per-host requests, new connections and the share of requests on a reused connection."""
+    summary = {}
+    for (endpoint, _), count in http_requests.snapshot().items():
+        host = endpoint.split("/", 1)[0]
+        summary.setdefault(host, {"requests": 0, "connections": 0})["requests"] += count
+    for (host,), count in http_connections.snapshot().items():
+        summary.setdefault(host, {"requests": 0, "connections": 0})["connections"] = count
+    for stat in summary.values():
+        stat["reuse"] = 1 - stat["connections"] / stat["requests"] if stat["requests"] else 0.0
+    return summary
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.lines())
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if urlparse(self.path).path != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=METRICS_PORT, host="0.0.0.0"):
+    """Expose `/metrics` on `port` from a daemon thread. Returns the server."""
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
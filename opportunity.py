@@ -0,0 +1,164 @@
+"""
+Compact candidates and scored opportunities.
+
+A scan can hold tens of thousands of candidates, and every dashboard
+session and snapshot keeps its ranked results, so they are `__slots__`
+records rather than dicts:
+
+- Event-level fields (title, slug, tags, dates) live once per event in an
+  `EventInfo` shared by all of the event's markets.
+- Tags, outcome labels and date labels are interned, so each distinct
+  label is stored once per process.
+- Descriptions, by far the largest field, are not held at all when the
+  events came from the ingest store: they are read back from it on
+  access (the audit prompt), and only their hash (the audit cache key)
+  stays resident.
+
+Candidates and opportunities are read-only mappings with the keys the
+scanner's dicts always had, so `op["roi"]`, `op.get("desc")` and
+`dict(op)` keep working. Iteration leaves out "desc" (it can cost a store
+read per event), so `dict(op)` copies everything but the description.
+"""
+import hashlib
+import sys
+from collections.abc import Mapping
+
+# Reads an event's description by event ID when it is not held in
+# memory; set by cache.py to the ingest store (None: no descriptions)
+description_source = None
+
+
+def intern(text):
+    return sys.intern(text) if type(text) is str else text
+
+
+def description_hash(text):
+    return hashlib.sha1((text or "").encode()).hexdigest()[:16]
+
+
+class EventInfo:
+    """The fields an event's candidates share, stored once per event."""
+
+    __slots__ = ("id", "title", "slug", "tags", "days", "date_str", "end_date_iso", "desc_hash", "_desc")
+
+    def __init__(self, id, title, slug, tags, days, date_str, end_date_iso, desc=None, desc_hash=None):
+        self.id = id
+        self.title = title
+        self.slug = slug
+        self.tags = tuple(intern(t) for t in tags)
+        self.days = days
+        self.date_str = intern(date_str)
+        self.end_date_iso = end_date_iso
+        self.desc_hash = desc_hash or description_hash(desc)
+        self._desc = desc
+
+    @property
+    def desc(self):
+        """The description: held if it was given, else read from `description_source`."""
+        if self._desc is not None:
+            return self._desc
+        if description_source is None:
+            return ""
+        return description_source(self.id) or ""
+
+    def to_row(self):
+        """JSON-friendly row (without the description), as stored in snapshots."""
+        return [self.id, self.title, self.slug, list(self.tags), self.days, self.date_str,
+                self.end_date_iso, self.desc_hash]
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(*row[:7], desc_hash=row[7])
+
+
+class Candidate(Mapping):
+    """One market's entry-band outcome, pending its order book."""
+
+    __slots__ = ("id", "event", "target_outcome", "price_raw", "volume")
+
+    # Iterated keys, in the order the scanner's candidate dicts had them;
+    # "desc" and "desc_hash" are looked up only by name
+    FIELDS = (
+        "id", "title", "tags", "target_outcome", "price_raw", "days", "date_str",
+        "slug", "volume", "end_date_iso",
+    )
+    _KEYS = frozenset(FIELDS + ("desc", "desc_hash"))
+
+    def __init__(self, id, event, target_outcome, price_raw, volume):
+        self.id = id
+        self.event = event
+        self.target_outcome = intern(target_outcome)
+        self.price_raw = price_raw
+        self.volume = volume
+
+    # Event-level fields
+    title = property(lambda self: self.event.title)
+    desc = property(lambda self: self.event.desc)
+    desc_hash = property(lambda self: self.event.desc_hash)
+    tags = property(lambda self: self.event.tags)
+    days = property(lambda self: self.event.days)
+    date_str = property(lambda self: self.event.date_str)
+    slug = property(lambda self: self.event.slug)
+    end_date_iso = property(lambda self: self.event.end_date_iso)
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.id!r}, {self.title!r}, {self.target_outcome!r})"
+
+    def to_row(self, event_index):
+        """JSON-friendly row, with the event as an index into a list of event rows."""
+        return [event_index, self.id, self.target_outcome, self.price_raw, self.volume]
+
+    @classmethod
+    def from_row(cls, row, events):
+        return cls(row[1], events[row[0]], *row[2:])
+
+
+class Opportunity(Candidate):
+    """A candidate whose simulated fill passed the gates."""
+
+    __slots__ = ("real_entry", "slippage", "roi", "profit", "max_liq")
+
+    FIELDS = Candidate.FIELDS + ("real_entry", "slippage", "roi", "profit", "max_liq")
+    _KEYS = frozenset(FIELDS + ("desc", "desc_hash"))
+
+    def __init__(self, candidate, real_entry, slippage, roi, profit, max_liq):
+        if isinstance(candidate, Candidate):
+            self.id = candidate.id
+            self.event = candidate.event
+            self.target_outcome = candidate.target_outcome
+            self.price_raw = candidate.price_raw
+            self.volume = candidate.volume
+        else:
+            self.id = candidate.get("id")
+            self.event = event_of(candidate)
+            self.target_outcome = intern(candidate.get("target_outcome"))
+            self.price_raw = candidate.get("price_raw")
+            self.volume = candidate.get("volume")
+        self.real_entry = real_entry
+        self.slippage = slippage
+        self.roi = roi
+        self.profit = profit
+        self.max_liq = max_liq
+
+
+def event_of(candidate):
+    """An EventInfo for a plain candidate dict (e.g. hand-built in benchmarks)."""
+    c = candidate
+    return EventInfo(
+        c.get("event_id"), c.get("title"), c.get("slug"), c.get("tags") or (), c.get("days"),
+        c.get("date_str"), c.get("end_date_iso"), desc=c.get("desc", ""),
+    )
@@ -0,0 +1,209 @@
+"""
+Array-backed order books.
+
+Books are parsed and sorted once into flat NumPy arrays with cumulative
+notional and shares, so fills for any capital (or a whole vector of
+capitals) are answered with `searchsorted` instead of walking each ladder
+in Python. Results match `utils.calculate_slippage`.
+
+Cached books keep only their asks, as a `Ladder` of two packed float
+arrays instead of the /books JSON's per-level dicts of strings.
+"""
+from array import array
+
+import numpy as np
+
+from utils import safe_float
+
+SPREAD_LIMIT = 0.05
+
+
+def _to_floats(values):
+    """Convert API number strings to floats with `safe_float` semantics."""
+    # NumPy would read a missing value as NaN; safe_float makes it 0.0
+    if None in values:
+        values = [0.0 if v is None else v for v in values]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([safe_float(v) for v in values], dtype=np.float64)
+
+
+class Ladder:
+    """
+    One book's ask levels as packed float arrays, in the book's order.
+
+    Iterates as {"price", "size"} levels, so it stands in for a /books
+    `asks` list wherever one is read.
+    """
+
+    __slots__ = ("prices", "sizes")
+
+    def __init__(self, prices, sizes):
+        self.prices = prices
+        self.sizes = sizes
+
+    @classmethod
+    def from_asks(cls, asks):
+        prices = array("d", _to_floats([level.get("price") for level in asks or []]).tobytes())
+        sizes = array("d", _to_floats([level.get("size") for level in asks or []]).tobytes())
+        return cls(prices, sizes)
+
+    def arrays(self):
+        """(prices, sizes) as NumPy views, without copying."""
+        return np.frombuffer(self.prices), np.frombuffer(self.sizes)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __iter__(self):
+        return ({"price": p, "size": s} for p, s in zip(self.prices, self.sizes))
+
+
+def compact_book(book):
+    """A /books entry reduced to {"asks": Ladder}, as the book cache keeps it."""
+    return {"asks": Ladder.from_asks(book.get("asks"))}
+
+
+class BookBatch:
+    """
+    Many ask ladders packed into flat arrays.
+
+    Only levels with positive price and size are kept for the fill; the
+    best/second-best prices and level counts used by the spread check are
+    taken from the full sorted book, as `calculate_slippage` does.
+    """
+
+    def __init__(self, token_ids, prices, sizes, bounds, level_counts, best, second):
+        self.token_ids = token_ids
+        self.index = {t: i for i, t in enumerate(token_ids)}
+        self.prices = prices
+        self.sizes = sizes
+        self.start = bounds[:-1]
+        self.end = bounds[1:]
+        self.level_counts = level_counts
+        self.best = best
+        self.second = second
+
+        # Cumulative sums over the whole batch, with a leading zero, so
+        # book b's cumulative notional through level j is
+        # cum_liq[j + 1] - cum_liq[start[b]].
+        self.cum_liq = np.concatenate(([0.0], np.cumsum(prices * sizes)))
+        self.cum_shares = np.concatenate(([0.0], np.cumsum(sizes)))
+        self.base_liq = self.cum_liq[self.start]
+        self.base_shares = self.cum_shares[self.start]
+        self.total_liq = self.cum_liq[self.end] - self.base_liq
+
+        count = level_counts
+        self.spread_warn = (count > 0) & ((count < 3) | ((second - best) > SPREAD_LIMIT))
+
+    @classmethod
+    def from_books(cls, asks_by_token):
+        """Build a batch from a mapping of token_id -> raw `asks` list or Ladder."""
+        return cls.from_ladders({
+            token_id: asks.arrays() if isinstance(asks, Ladder) else (
+                _to_floats([level.get("price") for level in asks or []]),
+                _to_floats([level.get("size") for level in asks or []]),
+            )
+            for token_id, asks in asks_by_token.items()
+        })
+
+    @classmethod
+    def from_ladders(cls, ladders):
+        """Build a batch from a mapping of token_id -> (prices, sizes) float arrays, unsorted."""
+        token_ids = list(ladders)
+        prices, sizes, bounds = [], [], [0]
+        counts = np.zeros(len(token_ids), dtype=np.int64)
+        best = np.zeros(len(token_ids))
+        second = np.zeros(len(token_ids))
+
+        for b, token_id in enumerate(token_ids):
+            p, s = ladders[token_id]
+
+            order = np.argsort(p, kind="stable")
+            p, s = p[order], s[order]
+            counts[b] = len(p)
+            if len(p):
+                best[b] = p[0]
+            if len(p) > 1:
+                second[b] = p[1]
+
+            valid = (p > 0) & (s > 0)
+            prices.append(p[valid])
+            sizes.append(s[valid])
+            bounds.append(bounds[-1] + int(valid.sum()))
+
+        return cls(
+            token_ids,
+            np.concatenate(prices) if prices else np.zeros(0),
+            np.concatenate(sizes) if sizes else np.zeros(0),
+            np.array(bounds, dtype=np.int64),
+            counts,
+            best,
+            second,
+        )
+
+    @classmethod
+    def from_asks(cls, asks):
+        """Build a single-book batch; results are for token `None`."""
+        return cls.from_books({None: asks})
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    def fill(self, capital):
+        """
+        Simulate a market buy of `capital` on every book.
+
+        `capital` is a scalar or a 1-D array of capitals. Returns
+        (fill_pct, avg_entry, slippage, max_liquidity, spread_warning) as
+        arrays of shape (books,) or (books, capitals) respectively.
+        """
+        capital = np.asarray(capital, dtype=np.float64)
+        scalar = capital.ndim == 0
+        cap = np.atleast_1d(capital)[None, :]
+
+        start = self.start[:, None]
+        end = self.end[:, None]
+        base_liq = self.base_liq[:, None]
+        base_shares = self.base_shares[:, None]
+        total_liq = self.total_liq[:, None]
+        total_shares = self.cum_shares[self.end][:, None] - base_shares
+
+        # First level whose cumulative notional covers the capital
+        k = np.searchsorted(self.cum_liq, base_liq + cap, side="left") - 1
+        k = np.clip(k, start, end)
+        filled = k < end
+
+        prices = self.prices if len(self.prices) else np.ones(1)
+        level_price = prices[np.minimum(k, len(prices) - 1)]
+        spent_before = self.cum_liq[k] - base_liq
+        shares_before = self.cum_shares[k] - base_shares
+
+        spent = np.where(filled, spent_before + (cap - spent_before), total_liq)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shares = np.where(filled, shares_before + (cap - spent_before) / level_price, total_shares)
+        # The ladder walk counts one level past the one that completes the fill
+        max_liq = np.where(filled, self.cum_liq[np.minimum(k + 2, end)] - base_liq, total_liq)
+
+        non_positive = cap <= 0
+        shares = np.where(non_positive, 0.0, shares)
+        max_liq = np.where(non_positive, self.cum_liq[np.minimum(start + 1, end)] - base_liq, max_liq)
+
+        ok = shares > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_entry = np.where(ok, spent / shares, 0.0)
+            fill_pct = np.where(ok, spent / cap, 0.0)
+        slippage = np.where(ok, avg_entry - self.best[:, None], 0.0)
+
+        blocked = (self.spread_warn | (self.level_counts == 0))[:, None]
+        fill_pct = np.where(blocked, 0.0, fill_pct)
+        avg_entry = np.where(blocked, 0.0, avg_entry)
+        slippage = np.where(blocked, 0.0, slippage)
+        max_liq = np.where(blocked, 0.0, max_liq)
+        warn = np.broadcast_to(self.spread_warn[:, None], fill_pct.shape)
+
+        out = (fill_pct, avg_entry, slippage, max_liq, warn)
+        if scalar:
+            return tuple(a[:, 0] for a in out)
+        return out
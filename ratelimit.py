@@ -0,0 +1,189 @@
+"""
+Process-wide, per-host rate limiting for the API session.
+
+Every request through the shared session first takes a token from its
+host's bucket, so concurrent scans (and Streamlit sessions) share one
+request budget. Buckets honour `Retry-After`, back off multiplicatively
+on 429/5xx and recover additively on success. When the budget is spent,
+callers wait instead of failing.
+"""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# --- CONFIG ---
+# host -> (requests/sec, burst, max requests/sec)
+HOST_LIMITS = {
+    "gamma-api.polymarket.com": (10.0, 20, 20.0),
+    "clob.polymarket.com": (8.0, 16, 15.0),
+}
+DEFAULT_LIMIT = (10.0, 20, 20.0)
+MAX_BLOCK = 60.0
+RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with AIMD rate adaptation.
+
+    `acquire` reserves a token and sleeps until it is due, so waiters are
+    served in arrival order without polling.
+    """
+
+    def __init__(self, name, rate, burst, max_rate, min_rate=0.5):
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.waited_s = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Take one token, sleeping as long as the budget requires."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.requests += 1
+            wait = max(self.blocked_until - now, -self.tokens / self.rate if self.tokens < 0 else 0.0)
+            self.waited_s += wait
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_response(self, status, retry_after=None):
+        """Adapt the rate to the server's feedback."""
+        with self._lock:
+            now = time.monotonic()
+            if status == 429:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                pause = retry_after if retry_after is not None else 1.0 / self.rate
+                self.blocked_until = max(self.blocked_until, now + min(pause, MAX_BLOCK))
+                self._refill(now)
+                self.tokens = min(self.tokens, 0.0)
+            elif status >= 500:
+                self.server_errors += 1
+                self.rate = max(self.min_rate, self.rate * 0.7)
+                if retry_after is not None:
+                    self.blocked_until = max(self.blocked_until, now + min(retry_after, MAX_BLOCK))
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.02)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": self.rate,
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "server_errors": self.server_errors,
+                "waited_s": self.waited_s,
+            }
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def limiter_for(url):
+    """The shared bucket for `url`'s host, created on first use."""
+    host = urlparse(url).netloc
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst, max_rate = HOST_LIMITS.get(host.split(":")[0], DEFAULT_LIMIT)
+            bucket = _buckets[host] = TokenBucket(host, rate, burst, max_rate)
+        return bucket
+
+
+def configure(host, rate, burst, max_rate):
+    """Set (or reset) the limits for `host`, e.g. `localhost:8080`."""
+    with _buckets_lock:
+        _buckets[host] = TokenBucket(host, rate, burst, max_rate)
+
+
+def limiter_stats():
+    with _buckets_lock:
+        buckets = list(_buckets.values())
+    return [b.stats() for b in buckets]
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def paced_send(url, method, send, max_attempts=4):
+    """
+    Run `send()` through `url`'s bucket, retrying as RateLimitedAdapter
+    does. `send()` makes one attempt and returns (response, status,
+    Retry-After header); the final response is returned.
+    """
+    limiter = limiter_for(url)
+
+    for attempt in range(1, max_attempts + 1):
+        limiter.acquire()
+        response, status, retry_after = send()
+        limiter.on_response(status, parse_retry_after(retry_after))
+
+        retryable = status == 429 or (status >= 500 and method in RETRY_METHODS)
+        if not retryable or attempt == max_attempts:
+            return response
+
+        response.close()
+        if status >= 500:
+            time.sleep(0.5 * 2 ** (attempt - 1))
+
+    return response
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that paces requests through the host's bucket.
+
+    429s are retried for any method (the server rejected the request, so
+    it is safe to resend) after the bucket's Retry-After pause; 5xx are
+    retried for idempotent methods only. The final response is returned
+    as-is for callers to handle. Every attempt is recorded in `metrics`.
+    """
+
+    def __init__(self, *args, max_attempts=4, **kwargs):
+        self.max_attempts = max_attempts
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        def attempt():
+            start = time.perf_counter()
+            response = super(RateLimitedAdapter, self).send(request, **kwargs)
+            metrics.observe_http(
+                request.url, response.status_code, time.perf_counter() - start,
+                len(response.content), response.raw.tell(),
+            )
+            return response, response.status_code, response.headers.get("Retry-After")
+
+        return paced_send(request.url, request.method, attempt, self.max_attempts)
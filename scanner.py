@@ -0,0 +1,624 @@
+"""
+Headless scanner core.
+
+Candidate extraction, liquidity gating and ranking, independent of the
+Streamlit dashboard so scans can run from the CLI, cron, workers or tests.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+import history
+import metrics
+from cache import iter_event_records, get_books
+from opportunity import Candidate, EventInfo
+from orderbook import BookBatch
+from utils import DEFAULT_GATES, parse_iso_date, utc_now, fill_rejection, score_fill, rank_key
+
+# --- CONFIG ---
+DEFAULT_EXCLUDES = [
+    "Sports",
+    "Memecoin",
+    "Twitter",
+    "Tweets",
+    "Tweet Markets",
+    "Pop Culture",
+    "Gaming",
+    "Social"
+]
+WINDOW_DAYS = (1, 30)
+BOOK_CHUNK = 200
+PROGRESSIVE_CHUNK = 50
+TAG_VERDICT_CACHE = 4096
+# Exclusion masks and per-capital fills an index keeps
+INDEX_CACHE = 16
+
+
+class ScanReport:
+    """
+    Everything a scan produced: ranked `results` plus what it saw on the
+    way (tags, unfetchable books, and optionally the raw candidates),
+    per-stage timings and why each dropped market was rejected.
+    """
+
+    def __init__(self, keep_candidates=True):
+        self.results = []
+        self.found_tags = set()
+        self.failed_ids = []
+        self.candidates = [] if keep_candidates else None
+        self.events = 0
+        self.markets = 0
+        self.extracted = 0
+        self.scored = 0
+        self.rejections = Counter()
+        self.stage_s = Counter()
+        self.started = time.perf_counter()
+        self.first_result_s = None
+        self.elapsed_s = None
+        self.index = None
+
+    def stage_times(self):
+        """
+        Seconds spent per stage: events (fetch + parse), filter, books,
+        scoring and ranking. Stages overlap in time when streaming, so
+        each counts only its own work.
+        """
+        s = self.stage_s
+        return {
+            "events": s["events"],
+            "filter": max(s["extract"] - s["events"], 0.0),
+            "books": s["books"],
+            "scoring": s["scoring"],
+            "ranking": s["ranking"],
+        }
+
+
+def _timed(iterable, report, stage):
+    """Pass `iterable` through, adding the time spent producing each item to `stage`."""
+    it = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(it)
+        except StopIteration:
+            report.stage_s[stage] += time.perf_counter() - start
+            return
+        report.stage_s[stage] += time.perf_counter() - start
+        yield item
+
+
+class TagMatcher:
+    """
+    Case-insensitive substring matcher for an exclusion set.
+
+    All forbidden tags are compiled into one regex alternation, and
+    verdicts are memoized per label in a bounded LRU, so repeated labels
+    cost a dict lookup. A label is excluded if any forbidden tag occurs
+    anywhere in its lowercase form.
+    """
+
+    def __init__(self, forbidden_tags, cache_size=TAG_VERDICT_CACHE):
+        forbidden_lower = sorted({f.lower() for f in forbidden_tags}, key=len, reverse=True)
+        self._pattern = re.compile("|".join(map(re.escape, forbidden_lower))) if forbidden_lower else None
+        self.label_excluded = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, label):
+        return self._pattern is not None and self._pattern.search(label.lower()) is not None
+
+    def excluded(self, tags):
+        """True if any of `tags` contains a forbidden tag."""
+        label_excluded = self.label_excluded
+        for t in tags:
+            if label_excluded(t):
+                return True
+        return False
+
+
+@lru_cache(maxsize=32)
+def _matcher_for(forbidden):
+    return TagMatcher(forbidden)
+
+
+def tag_matcher(forbidden_tags):
+    """The shared compiled matcher for an exclusion set (built once per set)."""
+    return _matcher_for(frozenset(forbidden_tags))
+
+
+def extract_candidates(records, forbidden_tags, report, window_days=WINDOW_DAYS, now=None,
+                       band=DEFAULT_GATES.band):
+    """
+    Yield one candidate per market with an outcome in the entry `band`,
+    for events that pass the tag and end-date filters.
+    """
+    lo, hi = band
+    now = now or utc_now()
+    min_date = now + timedelta(days=window_days[0])
+    max_date = now + timedelta(days=window_days[1])
+
+    # Compiled once per exclusion set; verdicts are cached per label
+    matcher = tag_matcher(forbidden_tags)
+
+    for e in records:
+        report.events += 1
+        skipped = e.get("skipped", 0)
+        report.markets += len(e["markets"]) + skipped
+        if skipped:
+            report.rejections["missing_prices"] += skipped
+
+        # Collect all tags found
+        tags = e["tags"]
+        for t in tags:
+            report.found_tags.add(t)
+
+        # Filter Logic (Case Insensitive)
+        # Check if any forbidden tag appears inside the event tags
+        if matcher.excluded(tags):
+            if e["markets"]:
+                report.rejections["tag"] += len(e["markets"])
+            continue
+
+        end_date = parse_iso_date(e["endDate"])
+        if not end_date or not (min_date <= end_date <= max_date):
+            if e["markets"]:
+                report.rejections["date_window"] += len(e["markets"])
+            continue
+
+        days_left = (end_date - now).days
+
+        # Format Date (e.g., "Jan 12")
+        date_str = end_date.strftime("%b %d")
+        event = None
+
+        # Markets arrive pre-parsed (and validated) from the ingest store
+        for m in e["markets"]:
+            prices = m["prices"]
+
+            best_idx = -1
+            for i, p_val in enumerate(prices):
+                if lo <= p_val <= hi:
+                    best_idx = i
+                    break
+
+            if best_idx == -1:
+                report.rejections["entry_band"] += 1
+                continue
+
+            # Shared by all of the event's candidates; store records carry
+            # only the description's hash, the text stays on disk
+            if event is None:
+                event = EventInfo(
+                    e["id"], e["title"], e["slug"], tags[:3], days_left, date_str, e["endDate"],
+                    desc=e.get("desc"), desc_hash=e.get("desc_hash"),
+                )
+            candidate = Candidate(
+                m["token_ids"][best_idx], event, m["outcomes"][best_idx], prices[best_idx], m["volume"]
+            )
+            report.extracted += 1
+            if report.candidates is not None:
+                report.candidates.append(candidate)
+            yield candidate
+
+
+def score_candidates(candidates, books, capital, report=None, gates=DEFAULT_GATES):
+    """
+    Fill every candidate's book in one vectorized pass and apply the gates.
+    Rejections are tallied on `report` if given.
+    """
+    # Parse every book once and fill them all together
+    batch = BookBatch.from_books({
+        str(c["id"]): books[str(c["id"])].get("asks", [])
+        for c in candidates if books.get(str(c["id"]))
+    })
+    return gate_fills(candidates, batch, batch.fill(capital), capital, report, gates)
+
+
+def gate_fills(candidates, batch, fills, capital, report=None, gates=DEFAULT_GATES):
+    """
+    Apply the gates to each candidate's fill in `fills` (as filled by
+    `batch` at `capital`). Candidates without a book in `batch` are rejected.
+    """
+    results = []
+    for c in candidates:
+        b = batch.index.get(str(c["id"]))
+        if b is None:
+            # Either no book exists or the fetch failed (see failed_ids)
+            if report is not None:
+                report.rejections["missing_book"] += 1
+            continue
+
+        fill_pct, avg_entry, slippage, max_liq = (float(a[b]) for a in fills[:4])
+        spread_warn = bool(fills[4][b])
+        reason = fill_rejection(fill_pct, avg_entry, slippage, spread_warn, gates)
+        if reason:
+            if report is not None:
+                report.rejections[reason] += 1
+            continue
+        results.append(score_fill(c, capital, fill_pct, avg_entry, slippage, max_liq, spread_warn, gates))
+    return results
+
+
+def score_grid(candidates, books, capitals, gates=DEFAULT_GATES):
+    """
+    Score every candidate at every capital in `capitals` with one
+    vectorized fill. Returns {capital: ranked results}.
+    """
+    batch = BookBatch.from_books({
+        str(c["id"]): books[str(c["id"])].get("asks", [])
+        for c in candidates if books.get(str(c["id"]))
+    })
+    fills = batch.fill(capitals)
+
+    grid = {}
+    for j, capital in enumerate(capitals):
+        results = []
+        for c in candidates:
+            b = batch.index.get(str(c["id"]))
+            if b is None:
+                continue
+            fill_pct, avg_entry, slippage, max_liq = (float(a[b, j]) for a in fills[:4])
+            scored = score_fill(
+                c, capital, fill_pct, avg_entry, slippage, max_liq, bool(fills[4][b, j]), gates
+            )
+            if scored:
+                results.append(scored)
+        results.sort(key=rank_key, reverse=True)
+        grid[capital] = results
+    return grid
+
+
+def iter_scored_chunks(records, capital, forbidden_tags, report, fetch_books=get_books,
+                       chunk_size=BOOK_CHUNK, window_days=WINDOW_DAYS, recorder=None,
+                       gates=DEFAULT_GATES, now=None, grow=False):
+    """
+    Yield the verified opportunities of each candidate chunk (possibly none).
+
+    Candidates are taken `chunk_size` at a time, their books fetched and
+    scored, and the survivors yielded before the next chunk is started
+    (`chunk_size=None` scores everything in one go). With `grow`, each
+    chunk is twice the one before: a small first chunk for an early first
+    result, then few enough /books rounds that the whole scan is no slower
+    than one batch. Output is unranked. Chunks and their books are handed
+    to `recorder` for the history.
+    """
+    records = _timed(records, report, "events")
+    candidates = _timed(
+        extract_candidates(records, forbidden_tags, report, window_days, now, gates.band), report, "extract"
+    )
+    while True:
+        chunk = list(islice(candidates, chunk_size))
+        if not chunk:
+            break
+        start = time.perf_counter()
+        books, failed_ids = fetch_books([c["id"] for c in chunk])
+        report.stage_s["books"] += time.perf_counter() - start
+        report.failed_ids.extend(failed_ids)
+        report.scored += len(chunk)
+        if recorder is not None:
+            recorder.add(chunk, books)
+
+        start = time.perf_counter()
+        results = score_candidates(chunk, books, capital, report, gates)
+        report.stage_s["scoring"] += time.perf_counter() - start
+        yield results
+        if grow and chunk_size:
+            chunk_size *= 2
+
+
+def iter_opportunities(records, capital, forbidden_tags, report, fetch_books=get_books,
+                       chunk_size=BOOK_CHUNK, window_days=WINDOW_DAYS, gates=DEFAULT_GATES):
+    """Yield verified opportunities one by one as soon as they pass the gates."""
+    chunks = iter_scored_chunks(
+        records, capital, forbidden_tags, report, fetch_books, chunk_size, window_days, gates=gates
+    )
+    for chunk in chunks:
+        yield from chunk
+
+
+def iter_scan(capital_usd, forbidden_tags, window_days=WINDOW_DAYS, chunk_size=PROGRESSIVE_CHUNK,
+              gates=DEFAULT_GATES, index=False):
+    """
+    Progressive scan over cached/streamed events.
+
+    Events flow from parsing into book fetching into scoring chunk by
+    chunk. After each chunk yields (report, new_results), with
+    `report.results` kept ranked, so callers can show opportunities as
+    soon as they are confirmed. With `index=True` the final report also
+    carries the fetched events and books as a MarketIndex.
+    """
+    report = ScanReport()
+    now = utc_now()
+    # The window is applied server-side; extract_candidates re-checks it
+    # because cached events can be up to EVENT_TTL old.
+    records = iter_event_records(window_days=window_days)
+    fetch_books = get_books
+    market_index = MarketIndex(window_days, now) if index else None
+    if market_index is not None:
+        records = market_index.collect(records)
+        fetch_books = market_index.fetching(get_books)
+    recorder = history.recorder(capital_usd, gates)
+    chunks = iter_scored_chunks(
+        records, capital_usd, forbidden_tags, report, fetch_books,
+        chunk_size, window_days, recorder, gates, now, grow=True
+    )
+
+    for new_results in chunks:
+        if new_results and report.first_result_s is None:
+            report.first_result_s = time.perf_counter() - report.started
+        start = time.perf_counter()
+        for r in new_results:
+            bisect.insort(report.results, r, key=_descending_rank)
+        report.stage_s["ranking"] += time.perf_counter() - start
+        yield report, new_results
+
+    report.elapsed_s = time.perf_counter() - report.started
+    metrics.record_scan(report)
+    if recorder is not None:
+        recorder.flush()
+    if market_index is not None:
+        report.index = market_index.build()
+    yield report, []
+
+
+def _descending_rank(result):
+    roi, max_liq = rank_key(result)
+    return (-roi, -max_liq)
+
+
+def run_scanner(capital_usd, forbidden_tags, window_days=WINDOW_DAYS, gates=DEFAULT_GATES, index=False):
+    """Full scan scored in a single batch. Returns a ranked ScanReport."""
+    for report, _ in iter_scan(capital_usd, forbidden_tags, window_days, None, gates, index):
+        pass
+    return report
+
+
+def scan_grid(capitals, forbidden_tags, window_days=WINDOW_DAYS, gates=DEFAULT_GATES, index=False):
+    """
+    One fetch, scored for a whole grid of bet sizes.
+    Returns (report, {capital: ranked results}); `report.results` is empty.
+    """
+    report = ScanReport()
+    now = utc_now()
+    records = iter_event_records(window_days=window_days)
+    market_index = MarketIndex(window_days, now) if index else None
+    if market_index is not None:
+        records = market_index.collect(records)
+    records = _timed(records, report, "events")
+    candidates = list(_timed(
+        extract_candidates(records, forbidden_tags, report, window_days, now, gates.band), report, "extract"
+    ))
+
+    start = time.perf_counter()
+    token_ids = [c["id"] for c in candidates]
+    books, failed_ids = get_books(token_ids)
+    report.stage_s["books"] += time.perf_counter() - start
+    report.failed_ids.extend(failed_ids)
+    report.scored = len(candidates)
+    recorder = history.recorder(capitals, gates)
+    if recorder is not None:
+        recorder.add(candidates, books)
+        recorder.flush()
+
+    start = time.perf_counter()
+    grid = score_grid(candidates, books, list(capitals), gates) if candidates else {c: [] for c in capitals}
+    report.stage_s["scoring"] += time.perf_counter() - start
+
+    report.elapsed_s = time.perf_counter() - report.started
+    # Markets that passed at any bet size of the grid
+    metrics.record_scan(report, len({r.id for results in grid.values() for r in results}))
+    if market_index is not None:
+        market_index.add_books(token_ids, books, failed_ids)
+        report.index = market_index.build()
+    return report, grid
+
+
+# --- MARKET INDEX ---
+class MarketIndex:
+    """
+    A scan's fetched events and books, indexed for instant re-queries.
+
+    Every priced outcome is a row, sorted by (end date, market, outcome):
+    a resolution window is two bisections, and the entry band, the tag
+    exclusions and "first in-band outcome per market" are masks over
+    that slice, taken in the order `extract_candidates` meets them. Books
+    are kept and filled once per bet size, so moving the window (within
+    the one fetched), band, exclusions, bet size or gates touches the
+    network only for books never fetched (outcomes a wider band admits).
+    """
+
+    def __init__(self, window_days, now=None):
+        self.window_days = tuple(window_days)
+        self.now = now or utc_now()
+        self.created_at = time.time()
+        self.records = []
+        self._asks = {}
+        self._no_book = set()
+        self._batch = None
+        self._fills = {}
+        self._excluded = {}
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def collect(self, records):
+        """Pass `records` through, keeping each one."""
+        for e in records:
+            self.records.append(e)
+            yield e
+
+    def fetching(self, fetch_books):
+        """`fetch_books` wrapped to keep every book it returns."""
+        def fetch(token_ids):
+            books, failed_ids = fetch_books(token_ids)
+            self.add_books(token_ids, books, failed_ids)
+            return books, failed_ids
+        return fetch
+
+    def add_books(self, token_ids, books, failed_ids=()):
+        """Keep the `books` fetched for `token_ids`; tokens neither in `books` nor failed have none."""
+        failed = set(failed_ids)
+        with self._lock:
+            for t in map(str, token_ids):
+                if books.get(t):
+                    self._asks[t] = books[t].get("asks", [])
+                    self._no_book.discard(t)
+                elif t not in failed:
+                    self._no_book.add(t)
+            self._batch = None
+            self._fills = {}
+
+    def build(self):
+        """Sort the collected records' outcomes by end date. Returns self."""
+        event_end, event_markets, event_skipped = [], [], []
+        self._markets, market_event = [], []
+        row_end, row_market, row_outcome, row_price = [], [], [], []
+        for k, e in enumerate(self.records):
+            end_date = parse_iso_date(e["endDate"])
+            end_ts = end_date.timestamp() if end_date else np.nan
+            event_end.append(end_ts)
+            event_markets.append(len(e["markets"]))
+            event_skipped.append(e.get("skipped", 0))
+            if end_date is None:
+                continue
+            for m in e["markets"]:
+                for i, p in enumerate(m["prices"]):
+                    row_end.append(end_ts)
+                    row_market.append(len(self._markets))
+                    row_outcome.append(i)
+                    row_price.append(p)
+                self._markets.append(m)
+                market_event.append(k)
+
+        self._event_end = np.array(event_end, dtype=np.float64)
+        self._event_markets = np.array(event_markets, dtype=np.int64)
+        self._event_skipped = np.array(event_skipped, dtype=np.int64)
+        self._market_event = np.array(market_event, dtype=np.intp)
+        # Rows are already in (market, outcome) order: a stable sort on
+        # the end date gives (end date, market, outcome)
+        order = np.argsort(np.array(row_end, dtype=np.float64), kind="stable")
+        self._end = np.array(row_end, dtype=np.float64)[order]
+        self._row_market = np.array(row_market, dtype=np.intp)[order]
+        self._row_outcome = np.array(row_outcome, dtype=np.intp)[order]
+        self._row_price = np.array(row_price, dtype=np.float64)[order]
+        return self
+
+    def __len__(self):
+        return len(self._end)
+
+    def covers(self, window_days):
+        """True if `window_days` lies inside the window the index was fetched for."""
+        return self.window_days[0] <= window_days[0] and window_days[1] <= self.window_days[1]
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def query(self, capital, forbidden_tags, window_days=WINDOW_DAYS, gates=DEFAULT_GATES,
+              fetch_books=get_books):
+        """
+        The scan these parameters would return over the indexed data, as a
+        ranked ScanReport whose counts cover the events in the window.
+        Books not held yet are fetched with `fetch_books`.
+        """
+        report = ScanReport()
+        start_ts = (self.now + timedelta(days=window_days[0])).timestamp()
+        end_ts = (self.now + timedelta(days=window_days[1])).timestamp()
+        excluded = self._excluded_events(forbidden_tags)
+
+        # The funnel extract_candidates would count over the window's events
+        in_window = (self._event_end >= start_ts) & (self._event_end <= end_ts)
+        report.events = int(in_window.sum())
+        skipped = int(self._event_skipped[in_window].sum())
+        report.markets = int(self._event_markets[in_window].sum()) + skipped
+        for k in np.flatnonzero(in_window).tolist():
+            report.found_tags.update(self.records[k]["tags"])
+
+        # Outcomes resolving in the window: two bisections, then the masks
+        lo = np.searchsorted(self._end, start_ts, "left")
+        hi = np.searchsorted(self._end, end_ts, "right")
+        price = self._row_price[lo:hi]
+        market = self._row_market[lo:hi]
+        keep = (price >= gates.band[0]) & (price <= gates.band[1]) & ~excluded[self._market_event[market]]
+        # First in-band outcome of each market, markets in record order
+        _, first = np.unique(market[keep], return_index=True)
+        rows = np.flatnonzero(keep)[first] + lo
+
+        candidates = []
+        for m, o in zip(self._row_market[rows].tolist(), self._row_outcome[rows].tolist()):
+            market_record = self._markets[m]
+            candidates.append(Candidate(
+                market_record["token_ids"][o], self._event(int(self._market_event[m])),
+                market_record["outcomes"][o], market_record["prices"][o], market_record["volume"],
+            ))
+        report.candidates = candidates
+        report.extracted = report.scored = len(candidates)
+        for reason, count in (
+            ("missing_prices", skipped),
+            ("tag", int(self._event_markets[in_window & excluded].sum())),
+            ("entry_band", int(self._event_markets[in_window & ~excluded].sum()) - len(candidates)),
+        ):
+            if count:
+                report.rejections[reason] += count
+
+        start = time.perf_counter()
+        missing = [c.id for c in candidates if c.id not in self._asks and c.id not in self._no_book]
+        if missing:
+            books, failed_ids = fetch_books(missing)
+            self.add_books(missing, books, failed_ids)
+            report.failed_ids.extend(failed_ids)
+        report.stage_s["books"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch, fills = self._filled(capital)
+        results = gate_fills(candidates, batch, fills, capital, report, gates)
+        report.stage_s["scoring"] += time.perf_counter() - start
+        start = time.perf_counter()
+        results.sort(key=rank_key, reverse=True)
+        report.results = results
+        report.stage_s["ranking"] += time.perf_counter() - start
+
+        report.elapsed_s = time.perf_counter() - report.started
+        if results:
+            report.first_result_s = report.elapsed_s
+        metrics.record_scan(report, kind="requery")
+        return report
+
+    def _excluded_events(self, forbidden_tags):
+        """Per-event mask of the events `forbidden_tags` excludes (cached per exclusion set)."""
+        key = frozenset(forbidden_tags)
+        mask = self._excluded.get(key)
+        if mask is None:
+            matcher = tag_matcher(key)
+            mask = np.array([matcher.excluded(e["tags"]) for e in self.records], dtype=bool)
+            if len(self._excluded) >= INDEX_CACHE:
+                self._excluded.clear()
+            self._excluded[key] = mask
+        return mask
+
+    def _event(self, k):
+        """The EventInfo of record `k`, shared by every query."""
+        event = self._events.get(k)
+        if event is None:
+            e = self.records[k]
+            end_date = parse_iso_date(e["endDate"])
+            event = self._events[k] = EventInfo(
+                e["id"], e["title"], e["slug"], e["tags"][:3], (end_date - self.now).days,
+                end_date.strftime("%b %d"), e["endDate"], desc=e.get("desc"), desc_hash=e.get("desc_hash"),
+            )
+        return event
+
+    def _filled(self, capital):
+        """(BookBatch of every held book, its fills at `capital`), filled once per capital."""
+        with self._lock:
+            if self._batch is None:
+                self._batch = BookBatch.from_books(self._asks)
+            fills = self._fills.get(capital)
+            if fills is None:
+                if len(self._fills) >= INDEX_CACHE:
+                    self._fills.clear()
+                fills = self._fills[capital] = self._batch.fill(capital)
+            return self._batch, fills
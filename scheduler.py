@@ -0,0 +1,247 @@
+"""
+Background scan scheduler with shared, immutable snapshots.
+
+One thread per process rescans on an interval for a grid of bet sizes
+and the default exclusion set, and publishes the result as a `Snapshot`.
+Every dashboard session reads the same snapshot object, so the API load
+and memory no longer grow with the number of open sessions. Snapshots
+are also written atomically to disk, so other processes (and a
+restarted dashboard) can serve them without any network I/O; a restart
+that finds a snapshot younger than the interval waits for it to fall due
+instead of rescanning during boot. The scheduler also keeps its last
+scan's MarketIndex, so sessions can re-query other windows, bands and
+gates from it without a scan of their own.
+"""
+import json
+import os
+import threading
+import time
+
+from gamma import loads
+from opportunity import Candidate, EventInfo, Opportunity
+from scanner import DEFAULT_EXCLUDES, WINDOW_DAYS, scan_grid
+from utils import DEFAULT_GATES, logger, make_gates
+
+# --- CONFIG ---
+SNAPSHOT_PATH = os.environ.get("SCANNER_SNAPSHOT", os.path.join(".scanner", "snapshot.json"))
+REFRESH_INTERVAL = float(os.environ.get("SCANNER_REFRESH", 60))
+CAPITAL_GRID = tuple(
+    int(c) for c in os.environ.get("SCANNER_CAPITAL_GRID", "500,1000,2000,5000,10000,25000,50000").split(",")
+)
+
+# Per-capital fields of a scored result; the rest comes from its candidate
+FILL_FIELDS = ("real_entry", "slippage", "roi", "profit", "max_liq")
+
+
+class Snapshot:
+    """
+    An immutable, ranked scan result for every capital in the grid.
+
+    Candidates are stored once (and their events once per event); each
+    capital keeps only compact rows of (candidate index, fill values),
+    expanded into Opportunities on read. Descriptions are not part of a
+    snapshot: they are read from the ingest store on demand.
+    """
+
+    def __init__(self, created_at, capitals, excludes, window_days, candidates, rows,
+                 found_tags, failed_books, elapsed_s, gates=DEFAULT_GATES):
+        self.created_at = created_at
+        self.capitals = tuple(capitals)
+        self.excludes = tuple(excludes)
+        self.window_days = tuple(window_days)
+        self.candidates = tuple(candidates)
+        self.rows = rows
+        self.found_tags = frozenset(found_tags)
+        self.failed_books = failed_books
+        self.elapsed_s = elapsed_s
+        self.gates = gates
+
+    @classmethod
+    def from_scan(cls, report, grid, excludes, window_days, gates=DEFAULT_GATES):
+        index = {str(c["id"]): i for i, c in enumerate(report.candidates)}
+        rows = {
+            capital: tuple(
+                (index[str(r["id"])],) + tuple(r[f] for f in FILL_FIELDS) for r in results
+            )
+            for capital, results in grid.items()
+        }
+        return cls(
+            time.time(), grid.keys(), excludes, window_days, report.candidates, rows,
+            report.found_tags, len(report.failed_ids), report.elapsed_s, gates,
+        )
+
+    def age(self):
+        return time.time() - self.created_at
+
+    def covers(self, capital, excludes, window_days=WINDOW_DAYS, gates=DEFAULT_GATES):
+        """True if this snapshot answers a scan with these parameters."""
+        return (
+            capital in self.rows
+            and set(excludes) == set(self.excludes)
+            and tuple(window_days) == self.window_days
+            and tuple(gates) == self.gates
+        )
+
+    def results_for(self, capital):
+        """Ranked results for `capital` (fresh Opportunities; the snapshot is never mutated)."""
+        return [Opportunity(self.candidates[row[0]], *row[1:]) for row in self.rows.get(capital, ())]
+
+    def to_json(self):
+        events, index = [], {}
+        candidates = []
+        for c in self.candidates:
+            if id(c.event) not in index:
+                index[id(c.event)] = len(events)
+                events.append(c.event.to_row())
+            candidates.append(c.to_row(index[id(c.event)]))
+        return json.dumps({
+            "created_at": self.created_at,
+            "capitals": list(self.capitals),
+            "excludes": list(self.excludes),
+            "window_days": list(self.window_days),
+            "gates": [*self.gates.band, self.gates.min_fill, self.gates.max_slippage],
+            "events": events,
+            "candidates": candidates,
+            "rows": {str(capital): rows for capital, rows in self.rows.items()},
+            "found_tags": sorted(self.found_tags),
+            "failed_books": self.failed_books,
+            "elapsed_s": self.elapsed_s,
+        })
+
+    @classmethod
+    def from_json(cls, text):
+        data = loads(text)
+        rows = {int(capital): tuple(map(tuple, r)) for capital, r in data["rows"].items()}
+        events = [EventInfo.from_row(e) for e in data["events"]]
+        candidates = [Candidate.from_row(c, events) for c in data["candidates"]]
+        # Snapshots from before the gates were configurable used the defaults
+        gates = make_gates(data["gates"][:2], *data["gates"][2:]) if "gates" in data else DEFAULT_GATES
+        return cls(
+            data["created_at"], data["capitals"], data["excludes"], data["window_days"],
+            candidates, rows, data["found_tags"], data["failed_books"], data["elapsed_s"],
+            gates,
+        )
+
+
+# --- SHARED STORE ---
+_latest = None
+_loaded_mtime = None
+_lock = threading.Lock()
+
+
+def publish(snapshot, path=SNAPSHOT_PATH):
+    """Make `snapshot` the current one, in memory and (atomically) on disk."""
+    global _latest, _loaded_mtime
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(snapshot.to_json())
+    os.replace(tmp, path)
+
+    with _lock:
+        _latest = snapshot
+        _loaded_mtime = os.path.getmtime(path)
+
+
+def latest_snapshot(path=SNAPSHOT_PATH):
+    """
+    The newest published snapshot, or None. Re-reads the file only when
+    another process has published since.
+    """
+    global _latest, _loaded_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return _latest
+
+    with _lock:
+        if mtime == _loaded_mtime:
+            return _latest
+    try:
+        with open(path) as f:
+            snapshot = Snapshot.from_json(f.read())
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Could not read snapshot {path}: {e}")
+        return _latest
+
+    with _lock:
+        if _latest is None or snapshot.created_at >= _latest.created_at:
+            _latest = snapshot
+        _loaded_mtime = mtime
+        return _latest
+
+
+class SnapshotScheduler:
+    """
+    Rescans every `interval` seconds on a daemon thread and publishes
+    snapshots; the last scan's MarketIndex is kept as `index`.
+    """
+
+    def __init__(self, interval=REFRESH_INTERVAL, capitals=CAPITAL_GRID,
+                 excludes=DEFAULT_EXCLUDES, window_days=WINDOW_DAYS, path=SNAPSHOT_PATH,
+                 gates=DEFAULT_GATES):
+        self.interval = interval
+        self.capitals = tuple(capitals)
+        self.excludes = tuple(excludes)
+        self.window_days = tuple(window_days)
+        self.gates = gates
+        self.path = path
+        self.index = None
+        self.refreshes = 0
+        self.refreshing = False
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Run one grid scan and publish it. Returns the new snapshot."""
+        report, grid = scan_grid(self.capitals, self.excludes, self.window_days, self.gates, index=True)
+        snapshot = Snapshot.from_scan(report, grid, self.excludes, self.window_days, self.gates)
+        publish(snapshot, self.path)
+        self.index = report.index
+        self.refreshes += 1
+        logger.info(
+            f"Snapshot published: {len(snapshot.candidates)} candidates, "
+            f"{len(self.capitals)} bet sizes in {report.elapsed_s:.1f}s."
+        )
+        return snapshot
+
+    def serves(self, snapshot):
+        """True if `snapshot` was scanned with this scheduler's parameters."""
+        return (
+            snapshot is not None
+            and tuple(snapshot.capitals) == self.capitals
+            and set(snapshot.excludes) == set(self.excludes)
+            and snapshot.window_days == self.window_days
+            and snapshot.gates == self.gates
+        )
+
+    def _run(self):
+        # A persisted snapshot from the last run is served until it falls due
+        snapshot = latest_snapshot(self.path)
+        if self.serves(snapshot):
+            self._stop.wait(max(0.0, self.interval - snapshot.age()))
+
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.refreshing = True
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"Scheduled scan failed: {e}")
+            finally:
+                self.refreshing = False
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
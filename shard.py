@@ -0,0 +1,261 @@
+"""
+Sharded parse-and-score across a process pool.
+
+For universes of thousands of events, decoding, parsing, filtering and
+walking ladders in pure Python outgrow one core. This mode spreads them
+over worker processes, with compact work units so pickling stays cheap:
+
+1. Raw Gamma page bodies go to the workers as they arrive. Each worker
+   decodes, parses and filters its page and returns candidate rows, with
+   the event's fields sent once per event rather than once per market.
+2. The parent fetches the candidates' books (network-bound and already
+   concurrent), packs every ladder into a "price,size;..." string and
+   hands shards of them to the workers for the fill and the gates.
+3. Every shard comes back ranked, and the shards are k-way merged on
+   (roi, max_liq).
+
+Results match `run_scanner`: an event that straddles two pages is
+counted (events, markets, rejections) and turned into candidates once,
+from the first page it appears on.
+"""
+import heapq
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+import history
+import metrics
+import utils
+from cache import get_books
+from gamma import decode_events
+from opportunity import Candidate
+from orderbook import BookBatch, _to_floats
+from scanner import WINDOW_DAYS, ScanReport, extract_candidates
+from store import parse_record
+from transport import CONCURRENCY
+from utils import (DEFAULT_GATES, PageWalk, _fetch_events_page, _gamma_params, fill_rejection, logger,
+                   prewarm, score_fill, utc_now)
+
+# --- CONFIG ---
+SHARD_WORKERS = int(os.environ.get("SCANNER_WORKERS", 0)) or os.cpu_count() or 1
+SHARDS_PER_WORKER = 4
+FETCH_CONCURRENCY = CONCURRENCY
+
+# Candidate fields of the market itself; the rest are its shared EventInfo
+MARKET_FIELDS = ("id", "target_outcome", "price_raw", "volume")
+
+
+# --- WORK UNITS ---
+def pack_asks(asks):
+    return ";".join(f"{level.get('price')},{level.get('size')}" for level in asks or [])
+
+
+def unpack_asks(text):
+    values = _to_floats(text.replace(";", ",").split(",") if text else [])
+    return values[0::2], values[1::2]
+
+
+def _tally_events(records, report, tallies):
+    """
+    Pass `records` through to extract_candidates, noting in `tallies`
+    what each event added to `report`: {event key: (markets, rejections)}.
+    """
+    def close(key, markets, rejections):
+        tallies[key] = (report.markets - markets, dict(report.rejections - rejections))
+
+    opened = None
+    for e in records:
+        # extract_candidates asks for the next event once it is done with this one
+        if opened is not None:
+            close(*opened)
+        opened = (e["id"], report.markets, Counter(report.rejections))
+        yield e
+    if opened is not None:
+        close(*opened)
+
+
+def extract_page(body, forbidden_tags, window_days, now, band=DEFAULT_GATES.band):
+    """
+    Worker: decode, parse and filter one raw Gamma page.
+
+    Returns (events on the page, counts, EventInfos, candidate rows);
+    counts carry each event's market count and rejections keyed by event,
+    so the parent can count an event on two pages once. Candidate rows
+    are (EventInfo index, *MARKET_FIELDS).
+    """
+    report = ScanReport(keep_candidates=False)
+    raw = decode_events(body)
+    tallies = {}
+    records = _tally_events((parse_record(e) for e in raw), report, tallies)
+
+    events, index, rows = [], {}, []
+    for c in extract_candidates(records, forbidden_tags, report, window_days, now, band):
+        key = id(c.event)
+        if key not in index:
+            index[key] = len(events)
+            events.append(c.event)
+        rows.append((index[key],) + tuple(c[f] for f in MARKET_FIELDS))
+
+    counts = {"events": tallies, "found_tags": report.found_tags}
+    return len(raw), counts, events, rows
+
+
+def score_shard(capital, shard, gates=DEFAULT_GATES):
+    """
+    Worker: fill and gate a shard of (candidate index, packed ladder).
+
+    Returns (rows, rejections) with rows of (roi, max_liq, index,
+    fill_pct, avg_entry, slippage), best first.
+    """
+    batch = BookBatch.from_ladders({idx: unpack_asks(text) for idx, text in shard})
+    fill_pct, avg_entry, slippage, max_liq, warn = batch.fill(capital)
+
+    rows, rejections = [], Counter()
+    for b, idx in enumerate(batch.token_ids):
+        fill, entry, slip = float(fill_pct[b]), float(avg_entry[b]), float(slippage[b])
+        reason = fill_rejection(fill, entry, slip, bool(warn[b]), gates)
+        if reason:
+            rejections[reason] += 1
+            continue
+        rows.append((((1.0 - entry) / entry) * 100, float(max_liq[b]), idx, fill, entry, slip))
+    rows.sort(key=_rank, reverse=True)
+    return rows, rejections
+
+
+def _rank(row):
+    return row[0], row[1]
+
+
+# --- PIPELINE ---
+def _extract_pages(pool, pages, forbidden_tags, window_days, now, band, stats):
+    """extract_page over every page, fetched from Gamma unless `pages` is given. Returns {offset: result}."""
+    args = (forbidden_tags, window_days, now, band)
+    if pages is not None:
+        futures = {pool.submit(extract_page, body, *args): n for n, body in enumerate(pages)}
+        stats["pages"] = len(futures)
+        return {n: f.result() for f, n in futures.items()}
+
+    params = _gamma_params(now + timedelta(days=window_days[0]), now + timedelta(days=window_days[1]))
+    prewarm([utils.CLOB_URL])  # /books follows the last page
+    walk = PageWalk()
+    fetching, parsing, results = {}, {}, {}
+
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as fetchers:
+        while True:
+            while len(fetching) < FETCH_CONCURRENCY and walk.more():
+                offset = walk.issue()
+                fetching[fetchers.submit(_fetch_events_page, params, offset, decode=None)] = offset
+            if not fetching and not parsing:
+                break
+
+            done, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    offset = fetching.pop(future)
+                    body, n_bytes = future.result()
+                    if body is None:
+                        stats["failed_pages"] = stats.get("failed_pages", 0) + 1
+                        walk.failed(offset)
+                        continue
+                    stats["pages"] = stats.get("pages", 0) + 1
+                    stats["bytes"] = stats.get("bytes", 0) + n_bytes
+                    # An empty page ends the walk without waiting for a worker
+                    if len(body.strip()) <= 2:
+                        walk.landed(offset, 0)
+                    parsing[pool.submit(extract_page, body, *args)] = offset
+                else:
+                    offset = parsing.pop(future)
+                    results[offset] = future.result()
+                    walk.landed(offset, results[offset][0])
+
+    walk.check()
+    return {o: r for o, r in results.items() if walk.keeps(o)}
+
+
+def scan_sharded(capital_usd, forbidden_tags, window_days=WINDOW_DAYS, workers=SHARD_WORKERS,
+                 pages=None, fetch_books=get_books, stats=None, gates=DEFAULT_GATES):
+    """
+    Full scan on a pool of `workers` processes. Returns a ranked
+    ScanReport, like `run_scanner`.
+
+    `pages` (raw Gamma page bodies) replaces the Gamma fetch, e.g. for
+    benchmarks. If `stats` is a dict it receives page and byte counts.
+    Raises EventFetchError if Gamma keeps failing.
+    """
+    report = ScanReport()
+    stats = {} if stats is None else stats
+    now = utc_now()
+    window_days = tuple(window_days)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        start = time.perf_counter()
+        pages_out = _extract_pages(pool, pages, tuple(forbidden_tags), window_days, now, gates.band, stats)
+
+        # Events and candidates in page order, each event and token once
+        seen, seen_events = set(), set()
+        for offset in sorted(pages_out):
+            _, counts, events, rows = pages_out[offset]
+            for key, (markets, rejections) in counts["events"].items():
+                if key in seen_events:
+                    continue
+                seen_events.add(key)
+                report.events += 1
+                report.markets += markets
+                report.rejections.update(rejections)
+            report.found_tags.update(counts["found_tags"])
+            for row in rows:
+                if row[1] in seen:
+                    continue
+                seen.add(row[1])
+                report.candidates.append(Candidate(row[1], events[row[0]], *row[2:]))
+        candidates = report.candidates
+        report.extracted = report.scored = len(candidates)
+        report.stage_s["extract"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        books, failed_ids = fetch_books([c["id"] for c in candidates])
+        report.failed_ids.extend(failed_ids)
+        report.stage_s["books"] += time.perf_counter() - start
+        recorder = history.recorder(capital_usd, gates)
+        if recorder is not None:
+            recorder.add(candidates, books)
+
+        start = time.perf_counter()
+        packed = [
+            (i, pack_asks(books[c["id"]].get("asks")))
+            for i, c in enumerate(candidates) if books.get(c["id"])
+        ]
+        if len(packed) < len(candidates):
+            report.rejections["missing_book"] += len(candidates) - len(packed)
+        size = max(1, -(-len(packed) // (workers * SHARDS_PER_WORKER)))
+        futures = [
+            pool.submit(score_shard, capital_usd, packed[i:i + size], gates)
+            for i in range(0, len(packed), size)
+        ]
+        shards = []
+        for future in futures:
+            rows, rejections = future.result()
+            report.rejections.update(rejections)
+            shards.append(rows)
+        report.stage_s["scoring"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    report.results = [
+        score_fill(candidates[idx], capital_usd, fill, entry, slip, max_liq, False, gates)
+        for _, max_liq, idx, fill, entry, slip in heapq.merge(*shards, key=_rank, reverse=True)
+    ]
+    report.stage_s["ranking"] += time.perf_counter() - start
+
+    report.elapsed_s = time.perf_counter() - report.started
+    if report.results:
+        report.first_result_s = report.elapsed_s
+    metrics.record_scan(report)
+    if recorder is not None:
+        recorder.flush()
+    logger.info(
+        f"Sharded scan on {workers} workers: {report.events} events, {len(candidates)} candidates, "
+        f"{len(report.results)} opportunities in {report.elapsed_s:.1f}s."
+    )
+    return report
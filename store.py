@@ -0,0 +1,279 @@
+"""
+Persistent incremental ingest store (SQLite).
+
+Parsed events and markets are kept on disk keyed by ID and update stamp,
+so a rescan only re-parses what changed, and a process restarted within
+the event TTL (`cache.EVENT_TTL`) picks up the last sync without going
+back to the network. Past the TTL every page is downloaded again; the
+store then saves only the parsing of unchanged markets. Expired markets are
+evicted on each ingest. Event descriptions are kept on disk only (the
+in-memory rows carry their hash) and read back with `description`.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from opportunity import description_hash, intern
+from utils import logger, parse_iso_date, safe_float, utc_now
+
+# --- CONFIG ---
+DB_PATH = os.environ.get("SCANNER_DB", os.path.join(".scanner", "ingest.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    stamp TEXT,
+    end_ts REAL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    event_id TEXT NOT NULL,
+    stamp TEXT,
+    end_ts REAL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    key TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    layout TEXT NOT NULL
+);
+"""
+
+
+# --- PARSING ---
+def parse_event(e):
+    """Event-level fields used by the scanner (markets are parsed separately)."""
+    end_date = parse_iso_date(e.get("endDate"))
+    return {
+        "id": str(e.get("id") or e.get("slug")),
+        "title": e.get("title"),
+        "desc": e.get("description", ""),
+        "tags": [intern(t.get("label")) for t in e.get("tags", [])],
+        "slug": e.get("slug"),
+        "endDate": e.get("endDate"),
+        "end_ts": end_date.timestamp() if end_date else None,
+    }
+
+
+def parse_market(m):
+    """
+    Decode a market's stringified outcome arrays.
+    Returns None if they are missing or inconsistent.
+    """
+    outcomes = m.get("outcomes")
+    prices = m.get("outcomePrices")
+    token_ids = m.get("clobTokenIds")
+
+    if isinstance(outcomes, str): outcomes = json.loads(outcomes)
+    if isinstance(prices, str): prices = json.loads(prices)
+    if isinstance(token_ids, str): token_ids = json.loads(token_ids)
+
+    if not outcomes or not prices or not token_ids:
+        return None
+    if len(outcomes) != len(prices) or len(prices) != len(token_ids):
+        return None
+
+    return {
+        "id": str(m.get("id")),
+        "outcomes": [intern(o) for o in outcomes],
+        "prices": [safe_float(p) for p in prices],
+        "token_ids": token_ids,
+        "volume": safe_float(m.get("volume", "0")),
+    }
+
+
+def parse_record(e):
+    """
+    Parse a raw event and its valid markets in one go, without the store.
+    `skipped` counts markets dropped for missing or inconsistent prices.
+    """
+    markets = []
+    for m in e.get("markets", []):
+        try:
+            market = parse_market(m)
+        except Exception as err:
+            logger.error(f"Market parse error: {err}")
+            continue
+        if market:
+            markets.append(market)
+    skipped = len(e.get("markets", [])) - len(markets)
+    return dict(parse_event(e), markets=markets, skipped=skipped)
+
+
+def _resident(event):
+    """An event row as kept in memory: the description replaced by its hash."""
+    if "desc" not in event:
+        return event
+    row = {k: v for k, v in event.items() if k != "desc"}
+    row["desc_hash"] = description_hash(event["desc"])
+    row["tags"] = [intern(t) for t in row["tags"]]
+    return row
+
+
+def _event_stamp(e):
+    return e.get("updatedAt")
+
+
+def _market_stamp(m):
+    # Prices move without a guaranteed updatedAt bump, so key on both
+    return f"{m.get('updatedAt')}|{m.get('outcomePrices')}"
+
+
+class IngestStore:
+    """
+    SQLite-backed store of parsed events and markets.
+
+    All rows are mirrored in memory on open; `ingest` compares each raw
+    event and market against its stored stamp and only parses and writes
+    the new or changed ones.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.counts = {"parsed": 0, "reused": 0, "evicted": 0}
+
+        self._events = {
+            row[0]: (row[1], _resident(json.loads(row[2])))
+            for row in self._db.execute("SELECT id, stamp, record FROM events")
+        }
+        self._markets = {
+            row[0]: (row[1], json.loads(row[2]))
+            for row in self._db.execute("SELECT id, stamp, record FROM markets")
+        }
+
+    def ingest(self, raw_events, key=None):
+        """
+        Merge freshly fetched raw events into the store.
+
+        Returns parsed event records (event fields, with `desc_hash` in
+        place of `desc`, plus a `markets` list of parsed markets and the
+        `skipped` count of invalid ones) in input order. If `key` is
+        given, the records are saved as a completed sync (see `save_sync`).
+        """
+        records = []
+        event_rows = []
+        market_rows = []
+        parsed = reused = 0
+
+        with self._lock:
+            for e in raw_events:
+                event_id = str(e.get("id") or e.get("slug"))
+                stamp = _event_stamp(e)
+                cached = self._events.get(event_id)
+                if cached and stamp is not None and cached[0] == stamp:
+                    event = cached[1]
+                else:
+                    parsed_event = parse_event(e)
+                    event = _resident(parsed_event)
+                    self._events[event_id] = (stamp, event)
+                    event_rows.append((event_id, stamp, event["end_ts"], json.dumps(parsed_event)))
+
+                markets = []
+                for m in e.get("markets", []):
+                    market_id = str(m.get("id"))
+                    m_stamp = _market_stamp(m)
+                    cached = self._markets.get(market_id)
+                    if cached and cached[0] == m_stamp:
+                        market = cached[1]
+                        reused += 1
+                    else:
+                        try:
+                            market = parse_market(m)
+                        except Exception as err:
+                            logger.error(f"Market parse error: {err}")
+                            market = None
+                        parsed += 1
+                        market = dict(market, event_id=event_id) if market else {"event_id": event_id}
+                        self._markets[market_id] = (m_stamp, market)
+                        market_rows.append(
+                            (market_id, event_id, m_stamp, event["end_ts"], json.dumps(market))
+                        )
+                    if "outcomes" in market:
+                        markets.append(market)
+
+                skipped = len(e.get("markets", [])) - len(markets)
+                records.append(dict(event, markets=markets, skipped=skipped))
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO events (id, stamp, end_ts, record) VALUES (?, ?, ?, ?)",
+                event_rows,
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO markets (id, event_id, stamp, end_ts, record) "
+                "VALUES (?, ?, ?, ?, ?)",
+                market_rows,
+            )
+            self._evict()
+            self._db.commit()
+
+        if key is not None:
+            self.save_sync(key, records)
+
+        self.counts["parsed"] += parsed
+        self.counts["reused"] += reused
+        logger.info(f"Ingest: {parsed} markets parsed, {reused} reused.")
+        return records
+
+    def description(self, event_id):
+        """A stored event's description ("" if unknown), read from disk."""
+        with self._lock:
+            row = self._db.execute("SELECT record FROM events WHERE id = ?", (event_id,)).fetchone()
+        return json.loads(row[0]).get("desc", "") if row else ""
+
+    def save_sync(self, key, records):
+        """Remember which events and markets make up a completed fetch."""
+        layout = [[r["id"], [m["id"] for m in r["markets"]], r.get("skipped", 0)] for r in records]
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO syncs (key, fetched_at, layout) VALUES (?, ?, ?)",
+                (key, time.time(), json.dumps(layout)),
+            )
+            self._db.commit()
+
+    def _evict(self):
+        """Drop events and markets that have already resolved."""
+        now = utc_now().timestamp()
+        expired = [k for k, (_, ev) in self._events.items() if ev["end_ts"] is not None and ev["end_ts"] < now]
+        if not expired:
+            return
+        expired_set = set(expired)
+        for event_id in expired:
+            del self._events[event_id]
+        for market_id in [k for k, (_, m) in self._markets.items() if m["event_id"] in expired_set]:
+            del self._markets[market_id]
+
+        self._db.execute("DELETE FROM events WHERE end_ts < ?", (now,))
+        self._db.execute("DELETE FROM markets WHERE end_ts < ?", (now,))
+        self.counts["evicted"] += len(expired)
+
+    def load_sync(self, key, max_age):
+        """
+        Rebuild the records of the last `ingest(..., key)` if it is at most
+        `max_age` seconds old, else None. Needs no network access.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, layout FROM syncs WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or time.time() - row[0] > max_age:
+                return None
+
+            records = []
+            for event_id, market_ids, *skipped in json.loads(row[1]):
+                if event_id not in self._events:
+                    continue
+                markets = [self._markets[m][1] for m in market_ids if m in self._markets]
+                skipped = skipped[0] if skipped else 0
+                records.append(dict(self._events[event_id][1], markets=markets, skipped=skipped))
+        return records
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,176 @@
+"""
+HTTP transports for the API session.
+
+Two interchangeable clients behind `get_session`:
+
+- "requests" (default): requests with the rate-limited adapter over
+  urllib3, HTTP/1.1 with one connection per request in flight.
+- "httpx": an httpx client (`pip install "httpx[http2,brotli]"`) that
+  multiplexes every request to a host over one HTTP/2 connection when
+  the server supports it.
+
+Both pace requests through the per-host rate limiter, negotiate gzip and
+brotli (when brotli is installed) explicitly, size their pools and
+keep-alive from the configured fetch concurrency, and record bytes on
+the wire, new connections and per-request latency in `metrics`.
+"""
+import logging
+import os
+import time
+
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+import metrics
+from ratelimit import RateLimitedAdapter, paced_send
+
+# --- CONFIG ---
+TRANSPORT = os.environ.get("SCANNER_TRANSPORT", "requests")
+# "1": HTTP/2 negotiated over TLS, "prior": HTTP/2 without negotiation
+# (cleartext servers such as the benchmark stand-in), "0": HTTP/1.1 only
+HTTP2 = os.environ.get("SCANNER_HTTP2", "1")
+# Requests in flight per host for one scan (Gamma pages, /books chunks)
+CONCURRENCY = int(os.environ.get("SCANNER_CONCURRENCY", 4))
+# Scans that share the session at once (the scheduler's and dashboard sessions')
+SHARED_SCANS = int(os.environ.get("SCANNER_SHARED_SCANS", 4))
+# Connections kept per host: every shared scan can have CONCURRENCY event
+# pages and CONCURRENCY /books chunks (plus its pre-warm HEADs) in flight
+# on one host, so none of them has its connection discarded
+POOL_SIZE = int(os.environ.get("SCANNER_POOL_SIZE", 0)) or CONCURRENCY * 2 * SHARED_SCANS
+KEEPALIVE_S = float(os.environ.get("SCANNER_KEEPALIVE", 90))
+CONNECT_RETRIES = 3
+
+HEADERS = {
+    "User-Agent": "MispricedOps/Scanner-2.0",
+    # gzip and deflate, plus br/zstd when their decoders are installed
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+def _netloc(scheme, host, port):
+    default = {"http": 80, "https": 443}[scheme]
+    return host if port in (None, default) else f"{host}:{port}"
+
+
+# --- REQUESTS ---
+def _counting_pool(pool_cls, connection_cls, scheme):
+    """`pool_cls` whose connections count every (re)connect in `metrics`."""
+    class Connection(connection_cls):
+        def connect(self):
+            metrics.observe_connection(_netloc(scheme, self.host, self.port))
+            super().connect()
+
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": Connection})
+
+
+COUNTING_POOLS = {
+    "http": _counting_pool(HTTPConnectionPool, HTTPConnection, "http"),
+    "https": _counting_pool(HTTPSConnectionPool, HTTPSConnection, "https"),
+}
+
+
+class PooledAdapter(RateLimitedAdapter):
+    """RateLimitedAdapter with a pool sized for POOL_SIZE and connection counting."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("pool_maxsize", POOL_SIZE)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = COUNTING_POOLS
+
+
+def requests_session():
+    session = requests.Session()
+    # Status retries (429/5xx) are handled by the rate-limited adapter so
+    # that every attempt is paced and fed back into the host's bucket.
+    retries = Retry(
+        total=CONNECT_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[]
+    )
+    adapter = PooledAdapter(max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+# --- HTTPX ---
+class PacedTransport:
+    """
+    httpx transport that paces and retries like RateLimitedAdapter.
+
+    Wraps an `httpx.HTTPTransport`; responses are read here so that the
+    metrics see their size on the wire and decoded.
+    """
+
+    def __init__(self, http2=HTTP2, max_attempts=4):
+        import httpx
+
+        self.max_attempts = max_attempts
+        self._transport = httpx.HTTPTransport(
+            http1=http2 != "prior",
+            http2=http2 != "0",
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE,
+                keepalive_expiry=KEEPALIVE_S,
+            ),
+            retries=CONNECT_RETRIES,
+        )
+
+    def handle_request(self, request):
+        url = str(request.url)
+        host = request.url.netloc.decode()
+
+        def trace(event, info):
+            if event == "connection.connect_tcp.complete":
+                metrics.observe_connection(host)
+
+        def attempt():
+            request.extensions = dict(request.extensions, trace=trace)
+            start = time.perf_counter()
+            response = self._transport.handle_request(request)
+            response.read()
+            metrics.observe_http(
+                url, response.status_code, time.perf_counter() - start, len(response.content),
+                response.num_bytes_downloaded,
+            )
+            return response, response.status_code, response.headers.get("Retry-After")
+
+        return paced_send(url, request.method, attempt, self.max_attempts)
+
+    def close(self):
+        self._transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def httpx_session(http2=HTTP2):
+    import httpx
+
+    # httpx logs every request at INFO; the metrics already count them
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    return httpx.Client(
+        transport=PacedTransport(http2), headers=HEADERS, follow_redirects=True,
+    )
+
+
+def get_session(transport=TRANSPORT, http2=HTTP2):
+    """
+    A new API session of the `transport` kind ("requests" or "httpx"). Both
+    offer `get`, `post` and `head`, and return responses with
+    `status_code`, `content`, `headers` and `json()`.
+    """
+    if transport == "httpx":
+        return httpx_session(http2)
+    return requests_session()
+
@@ -1,14 +1,21 @@
-import requests
+import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from urllib.parse import urlparse
+
+from gamma import decode_events
+from opportunity import Opportunity
+from transport import CONCURRENCY, KEEPALIVE_S, get_session
 
 # --- CONFIG ---
-GAMMA_URL = "https://gamma-api.polymarket.com/events"
-CLOB_URL = "https://clob.polymarket.com/books"
-HEADERS = {"User-Agent": "MispricedOps/Scanner-2.0"}
+GAMMA_URL = os.environ.get("GAMMA_URL", "https://gamma-api.polymarket.com/events")
+CLOB_URL = os.environ.get("CLOB_URL", "https://clob.polymarket.com/books")
 
 # --- LOGGING ---
 logging.basicConfig(
@@ -18,20 +25,43 @@ logging.basicConfig(
 logger = logging.getLogger("Scanner")
 
 # --- ROBUST SESSION ---
-def get_session():
-    session = requests.Session()
-    retries = Retry(
-        total=3,
-        backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504]
-    )
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    session.headers.update(HEADERS)
-    return session
-
 session = get_session()
+# (id(session), host root) -> monotonic time it was last pre-warmed
+_warmed_at = {}
+_warmed_lock = threading.Lock()
+
+def prewarm(urls, connections=CONCURRENCY):
+    """
+    Open `connections` connections to each URL's host in the background,
+    so a scan's first requests skip the TCP and TLS handshakes. Each is a
+    HEAD of the host root; over HTTP/2 they share one connection.
+
+    A host is warmed at most once per keep-alive period (KEEPALIVE_S) on
+    the same session: the warm HEADs draw on the host's request budget,
+    and within that period the pool still holds the connections.
+    Returns the started threads.
+    """
+    now = time.monotonic()
+    with _warmed_lock:
+        roots = set()
+        for root in {f"{p.scheme}://{p.netloc}/" for p in map(urlparse, urls)}:
+            key = (id(session), root)
+            if key not in _warmed_at or now - _warmed_at[key] >= KEEPALIVE_S:
+                _warmed_at[key] = now
+                roots.add(root)
+    threads = [
+        threading.Thread(target=_warm, args=(root,), daemon=True)
+        for root in roots for _ in range(connections)
+    ]
+    for t in threads:
+        t.start()
+    return threads
+
+def _warm(url):
+    try:
+        session.head(url, timeout=5)
+    except Exception as e:
+        logger.debug(f"Pre-warming {url} failed: {e}")
 
 # --- HELPERS ---
 def utc_now():
@@ -54,75 +84,367 @@ def parse_iso_date(date_str):
         return None
 
 # --- API FETCHERS ---
-def fetch_events_paginated(limit=500):
-    """
-    Fetch active Polymarket events ordered by volume.
-    Returns a list of raw event objects.
-    """
+PAGE_SIZE = 100
+# Pages in a row that fail every retry before Gamma is treated as down
+MAX_FAILED_PAGES = 3
+
+class EventFetchError(RuntimeError):
+    """Gamma kept failing, so the event walk was abandoned."""
+
+def _gamma_params(end_date_min=None, end_date_max=None):
     params = {
-        "limit": 100,
+        "limit": PAGE_SIZE,
         "active": "true",
         "closed": "false",
         "order": "volume",
         "ascending": "false"
     }
+    if end_date_min:
+        params["end_date_min"] = end_date_min.strftime("%Y-%m-%dT%H:%M:%SZ")
+    if end_date_max:
+        params["end_date_max"] = end_date_max.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return params
+
+def _in_window(event, end_date_min, end_date_max):
+    if end_date_min is None and end_date_max is None:
+        return True
+    end_date = parse_iso_date(event.get("endDate"))
+    if not end_date:
+        return False
+    if end_date_min and end_date < end_date_min:
+        return False
+    if end_date_max and end_date > end_date_max:
+        return False
+    return True
+
+def _fetch_events_page(params, offset, attempts=3, decode=decode_events):
+    """
+    Fetch a single Gamma page, retrying transient failures.
+    Returns (events, bytes); events is None if every attempt failed.
+    With `decode=None` the raw response body is returned instead of events.
+    """
+    query = dict(params, offset=offset)
 
-    events = []
-    offset = 0
+    for attempt in range(1, attempts + 1):
+        try:
+            r = session.get(GAMMA_URL, params=query, timeout=10)
+            if r.status_code == 200:
+                return decode(r.content) if decode else r.content, len(r.content)
+            logger.warning(f"Gamma page {offset} error {r.status_code} (attempt {attempt}/{attempts})")
+        except Exception as e:
+            logger.warning(f"Gamma page {offset} failed: {e} (attempt {attempt}/{attempts})")
 
-    logger.info("Fetching events from Gamma API...")
+        if attempt < attempts:
+            time.sleep(0.5 * 2 ** (attempt - 1))
 
-    while len(events) < limit:
-        params["offset"] = offset
-        try:
-            r = session.get(GAMMA_URL, params=params, timeout=10)
-            if r.status_code != 200:
-                logger.error(f"Gamma API error {r.status_code}: {r.text}")
-                break
+    logger.error(f"Gamma page {offset} dropped after {attempts} attempts")
+    return None, 0
 
-            data = r.json()
-            if not data:
-                break
+class PageWalk:
+    """
+    Offsets of one Gamma pagination walk, for any page fetcher.
 
-            events.extend(data)
-            offset += 100
+    Offsets are issued speculatively, PAGE_SIZE apart, by as many fetchers
+    as there are pages in flight. Once a short page comes back no new
+    offsets are issued and pages past it are discarded. With a `limit`
+    no offsets at or past it are issued. After MAX_FAILED_PAGES failed
+    pages in a row the walk is abandoned, and `check` raises.
+    """
 
-            if len(data) < 100:
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.next_offset = 0
+        self.last_offset = None  # offset of the first short page
+        self.failures = 0  # failed pages since the last fetched one
+        self.abandoned = False
+
+    def more(self):
+        """True while another offset should be requested."""
+        return (
+            self.last_offset is None and not self.abandoned
+            and (self.limit is None or self.next_offset < self.limit)
+        )
+
+    def issue(self):
+        offset = self.next_offset
+        self.next_offset += PAGE_SIZE
+        return offset
+
+    def landed(self, offset, count):
+        """Record a page of `count` events fetched from `offset`."""
+        self.failures = 0
+        if count < PAGE_SIZE and (self.last_offset is None or offset < self.last_offset):
+            self.last_offset = offset
+
+    def keeps(self, offset):
+        """False for a page past the end of the walk."""
+        return self.last_offset is None or offset <= self.last_offset
+
+    def failed(self, offset):
+        """Record a page that failed every retry."""
+        self.failures += 1
+        if self.failures >= MAX_FAILED_PAGES and not self.abandoned:
+            self.abandoned = True
+            logger.error(f"Gamma walk abandoned at offset {offset}: {self.failures} pages in a row failed")
+
+    def check(self):
+        """Raise EventFetchError if the walk was abandoned."""
+        if self.abandoned:
+            raise EventFetchError(f"Gamma unavailable: {MAX_FAILED_PAGES} pages in a row failed")
+
+def _iter_raw_pages(params, walk, concurrency, counts):
+    """
+    Yield (offset, events) for each page of `walk` as it arrives, with
+    up to `concurrency` pages in flight. A page that keeps failing is
+    logged, counted and skipped; if pages keep failing the walk is
+    abandoned and EventFetchError raised once the pages in flight are
+    done. No new page is requested until the consumer asks for more.
+    """
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            while len(in_flight) < concurrency and walk.more():
+                offset = walk.issue()
+                in_flight[pool.submit(_fetch_events_page, params, offset)] = offset
+
+            if not in_flight:
                 break
 
-        except Exception as e:
-            logger.error(f"Event fetch failed: {e}")
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                offset = in_flight.pop(future)
+                data, n_bytes = future.result()
+                if data is None:
+                    counts["failed_pages"] += 1
+                    walk.failed(offset)
+                    continue
+                counts["pages"] += 1
+                counts["bytes"] += n_bytes
+                counts["fetched"] += len(data)
+                walk.landed(offset, len(data))
+                if walk.keeps(offset):
+                    yield offset, data
+    walk.check()
+
+def _event_key(event):
+    return event.get("id") or event.get("slug")
+
+def fetch_events_paginated(limit=500, concurrency=CONCURRENCY, end_date_min=None,
+                           end_date_max=None, stats=None):
+    """
+    Fetch active Polymarket events ordered by volume, optionally limited
+    to an end-date window.
+
+    Same walk as `iter_event_pages`, collected and put back in volume
+    order. With `limit=None` the whole matching set is paginated. If
+    `stats` is a dict it receives pages, bytes, fetched and kept counts.
+    Returns a list of raw event objects.
+    """
+    logger.info("Fetching events from Gamma API...")
+    params = _gamma_params(end_date_min, end_date_max)
+    walk = PageWalk(limit)
+    counts = {"pages": 0, "failed_pages": 0, "bytes": 0, "fetched": 0, "kept": 0}
+    try:
+        pages = dict(_iter_raw_pages(params, walk, concurrency, counts))
+    finally:
+        if stats is not None:
+            stats.update(counts)
+
+    # Volume can shift between page requests, so an event may straddle two pages.
+    events = []
+    seen = set()
+    for offset in sorted(pages):
+        if not walk.keeps(offset):
             break
+        for e in pages[offset]:
+            key = _event_key(e)
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            if _in_window(e, end_date_min, end_date_max):
+                events.append(e)
+
+    events = events if limit is None else events[:limit]
+    counts["kept"] = len(events)
+    if stats is not None:
+        stats.update(counts)
+    logger.info(
+        f"Fetched {counts['fetched']} raw events ({counts['bytes'] / 1e6:.1f} MB), "
+        f"kept {counts['kept']}."
+    )
+    return events
+
+def iter_event_pages(limit=None, concurrency=CONCURRENCY, end_date_min=None,
+                     end_date_max=None, stats=None):
+    """
+    Stream in-window events page by page as pages arrive.
+
+    Pages are yielded in completion order (not volume order) and no new
+    page is requested until the consumer asks for more, so memory stays
+    flat however large the universe is. The end-date window is pushed
+    into the Gamma query and re-checked on each page. Only the IDs of
+    yielded events are remembered. If `stats` is a dict it receives
+    pages, bytes, fetched and kept counts as the walk goes.
+    """
+    params = _gamma_params(end_date_min, end_date_max)
+    counts = {"pages": 0, "failed_pages": 0, "bytes": 0, "fetched": 0, "kept": 0}
+    seen = set()
 
-    logger.info(f"Fetched {len(events)} raw events.")
-    return events[:limit]
+    try:
+        for _, data in _iter_raw_pages(params, PageWalk(limit), concurrency, counts):
+            page = []
+            for e in data:
+                key = _event_key(e)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                if _in_window(e, end_date_min, end_date_max):
+                    page.append(e)
+            counts["kept"] += len(page)
+            if stats is not None:
+                stats.update(counts)
+            if page:
+                yield page
+    finally:
+        if stats is not None:
+            stats.update(counts)
+
+class ChunkSizer:
+    """
+    Adapts the /books chunk size to observed latency and payload size.
 
-def fetch_liquidity(token_ids):
+    Each successful chunk rescales the size towards `target_latency`
+    (moving at most 2x per observation), capped so a response stays under
+    `max_bytes` at the moving-average bytes per token. Failures halve it.
     """
-    Batch-fetch order books for given token IDs.
-    Returns dict keyed by token_id.
+
+    def __init__(self, initial=20, min_size=5, max_size=100,
+                 target_latency=1.0, max_bytes=2_000_000, alpha=0.3):
+        self.size = initial
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_latency = target_latency
+        self.max_bytes = max_bytes
+        self.alpha = alpha
+        self.bytes_per_token = None
+        self._lock = threading.Lock()
+
+    def observe(self, n_tokens, latency, n_bytes):
+        if n_tokens <= 0:
+            return
+        with self._lock:
+            per_token = n_bytes / n_tokens
+            if self.bytes_per_token is None:
+                self.bytes_per_token = per_token
+            else:
+                self.bytes_per_token += self.alpha * (per_token - self.bytes_per_token)
+
+            ideal = self.size * self.target_latency / max(latency, 1e-3)
+            ideal = max(self.size / 2, min(self.size * 2, ideal))
+            if self.bytes_per_token > 0:
+                ideal = min(ideal, self.max_bytes / self.bytes_per_token)
+            self.size = int(max(self.min_size, min(self.max_size, ideal)))
+
+    def penalize(self):
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+chunk_sizer = ChunkSizer()
+
+def _post_books(chunk, attempt=0):
+    """
+    POST one /books chunk.
+    Returns (books, transient): books keyed by token_id, or None if the
+    chunk failed, and whether a failure is worth retrying as-is.
+    """
+    if attempt:
+        time.sleep(0.5 * 2 ** (attempt - 1))
+
+    payload = [{"token_id": t} for t in chunk]
+    start = time.perf_counter()
+    try:
+        r = session.post(CLOB_URL, json=payload, timeout=5)
+        if r.status_code != 200:
+            logger.warning(f"Liquidity chunk of {len(chunk)} failed: {r.status_code}")
+            # A 4xx is about the chunk's contents (e.g. a bad token), not its size
+            transient = r.status_code == 429 or r.status_code >= 500
+            if transient:
+                chunk_sizer.penalize()
+            return None, transient
+        books = {str(item.get("asset_id")): item for item in r.json()}
+    except Exception as e:
+        logger.warning(f"Liquidity chunk of {len(chunk)} failed: {e}")
+        chunk_sizer.penalize()
+        return None, True
+
+    chunk_sizer.observe(len(chunk), time.perf_counter() - start, len(r.content))
+    return books, False
+
+async def fetch_liquidity_async(token_ids, concurrency=CONCURRENCY, attempts=3):
+    """
+    Fetch order books with up to `concurrency` /books chunks in flight.
+
+    A chunk that failed transiently (timeouts, 429, 5xx) is retried whole,
+    with backoff, up to `attempts` times: splitting it would only multiply
+    requests to a host that is already throttling. Any other failed chunk
+    is split in half and both halves are retried, so a single bad token
+    only costs itself.
+
+    Returns (books, failed_ids): books keyed by token_id, and the token IDs
+    whose books could not be fetched. Tokens absent from both were fetched
+    but have no book.
     """
+    pending = deque(dict.fromkeys(str(t) for t in token_ids if t))
+    retry = deque()
+    in_flight = {}
     results = {}
-    unique_ids = list(set(str(t) for t in token_ids if t))
-    chunk_size = 20
+    failed_ids = []
 
-    logger.info(f"Fetching liquidity for {len(unique_ids)} tokens...")
+    logger.info(f"Fetching liquidity for {len(pending)} tokens...")
 
-    for i in range(0, len(unique_ids), chunk_size):
-        chunk = unique_ids[i:i + chunk_size]
-        payload = [{"token_id": t} for t in chunk]
+    while True:
+        while len(in_flight) < concurrency and (retry or pending):
+            if retry:
+                chunk, attempt = retry.popleft()
+            else:
+                size = min(chunk_sizer.size, len(pending))
+                chunk, attempt = [pending.popleft() for _ in range(size)], 0
+            task = asyncio.create_task(asyncio.to_thread(_post_books, chunk, attempt))
+            in_flight[task] = (chunk, attempt)
 
-        try:
-            r = session.post(CLOB_URL, json=payload, timeout=5)
-            if r.status_code == 200:
-                for item in r.json():
-                    results[str(item.get("asset_id"))] = item
+        if not in_flight:
+            break
+
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            chunk, attempt = in_flight.pop(task)
+            books, transient = task.result()
+            if books is not None:
+                results.update(books)
+            elif transient:
+                if attempt + 1 < attempts:
+                    retry.append((chunk, attempt + 1))
+                else:
+                    failed_ids.extend(chunk)
+            elif len(chunk) > 1:
+                mid = len(chunk) // 2
+                retry.append((chunk[:mid], 0))
+                retry.append((chunk[mid:], 0))
             else:
-                logger.warning(f"Liquidity fetch warning: {r.status_code}")
-        except Exception as e:
-            logger.error(f"Liquidity batch failed: {e}")
+                failed_ids.append(chunk[0])
 
-    return results
+    if failed_ids:
+        logger.error(f"Could not fetch {len(failed_ids)} order books")
+    return results, failed_ids
+
+def fetch_liquidity(token_ids, concurrency=CONCURRENCY):
+    """
+    Batch-fetch order books for given token IDs.
+    Returns (books, failed_ids), books keyed by token_id.
+    """
+    return asyncio.run(fetch_liquidity_async(token_ids, concurrency))
 
 # --- LIQUIDITY MATH ---
 def calculate_slippage(asks, capital):
@@ -178,3 +500,46 @@ def calculate_slippage(asks, capital):
     slippage = avg_entry - best_price
 
     return fill_pct, avg_entry, slippage, max_liq, False
+
+# --- DEPLOYABILITY GATES ---
+MIN_FILL = 0.95
+MAX_SLIPPAGE = 0.03
+ENTRY_BAND = (0.85, 0.99)
+
+# One scan's thresholds: the entry band (applied to the quoted price and
+# to the simulated entry), the minimum fill and the slippage limit
+Gates = namedtuple("Gates", ["band", "min_fill", "max_slippage"])
+DEFAULT_GATES = Gates(ENTRY_BAND, MIN_FILL, MAX_SLIPPAGE)
+
+def make_gates(band=ENTRY_BAND, min_fill=MIN_FILL, max_slippage=MAX_SLIPPAGE):
+    """Gates from plain values (e.g. sidebar or CLI input)."""
+    return Gates((float(band[0]), float(band[1])), float(min_fill), float(max_slippage))
+
+def fill_rejection(fill_pct, avg_entry, slippage, spread_warn, gates=DEFAULT_GATES):
+    """The first deployability gate a simulated fill fails, or None."""
+    if spread_warn:
+        return "spread_warn"
+    if fill_pct < gates.min_fill:
+        return "low_fill"
+    if slippage > gates.max_slippage:
+        return "high_slippage"
+    if not (gates.band[0] <= avg_entry <= gates.band[1]):
+        return "fill_entry_band"
+    return None
+
+def score_fill(candidate, capital, fill_pct, avg_entry, slippage, max_liq, spread_warn, gates=DEFAULT_GATES):
+    """
+    Apply the deployability gates to one candidate's simulated fill.
+    Returns the candidate scored as an Opportunity, or None if it fails a gate.
+    """
+    if fill_rejection(fill_pct, avg_entry, slippage, spread_warn, gates):
+        return None
+
+    roi_pct = ((1.0 - avg_entry) / avg_entry) * 100
+    profit = (capital / avg_entry) - capital
+
+    return Opportunity(candidate, avg_entry, slippage, roi_pct, profit, max_liq)
+
+def rank_key(result):
+    """Highest ROI first, liquidity depth as tiebreaker (use reverse=True)."""
+    return (result["roi"], result["max_liq"])